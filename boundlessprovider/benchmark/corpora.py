@@ -0,0 +1,166 @@
+# -*- coding: utf-8 -*-
+#
+# (c) 2017 Boundless Spatial Inc, http://boundlessgeo.com
+# This code is licensed under the GPL 2.0 license.
+#
+"""Seeded synthetic coordinate corpora for the five source formats.
+
+Random points (inside the UTM latitudes, so that every format can hold
+them) are written in one of several styles per value, as they come in
+real tables: degree, minute and second symbols or / and : separators,
+spaces around the parts, signs or hemisphere letters, compact or spaced
+MGRS references, lower case letters...
+
+The same format, size and seed always give the same values, with
+Python 2 and 3. Some styles hit the corners the parsers reject (e.g.
+DMS longitudes from 100 to 109 degrees), so a corpus is not entirely
+valid: the suite records how many values are.
+"""
+__copyright__ = '(C) Boundless Spatial Inc'
+
+# This will get replaced with a git SHA1 when you do a git archive
+__revision__ = '$Format:%H$'
+
+import numpy
+
+from boundlessprovider.bulk_utm import latLonToUtm
+from boundlessprovider.coordinate_parser import (
+    DD_index,
+    DMS_index,
+    DDM_index,
+    MGRS_index,
+    UTM_index,
+)
+from boundlessprovider.grid_tables import formatMgrs
+
+FORMAT_NAMES = ['DD', 'DMS', 'DDM', 'MGRS', 'UTM']
+DEFAULT_SEED = 20171016
+
+DD_STYLES = [
+    u'{sign}{value}',
+    u'{value}\xba{hemisphere}',
+    u'{value} {hemisphere}',
+    u' {sign}{value} ',
+]
+DMS_STYLES = [
+    u'{degrees}\xba{minutes}\'{seconds}"{hemisphere}',
+    u'{sign}{degrees}/{minutes}/{seconds}',
+    u'{sign}{degrees}:{minutes}:{seconds}',
+    u'{degrees}\xba {minutes}\' {seconds}" {hemisphere}',
+    u' {sign}{degrees} {minutes} {seconds} ',
+]
+DDM_STYLES = [
+    u'{degrees}\xba{minutes}\'{hemisphere}',
+    u'{sign}{degrees}:{minutes}\'',
+    u'{degrees} {minutes}\' {hemisphere}',
+    u'{sign}{degrees}\xba {minutes}\'',
+]
+UTM_STYLES = [
+    u'{zone:02d} {hemisphere} {easting:.0f} {northing:.0f}',
+    u'{zone}{band} {hemisphere} {easting:.1f} {northing:.1f}',
+    u'{zone},{hemisphere},{easting:.0f},{northing:.0f}',
+]
+
+
+def randomPoints(size, seed=DEFAULT_SEED):
+    """Return (lon, lat) arrays of size random points."""
+    random = numpy.random.RandomState(seed)
+    lat = random.uniform(-79.9, 83.9, size)
+    lon = random.uniform(-180.0, 180.0, size)
+    return lon, lat
+
+
+def _parts(value, unitsPerDegree):
+    """Split the absolute value in whole degrees and the rest in units,
+    truncated, so that rounding never gives 60 minutes or seconds.
+    """
+    total = int(abs(value) * unitsPerDegree)
+    return total // unitsPerDegree, total % unitsPerDegree
+
+
+def _angle(value, formatIndex, style, decimals, isLat):
+    sign = u'-' if value < 0 else u''
+    if isLat:
+        hemisphere = u'S' if value < 0 else u'N'
+    else:
+        hemisphere = u'W' if value < 0 else u'E'
+    if formatIndex == DD_index:
+        return style.format(sign=sign, hemisphere=hemisphere,
+                            value=u'{:.{}f}'.format(abs(value), decimals))
+    if formatIndex == DDM_index:
+        degrees, thousandths = _parts(value, 60000)
+        return style.format(sign=sign, hemisphere=hemisphere, degrees=degrees,
+                            minutes=u'{}.{:03d}'.format(thousandths // 1000, thousandths % 1000))
+    degrees, tenths = _parts(value, 36000)
+    seconds = tenths % 600
+    return style.format(sign=sign, hemisphere=hemisphere, degrees=degrees,
+                        minutes=tenths // 600,
+                        seconds=u'{}.{}'.format(seconds // 10, seconds % 10) if decimals else seconds // 10)
+
+
+def _mgrs(reference, style):
+    if style == 0:
+        return reference
+    zoneBand, square, easting, northing = reference.split()
+    if style == 1:
+        return zoneBand + square + easting + northing
+    if style == 2:
+        # 10 m precision
+        return u'{} {} {} {}'.format(zoneBand, square, easting[:4], northing[:4])
+    return (zoneBand + square + easting + northing).lower()
+
+
+def generateCorpus(formatIndex, size, seed=DEFAULT_SEED):
+    """Return (xValues, yValues) lists of size values in the format.
+    MGRS and UTM references are in xValues and yValues is None.
+    """
+    lon, lat = randomPoints(size, seed)
+    random = numpy.random.RandomState(seed + 1 + formatIndex)
+
+    if formatIndex in (DD_index, DMS_index, DDM_index):
+        styles = {DD_index: DD_STYLES, DMS_index: DMS_STYLES, DDM_index: DDM_STYLES}[formatIndex]
+        xStyles = random.randint(0, len(styles), size)
+        yStyles = random.randint(0, len(styles), size)
+        decimals = random.randint(0, 7, size)
+        xValues = [_angle(lon[index], formatIndex, styles[xStyles[index]], decimals[index], False)
+                   for index in range(size)]
+        yValues = [_angle(lat[index], formatIndex, styles[yStyles[index]], decimals[index], True)
+                   for index in range(size)]
+        return xValues, yValues
+
+    zones, bands, south, eastings, northings = latLonToUtm(lat, lon)
+    styles = random.randint(0, 4, size)
+    if formatIndex == MGRS_index:
+        references = formatMgrs(zones, bands, eastings, northings)
+        return [_mgrs(u'{}'.format(references[index]), styles[index]) for index in range(size)], None
+    if formatIndex == UTM_index:
+        return [UTM_STYLES[styles[index] % len(UTM_STYLES)].format(
+                    zone=int(zones[index]), band=u'CDEFGHJKLMNPQRSTUVWX'[bands[index]],
+                    hemisphere=u'S' if south[index] else u'N',
+                    easting=eastings[index], northing=northings[index])
+                for index in range(size)], None
+    raise ValueError('Invalid format index: {}'.format(formatIndex))
+
+
+def generateMixedCorpus(size, seed=DEFAULT_SEED, runLength=100):
+    """Return (xValues, yValues) lists of size values of all the
+    formats, in runs of runLength values of the same format. MGRS and
+    UTM rows have an empty yValues value.
+    """
+    corpora = [generateCorpus(formatIndex, size, seed) for formatIndex in range(len(FORMAT_NAMES))]
+    xValues = []
+    yValues = []
+    for start in range(0, size, runLength):
+        formatXValues, formatYValues = corpora[(start // runLength) % len(corpora)]
+        xValues.extend(formatXValues[start:start + runLength])
+        yValues.extend(formatYValues[start:start + runLength] if formatYValues else
+                       [u''] * len(formatXValues[start:start + runLength]))
+    return xValues, yValues
+
+
+if __name__ == "__main__":
+    # a few values of each corpus
+    for formatIndex, name in enumerate(FORMAT_NAMES):
+        xValues, yValues = generateCorpus(formatIndex, 6)
+        for index in range(len(xValues)):
+            print(u'{:<5} {!r} {!r}'.format(name, xValues[index], yValues[index] if yValues else None))
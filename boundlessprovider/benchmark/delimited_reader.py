@@ -0,0 +1,93 @@
+# -*- coding: utf-8 -*-
+#
+# (c) 2017 Boundless Spatial Inc, http://boundlessgeo.com
+# This code is licensed under the GPL 2.0 license.
+#
+"""Read and write time of delimited files by table width, memory mapped
+and with the csv module.
+
+Files like test/testdata/elevp.csv (X;Y;ELEV) are generated with a
+growing number of extra numeric columns. Each file is read a chunk of
+rows at a time, selecting its X and Y columns, and written with an
+extra column to the null device, as the command line does, by
+mapped_reader and by the csv module readers and writers of the
+command line. The conversion is left out: it does not depend on the
+reader.
+
+    python -m boundlessprovider.benchmark.delimited_reader [rows] [extra columns ...]
+"""
+from __future__ import print_function
+
+__copyright__ = '(C) Boundless Spatial Inc'
+
+# This will get replaced with a git SHA1 when you do a git archive
+__revision__ = '$Format:%H$'
+
+import io
+import os
+import shutil
+import sys
+import tempfile
+import time
+
+from boundlessprovider.cli import CsvReader, CsvWriter
+from boundlessprovider.mapped_reader import MappedDelimitedReader, MappedDelimitedWriter
+from boundlessprovider.streaming import DEFAULT_CHUNK_SIZE
+
+DEFAULT_ROWS = 200000
+DEFAULT_EXTRA_COLUMNS = [1, 10, 50]
+
+
+def writeTable(path, rows, extraColumns):
+    """Write a ; delimited table of X, Y and extraColumns columns."""
+    with io.open(path, 'w', encoding='utf-8', newline='') as output:
+        output.write(u';'.join([u'X', u'Y'] + [u'V{}'.format(column) for column in range(extraColumns)]) + u'\n')
+        extra = u';'.join([u'{}'.format(column * 7) for column in range(extraColumns)])
+        for index in range(rows):
+            output.write(u'{};{};{}\n'.format(-300120 + index * 10, 7689960 - index * 10, extra))
+
+
+def copyTable(reader, writer):
+    reader.readHeader()
+    for rows, (xValues, yValues) in reader.readChunks([0, 1], DEFAULT_CHUNK_SIZE, 2):
+        writer.writeRows(rows, [[x] for x in xValues])
+
+
+def timeReaders(path):
+    """Return the seconds to copy the table with each reader."""
+    reader = MappedDelimitedReader(path, u';')
+    writer = MappedDelimitedWriter(os.devnull, reader)
+    start = time.time()
+    copyTable(reader, writer)
+    mapped = time.time() - start
+    writer.close()
+    reader.close()
+
+    reader = CsvReader(path, u';')
+    writer = CsvWriter(os.devnull, u';')
+    start = time.time()
+    copyTable(reader, writer)
+    csvModule = time.time() - start
+    writer.close()
+    reader.close()
+    return mapped, csvModule
+
+
+def run(rows=DEFAULT_ROWS, extraColumns=DEFAULT_EXTRA_COLUMNS):
+    directory = tempfile.mkdtemp()
+    try:
+        print('{} rows'.format(rows))
+        print('{:>8} {:>10} {:>12} {:>12} {:>8}'.format('columns', 'MB', 'mmap rows/s', 'csv rows/s', 'speedup'))
+        for extra in extraColumns:
+            path = os.path.join(directory, 'table{}.csv'.format(extra))
+            writeTable(path, rows, extra)
+            mapped, csvModule = timeReaders(path)
+            print('{:>8} {:>10.1f} {:>12.0f} {:>12.0f} {:>8.1f}'.format(
+                extra + 2, os.path.getsize(path) / 1048576.0, rows / mapped, rows / csvModule, csvModule / mapped))
+    finally:
+        shutil.rmtree(directory)
+
+
+if __name__ == "__main__":
+    run(int(sys.argv[1]) if len(sys.argv) > 1 else DEFAULT_ROWS,
+        [int(value) for value in sys.argv[2:]] or DEFAULT_EXTRA_COLUMNS)
@@ -0,0 +1,97 @@
+# -*- coding: utf-8 -*-
+#
+# (c) 2017 Boundless Spatial Inc, http://boundlessgeo.com
+# This code is licensed under the GPL 2.0 license.
+#
+"""Throughput of the bulk_utm engine compared with pygeodesy objects.
+
+A column of random MGRS and UTM references of the given size is
+converted to lat/lon and back:
+
+- pygeodesy: parseMGRS/parseUTM, toUtm and toLatLon for each value, and
+  toUtm, toMgrs for each point;
+- bulk: coordinate_parser.parseGridColumn and bulk_utm latLonToUtm and
+  formatMgrs/formatUtm on the whole column.
+
+pygeodesy is timed on a sample of at most 20000 values.
+
+    python -m boundlessprovider.benchmark.grid_throughput [size]
+"""
+from __future__ import print_function
+
+__copyright__ = '(C) Boundless Spatial Inc'
+
+# This will get replaced with a git SHA1 when you do a git archive
+__revision__ = '$Format:%H$'
+
+import sys
+import timeit
+
+import numpy
+
+from pygeodesy import mgrs
+from pygeodesy.ellipsoidalVincenty import LatLon
+try:
+    from pygeodesy.utm import parseUTM5 as parseUTM, toUtm8 as toUtm
+except ImportError:
+    from pygeodesy.utm import parseUTM, toUtm
+
+from boundlessprovider.bulk_utm import latLonToUtm
+from boundlessprovider.grid_tables import formatMgrs, formatUtm
+from boundlessprovider.coordinate_parser import parseGridColumn, MGRS_index, UTM_index
+
+PYGEODESY_SAMPLE = 20000
+
+
+def best(function, repeat=3):
+    return min(timeit.repeat(function, number=1, repeat=repeat))
+
+
+def pygeodesyInverse(values, isMgrs):
+    for value in values:
+        utmObject = mgrs.parseMGRS(value).toUtm() if isMgrs else parseUTM(value)
+        utmObject.toLatLon(LatLon)
+
+
+def pygeodesyForward(lat, lon, isMgrs):
+    for index in range(len(lat)):
+        utmObject = toUtm(lat[index], lon[index])
+        if isMgrs:
+            utmObject.toMgrs().toStr()
+        else:
+            utmObject.toStr()
+
+
+def bulkForward(lat, lon, isMgrs):
+    zones, bands, south, eastings, northings = latLonToUtm(lat, lon)
+    if isMgrs:
+        formatMgrs(zones, bands, eastings, northings)
+    else:
+        formatUtm(zones, south, eastings, northings)
+
+
+def run(size=100000):
+    random = numpy.random.RandomState(0)
+    lat = random.uniform(-79.9, 83.9, size)
+    lon = random.uniform(-180.0, 180.0, size)
+    zones, bands, south, eastings, northings = latLonToUtm(lat, lon)
+    sample = min(size, PYGEODESY_SAMPLE)
+
+    print('{:<12} {:>12} {:>12} {:>10}'.format('values/s', 'pygeodesy', 'bulk', 'speedup'))
+    for name, isMgrs, sourceFormatIndex in (('MGRS', True, MGRS_index), ('UTM', False, UTM_index)):
+        if isMgrs:
+            column = formatMgrs(zones, bands, eastings, northings)
+        else:
+            column = formatUtm(zones, south, eastings, northings)
+        pygeodesyTime = best(lambda: pygeodesyInverse(column[:sample], isMgrs), repeat=1) / sample
+        bulkTime = best(lambda: parseGridColumn(column, sourceFormatIndex)) / size
+        print('{:<12} {:>12.0f} {:>12.0f} {:>9.1f}x'.format(
+            name + ' read', 1 / pygeodesyTime, 1 / bulkTime, pygeodesyTime / bulkTime))
+        pygeodesyTime = best(lambda: pygeodesyForward(lat[:sample], lon[:sample], isMgrs), repeat=1) / sample
+        bulkTime = best(lambda: bulkForward(lat, lon, isMgrs)) / size
+        print('{:<12} {:>12.0f} {:>12.0f} {:>9.1f}x'.format(
+            name + ' write', 1 / pygeodesyTime, 1 / bulkTime, pygeodesyTime / bulkTime))
+
+
+if __name__ == "__main__":
+    run(int(sys.argv[1]) if len(sys.argv) > 1 else 100000)
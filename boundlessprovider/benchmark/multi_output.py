@@ -0,0 +1,100 @@
+# -*- coding: utf-8 -*-
+#
+# (c) 2017 Boundless Spatial Inc, http://boundlessgeo.com
+# This code is licensed under the GPL 2.0 license.
+#
+"""Several destination formats in a single scan, against a run for each.
+
+Two columns of distinct DMS pairs, as two source field pairs of a
+table, are converted to DD, DDM and MGRS: first with a conversion of
+each pair to each format, that parses every value three times, then in
+a single scan with the extra pairs and destinations of the engine, that
+parses it once. The single scan values are checked to be the ones of
+the separate runs. Caches are disabled, so that only the conversion is
+measured.
+
+    python -m boundlessprovider.benchmark.multi_output [rows] [chunk size]
+"""
+from __future__ import print_function
+
+__copyright__ = '(C) Boundless Spatial Inc'
+
+# This will get replaced with a git SHA1 when you do a git archive
+__revision__ = '$Format:%H$'
+
+import sys
+import time
+
+from boundlessprovider.converter import ConversionParameters, DD_index, DMS_index, DDM_index, MGRS_index
+from boundlessprovider.engine import ConversionEngine, fieldPairsOf
+from boundlessprovider.streaming import chunks
+
+DEFAULT_ROWS = 100000
+DEFAULT_CHUNK_SIZE = 10000
+DESTINATIONS = (DD_index, DDM_index, MGRS_index)
+SOURCE_FIELDS = [(0, 1), (2, 3)]
+
+
+def generateRecords(rows):
+    return [[u'{}:{}:{:.2f}W'.format(index % 180, (index // 180) % 60, (index % 6000) / 100.0),
+             u'{}:{}:{:.2f}N'.format(index % 80, (index // 80) % 60, (index % 6000) / 100.0),
+             u'{}:{}:{:.2f}E'.format(index % 170, (index // 170) % 60, (index % 5000) / 100.0),
+             u'{}:{}:{:.2f}S'.format(index % 70, (index // 70) % 60, (index % 5000) / 100.0)]
+            for index in range(rows)]
+
+
+def parameters(destinationFormat, extraDestinations=()):
+    return ConversionParameters(DMS_index, destinationFormat, None, u'{X} {Y}', True, True,
+                                extraDestinations=extraDestinations)
+
+
+def convert(records, chunkSize, conversion, sourceFields):
+    """Return the results of records, pairs of each chunk one after the
+    other.
+    """
+    results = []
+    with ConversionEngine(conversion, cacheSize=0) as engine:
+        items = ((None, fieldPairsOf(chunk, sourceFields)) for chunk in chunks(records, chunkSize))
+        for context, chunkResults in engine.convertChunks(items):
+            results.append(chunkResults)
+    return results
+
+
+def run(rows=DEFAULT_ROWS, chunkSize=DEFAULT_CHUNK_SIZE):
+    records = generateRecords(rows)
+    count = len(SOURCE_FIELDS) * len(DESTINATIONS)
+    print('{} rows, {} source pairs to {} formats, chunks of {}'.format(
+        rows, len(SOURCE_FIELDS), len(DESTINATIONS), chunkSize))
+    print('{:<14} {:>10} {:>12}'.format('conversion', 'seconds', 'values/s'))
+
+    start = time.time()
+    separate = {}
+    for fieldPair in SOURCE_FIELDS:
+        for destinationFormat in DESTINATIONS:
+            separate[fieldPair, destinationFormat] = convert(records, chunkSize, parameters(destinationFormat), [fieldPair])
+    separateTime = time.time() - start
+    print('{:<14} {:>10.2f} {:>12.0f}'.format('separate', separateTime, rows * count / separateTime))
+
+    start = time.time()
+    single = convert(records, chunkSize, parameters(DESTINATIONS[0], DESTINATIONS[1:]), SOURCE_FIELDS)
+    singleTime = time.time() - start
+    print('{:<14} {:>10.2f} {:>12.0f}  {:.2f}x'.format(
+        'single scan', singleTime, rows * count / singleTime, separateTime / singleTime))
+
+    # the single scan is valid only if all the formats are
+    for pairIndex, fieldPair in enumerate(SOURCE_FIELDS):
+        for destinationIndex, destinationFormat in enumerate(DESTINATIONS):
+            for chunkResults, separateResults in zip(single, separate[fieldPair, destinationFormat]):
+                size = len(separateResults)
+                pairResults = chunkResults[pairIndex * size:(pairIndex + 1) * size]
+                values = [result[1 + 3 * destinationIndex:4 + 3 * destinationIndex] for result in pairResults
+                          if result[0]]
+                expected = [result[1:4] for result, pairResult in zip(separateResults, pairResults) if pairResult[0]]
+                if values != expected:
+                    print('FAILED: the values of {} in format {} differ'.format(fieldPair, destinationFormat))
+                    return
+
+
+if __name__ == "__main__":
+    run(int(sys.argv[1]) if len(sys.argv) > 1 else DEFAULT_ROWS,
+        int(sys.argv[2]) if len(sys.argv) > 2 else DEFAULT_CHUNK_SIZE)
@@ -0,0 +1,80 @@
+# -*- coding: utf-8 -*-
+#
+# (c) 2017 Boundless Spatial Inc, http://boundlessgeo.com
+# This code is licensed under the GPL 2.0 license.
+#
+"""Throughput of parallel.ParallelConverter by number of workers.
+
+A column of distinct DMS pairs is converted to DDM in chunks, serially
+in this process and with pools of 1, 2, 4... workers up to the number
+of cores. The results of every pool are checked to be the serial ones,
+in the same order. Caches are disabled, so that only the conversion is
+measured.
+
+    python -m boundlessprovider.benchmark.parallel_scaling [rows] [chunk size]
+"""
+from __future__ import print_function
+
+__copyright__ = '(C) Boundless Spatial Inc'
+
+# This will get replaced with a git SHA1 when you do a git archive
+__revision__ = '$Format:%H$'
+
+import multiprocessing
+import sys
+import time
+
+from boundlessprovider.converter import ConversionParameters, convertPairs, DMS_index, DDM_index
+from boundlessprovider.parallel import ParallelConverter
+from boundlessprovider.streaming import chunks
+
+DEFAULT_ROWS = 400000
+DEFAULT_CHUNK_SIZE = 10000
+
+PARAMETERS = ConversionParameters(DMS_index, DDM_index, None, u'{X} {Y}', True, True)
+
+
+def generatePairs(rows):
+    return [(u'{}:{}:{:.2f}W'.format(index % 180, (index // 180) % 60, (index % 6000) / 100.0),
+             u'{}:{}:{:.2f}N'.format(index % 90, (index // 90) % 60, (index % 6000) / 100.0))
+            for index in range(rows)]
+
+
+def workerCounts():
+    counts = []
+    count = 1
+    while count < multiprocessing.cpu_count():
+        counts.append(count)
+        count *= 2
+    return counts + [multiprocessing.cpu_count()]
+
+
+def run(rows=DEFAULT_ROWS, chunkSize=DEFAULT_CHUNK_SIZE):
+    pairs = generatePairs(rows)
+    print('{} rows, chunks of {}, {} cores'.format(rows, chunkSize, multiprocessing.cpu_count()))
+    print('{:>8} {:>10} {:>12} {:>10}'.format('workers', 'seconds', 'rows/s', 'speedup'))
+
+    start = time.time()
+    expected = []
+    for chunk in chunks(pairs, chunkSize):
+        expected.extend(convertPairs(chunk, PARAMETERS))
+    serialTime = time.time() - start
+    print('{:>8} {:>10.2f} {:>12.0f} {:>9.2f}x'.format('serial', serialTime, rows / serialTime, 1.0))
+
+    for workers in workerCounts():
+        with ParallelConverter(workers, cacheSize=0) as converter:
+            start = time.time()
+            results = []
+            items = ((None, chunk) for chunk in chunks(pairs, chunkSize))
+            for context, chunkResults in converter.convertChunks(items, PARAMETERS):
+                results.extend(chunkResults)
+            seconds = time.time() - start
+        if results != expected:
+            print('FAILED: {} workers results differ from the serial ones'.format(workers))
+        print('{:>8} {:>10.2f} {:>12.0f} {:>9.2f}x'.format(
+            workers, seconds, rows / seconds, serialTime / seconds))
+
+
+if __name__ == "__main__":
+    run(int(sys.argv[1]) if len(sys.argv) > 1 else DEFAULT_ROWS,
+        int(sys.argv[2]) if len(sys.argv) > 2 else DEFAULT_CHUNK_SIZE)
@@ -0,0 +1,85 @@
+# -*- coding: utf-8 -*-
+#
+# (c) 2017 Boundless Spatial Inc, http://boundlessgeo.com
+# This code is licensed under the GPL 2.0 license.
+#
+"""Run time of pipeline.Pipeline by number of threaded stages, on slow
+storage.
+
+A column of DMS pairs is read, converted to DD and written a chunk at a
+time, as processAlgorithm does, with a latency per chunk read and per
+chunk written that stands for slow (e.g. network) storage. Run with 0
+threaded stages the latencies add up to the conversion; with 1 to 3
+they overlap with it. The results of every run are checked to be the
+serial ones, in the same order.
+
+    python -m boundlessprovider.benchmark.pipeline_overlap [rows] [latency ms]
+"""
+from __future__ import print_function
+
+__copyright__ = '(C) Boundless Spatial Inc'
+
+# This will get replaced with a git SHA1 when you do a git archive
+__revision__ = '$Format:%H$'
+
+import sys
+import time
+
+from boundlessprovider.benchmark.parallel_scaling import generatePairs
+from boundlessprovider.converter import ConversionParameters, DMS_index, DD_index
+from boundlessprovider.engine import ConversionEngine
+from boundlessprovider.pipeline import Pipeline, DEFAULT_QUEUE_DEPTH
+from boundlessprovider.streaming import chunks
+
+DEFAULT_ROWS = 200000
+DEFAULT_LATENCY = 20
+CHUNK_SIZE = 5000
+
+PARAMETERS = ConversionParameters(DMS_index, DD_index, None, u'{X} {Y}', True, True)
+
+
+def slowChunks(pairs, latency):
+    for chunk in chunks(pairs, CHUNK_SIZE):
+        time.sleep(latency)
+        yield chunk, chunk
+
+
+def convert(pairs, stages, latency):
+    """Return the seconds of a run and the written results."""
+    written = []
+
+    def write(results):
+        time.sleep(latency)
+        written.extend(results)
+
+    start = time.time()
+    # no cache, every chunk is converted
+    engine = ConversionEngine(PARAMETERS, cacheSize=0)
+    with Pipeline(stages, DEFAULT_QUEUE_DEPTH) as pipeline:
+        items = pipeline.read(slowChunks(pairs, latency))
+        for chunk, results in pipeline.convert(engine.convertChunks(items)):
+            pipeline.write(write, results)
+        pipeline.flush()
+    engine.close()
+    return time.time() - start, written
+
+
+def run(rows=DEFAULT_ROWS, latency=DEFAULT_LATENCY):
+    pairs = generatePairs(rows)
+    print('{} rows, chunks of {}, {} ms per chunk read and written'.format(rows, CHUNK_SIZE, latency))
+    print('{:>8} {:>10} {:>12} {:>10}'.format('stages', 'seconds', 'rows/s', 'speedup'))
+    serial = None
+    expected = None
+    for stages in range(4):
+        seconds, written = convert(pairs, stages, latency / 1000.0)
+        if expected is None:
+            serial = seconds
+            expected = written
+        elif written != expected:
+            raise AssertionError('{} stages: results differ from the serial ones'.format(stages))
+        print('{:>8} {:>10.2f} {:>12.0f} {:>10.2f}'.format(stages, seconds, rows / seconds, serial / seconds))
+
+
+if __name__ == "__main__":
+    run(int(sys.argv[1]) if len(sys.argv) > 1 else DEFAULT_ROWS,
+        int(sys.argv[2]) if len(sys.argv) > 2 else DEFAULT_LATENCY)
@@ -0,0 +1,74 @@
+# -*- coding: utf-8 -*-
+#
+# (c) 2017 Boundless Spatial Inc, http://boundlessgeo.com
+# This code is licensed under the GPL 2.0 license.
+#
+"""Throughput and error of the interpolation grid of projected sources.
+
+Random UTM zone 33N points over 600 x 1000 km are transformed to WGS84
+one point at a time, as the QGIS transform of the algorithm does, and
+with projected.InterpolationGrid for some maximum errors. The point
+transform is the bulk_utm inverse called for a point at a time, that
+stands for the QGIS one without QGIS. The grid time includes building
+it, and the true error is the largest over all the points.
+
+    python -m boundlessprovider.benchmark.projection_grid [rows]
+"""
+from __future__ import print_function
+
+__copyright__ = '(C) Boundless Spatial Inc'
+
+# This will get replaced with a git SHA1 when you do a git archive
+__revision__ = '$Format:%H$'
+
+import sys
+import time
+
+import numpy
+
+from boundlessprovider.bulk_utm import utmToLatLon
+from boundlessprovider.projected import InterpolationGrid, errorMetres
+
+DEFAULT_ROWS = 100000
+MAX_ERRORS = [10.0, 1.0, 0.5]
+ZONE = 33
+
+
+def transformPoints(x, y):
+    """Transform from UTM 33N a point at a time."""
+    lon = numpy.empty(len(x))
+    lat = numpy.empty(len(x))
+    zone = numpy.array([ZONE])
+    south = numpy.array([False])
+    for index in range(len(x)):
+        pointLat, pointLon = utmToLatLon(zone, south, x[index:index + 1], y[index:index + 1])
+        lon[index] = pointLon[0]
+        lat[index] = pointLat[0]
+    return lon, lat
+
+
+def run(rows=DEFAULT_ROWS):
+    random = numpy.random.RandomState(1)
+    x = random.uniform(200000, 800000, rows)
+    y = random.uniform(4000000, 5000000, rows)
+    print('{} rows'.format(rows))
+    print('{:>10} {:>8} {:>10} {:>10} {:>12} {:>10}'.format(
+        'max error', 'cells', 'measured', 'true', 'rows/s', 'speedup'))
+
+    start = time.time()
+    expectedLon, expectedLat = transformPoints(x, y)
+    exact = time.time() - start
+    print('{:>10} {:>8} {:>10} {:>10} {:>12.0f} {:>10.1f}'.format('exact', '-', '-', '-', rows / exact, 1.0))
+
+    for maxError in MAX_ERRORS:
+        start = time.time()
+        grid = InterpolationGrid(transformPoints, (x.min(), y.min(), x.max(), y.max()), maxError)
+        lon, lat = grid(x, y)
+        seconds = time.time() - start
+        error = errorMetres(lon, lat, expectedLon, expectedLat).max()
+        print('{:>10.3g} {:>8} {:>10.3g} {:>10.3g} {:>12.0f} {:>10.1f}'.format(
+            maxError, grid.cells, grid.error, error, rows / seconds, exact / seconds))
+
+
+if __name__ == "__main__":
+    run(int(sys.argv[1]) if len(sys.argv) > 1 else DEFAULT_ROWS)
@@ -0,0 +1,79 @@
+# -*- coding: utf-8 -*-
+#
+# (c) 2017 Boundless Spatial Inc, http://boundlessgeo.com
+# This code is licensed under the GPL 2.0 license.
+#
+"""Batch of small runs with an engine each, against a shared engine.
+
+A batch or a model runs the algorithm many times on small tables, that
+repeat values of each other. Each run converts its table with a new
+ConversionEngine, that starts its workers and its cache from nothing,
+and then with the engine of a SharedConversionEngine, that keeps them
+between runs as the provider does. Results are checked to be the same.
+
+    python -m boundlessprovider.benchmark.shared_engine [runs] [rows] [workers]
+"""
+from __future__ import print_function
+
+__copyright__ = '(C) Boundless Spatial Inc'
+
+# This will get replaced with a git SHA1 when you do a git archive
+__revision__ = '$Format:%H$'
+
+import sys
+import time
+
+from boundlessprovider.conversion_cache import clearSharedCaches
+from boundlessprovider.converter import ConversionParameters, DMS_index, DDM_index
+from boundlessprovider.engine import ConversionEngine, SharedConversionEngine
+
+DEFAULT_RUNS = 100
+DEFAULT_ROWS = 2000
+DEFAULT_WORKERS = 2
+# distinct values of all the runs
+DISTINCT = 20000
+
+PARAMETERS = ConversionParameters(DMS_index, DDM_index, None, u'{X} {Y}', True, True)
+
+
+def runPairs(run, rows):
+    first = run * rows * 7
+    return [(u'{}:{}:{:.2f}W'.format(index % 180, (index // 180) % 60, (index % 6000) / 100.0),
+             u'{}:{}:{:.2f}N'.format(index % 90, (index // 90) % 60, (index % 6000) / 100.0))
+            for index in ((first + row) % DISTINCT for row in range(rows))]
+
+
+def convert(engine, pairs):
+    with engine:
+        return [result for context, results in engine.convertChunks([(None, pairs)]) for result in results]
+
+
+def run(runs=DEFAULT_RUNS, rows=DEFAULT_ROWS, workers=DEFAULT_WORKERS):
+    batch = [runPairs(index, rows) for index in range(runs)]
+    print('{} runs of {} rows'.format(runs, rows))
+    print('{:<8} {:<14} {:>10} {:>10}'.format('workers', 'engine', 'seconds', 'runs/s'))
+    for workerCount in sorted(set([1, workers])):
+        start = time.time()
+        expected = [convert(ConversionEngine(PARAMETERS, workerCount), pairs) for pairs in batch]
+        ownSeconds = time.time() - start
+        print('{:<8} {:<14} {:>10.2f} {:>10.1f}'.format(workerCount, 'per run', ownSeconds, runs / ownSeconds))
+
+        shared = SharedConversionEngine()
+        start = time.time()
+        results = []
+        for pairs in batch:
+            shared.configure(workerCount, 100000)
+            results.append(convert(shared.engine(PARAMETERS), pairs))
+        sharedSeconds = time.time() - start
+        shared.close()
+        clearSharedCaches()
+        if results != expected:
+            print('FAILED: the shared engine results differ')
+        print('{:<8} {:<14} {:>10.2f} {:>10.1f}  {:.1f}x'.format(
+            workerCount, 'shared', sharedSeconds, runs / sharedSeconds, ownSeconds / sharedSeconds))
+
+
+if __name__ == "__main__":
+    run(int(sys.argv[1]) if len(sys.argv) > 1 else DEFAULT_RUNS,
+        int(sys.argv[2]) if len(sys.argv) > 2 else DEFAULT_ROWS,
+        int(sys.argv[3]) if len(sys.argv) > 3 else DEFAULT_WORKERS)
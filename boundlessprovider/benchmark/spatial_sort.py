@@ -0,0 +1,97 @@
+# -*- coding: utf-8 -*-
+#
+# (c) 2017 Boundless Spatial Inc, http://boundlessgeo.com
+# This code is licensed under the GPL 2.0 license.
+#
+"""Spatial keys and sorting of converted points.
+
+Random points are given Hilbert and geohash keys (spatial_keys) and
+sorted by them with ExternalSorter, in memory and in spilled runs of a
+tenth of the rows. For each order the rows are stored in pages of
+PAGE_ROWS rows, and random windows of WINDOW_DEGREES degrees are
+queried: the pages holding their points are the pages an indexed read
+of the window touches, fewer when the rows are spatially clustered.
+
+    python -m boundlessprovider.benchmark.spatial_sort [rows]
+"""
+from __future__ import print_function
+
+__copyright__ = '(C) Boundless Spatial Inc'
+
+# This will get replaced with a git SHA1 when you do a git archive
+__revision__ = '$Format:%H$'
+
+import sys
+import time
+
+import numpy
+
+from boundlessprovider.external_sort import ExternalSorter
+from boundlessprovider.spatial_keys import spatialKeys, HILBERT_index, GEOHASH_index
+from boundlessprovider.streaming import chunks
+
+DEFAULT_ROWS = 500000
+CHUNK_SIZE = 10000
+PAGE_ROWS = 100
+WINDOW_DEGREES = 2.0
+WINDOWS = 200
+
+
+def sortRows(keys, rows, runSize):
+    with ExternalSorter(runSize) as sorter:
+        for start in range(0, len(rows), CHUNK_SIZE):
+            sorter.add(keys[start:start + CHUNK_SIZE], rows[start:start + CHUNK_SIZE])
+        return [row for chunk in sorter.sortedChunks(CHUNK_SIZE) for row in chunk], sorter.runs
+
+
+def pagesTouched(order, lon, lat, windows):
+    """Mean number of pages holding the points of each window, with the
+    rows stored in order.
+    """
+    pages = numpy.empty(len(order), dtype=numpy.int64)
+    pages[numpy.asarray(order)] = numpy.arange(len(order)) // PAGE_ROWS
+    counts = []
+    for west, south in windows:
+        inside = (lon >= west) & (lon < west + WINDOW_DEGREES) & (lat >= south) & (lat < south + WINDOW_DEGREES)
+        counts.append(len(numpy.unique(pages[inside])))
+    return numpy.mean(counts)
+
+
+def run(rows=DEFAULT_ROWS):
+    random = numpy.random.RandomState(1)
+    lon = random.uniform(-180, 180, rows)
+    lat = random.uniform(-90, 90, rows)
+    windows = list(zip(random.uniform(-180, 180 - WINDOW_DEGREES, WINDOWS),
+                       random.uniform(-90, 90 - WINDOW_DEGREES, WINDOWS)))
+    rowIds = list(range(rows))
+    print('{} rows, pages of {} rows, {} windows of {} degrees'.format(rows, PAGE_ROWS, WINDOWS, WINDOW_DEGREES))
+    print('{:<10} {:>10} {:>12} {:>10} {:>6} {:>12} {:>8}'.format(
+        'key', 'keys/s', 'sort rows/s', 'spilled/s', 'runs', 'pages/query', 'points'))
+    pointsPerWindow = numpy.mean([((lon >= west) & (lon < west + WINDOW_DEGREES) &
+                                   (lat >= south) & (lat < south + WINDOW_DEGREES)).sum() for west, south in windows])
+    print('{:<10} {:>10} {:>12} {:>10} {:>6} {:>12.1f} {:>8.1f}'.format(
+        'input', '-', '-', '-', '-', pagesTouched(rowIds, lon, lat, windows), pointsPerWindow))
+
+    for name, keyType in (('Hilbert', HILBERT_index), ('Geohash', GEOHASH_index)):
+        start = time.time()
+        sortKeys = []
+        for rowChunk in chunks(rowIds, CHUNK_SIZE):
+            keys, chunkSortKeys = spatialKeys(keyType, lon[rowChunk], lat[rowChunk])
+            sortKeys.extend(chunkSortKeys.tolist())
+        keySeconds = time.time() - start
+
+        start = time.time()
+        order, _ = sortRows(sortKeys, rowIds, rows)
+        memorySeconds = time.time() - start
+        start = time.time()
+        spilledOrder, runs = sortRows(sortKeys, rowIds, rows // 10)
+        spilledSeconds = time.time() - start
+        if spilledOrder != order or order != sorted(rowIds, key=sortKeys.__getitem__):
+            print('FAILED: {} rows not sorted by key'.format(name))
+        print('{:<10} {:>10.0f} {:>12.0f} {:>10.0f} {:>6} {:>12.1f} {:>8.1f}'.format(
+            name, rows / keySeconds, rows / memorySeconds, rows / spilledSeconds, runs,
+            pagesTouched(order, lon, lat, windows), pointsPerWindow))
+
+
+if __name__ == "__main__":
+    run(int(sys.argv[1]) if len(sys.argv) > 1 else DEFAULT_ROWS)
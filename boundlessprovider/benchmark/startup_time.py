@@ -0,0 +1,171 @@
+# -*- coding: utf-8 -*-
+#
+# (c) 2017 Boundless Spatial Inc, http://boundlessgeo.com
+# This code is licensed under the GPL 2.0 license.
+#
+"""Time added to the QGIS startup by the plugin.
+
+When QGIS loads the plugin, plugin.py imports the provider module, that
+imports the algorithm module to define the algorithm. The modules then
+imported are collected from the sources: the module level imports of
+provider.py and, recursively, of the boundlessprovider modules it
+imports. The qgis and processing modules are left out, QGIS has
+already imported them. The modules imported by the first run are the
+imports inside the functions of these modules, and what they import in
+turn.
+
+Each set is imported in a fresh interpreter and timed. Without QGIS the
+boundlessprovider modules that import QGIS are not imported, only what
+they import: their own code only defines classes. The startup imports
+should not include NumPy or pygeodesy.
+
+    python -m boundlessprovider.benchmark.startup_time [repeat]
+"""
+from __future__ import print_function
+
+__copyright__ = '(C) Boundless Spatial Inc'
+
+# This will get replaced with a git SHA1 when you do a git archive
+__revision__ = '$Format:%H$'
+
+import ast
+import os
+import subprocess
+import sys
+
+PACKAGE = 'boundlessprovider'
+PACKAGE_FOLDER = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+# imported by QGIS before the plugins
+QGIS_PACKAGES = ('qgis', 'processing', 'PyQt4', 'PyQt5', 'sip')
+# should not be imported at startup
+HEAVY_PACKAGES = ('numpy', 'pygeodesy')
+DEFAULT_REPEAT = 5
+
+# imports the modules before -- untimed, then the others. Modules not
+# found are the alternatives of try/except imports for the other Python
+# version
+TIMING_SCRIPT = '''
+import sys
+import time
+def load(names):
+    for name in names:
+        try:
+            __import__(name)
+        except ImportError:
+            if name.startswith({package!r}):
+                raise
+separator = sys.argv.index('--')
+load(sys.argv[1:separator])
+start = time.time()
+load(sys.argv[separator + 1:])
+seconds = time.time() - start
+print(seconds)
+print(' '.join(name for name in {heavy!r} if name in sys.modules))
+'''.format(package=PACKAGE, heavy=HEAVY_PACKAGES)
+
+
+def _moduleFile(name):
+    path = os.path.join(PACKAGE_FOLDER, *name.split('.')[1:])
+    if os.path.isdir(path):
+        return os.path.join(path, '__init__.py')
+    return path + '.py'
+
+
+def _importedNames(node, inFunctions):
+    """Names of the modules imported by the statements of node: the ones
+    run when the module is imported, or the ones inside its functions.
+    """
+    names = []
+    for child in ast.iter_child_nodes(node):
+        isFunction = isinstance(child, (ast.FunctionDef, ast.Lambda))
+        if isinstance(child, ast.Import) and not inFunctions:
+            names.extend(alias.name for alias in child.names)
+        elif isinstance(child, ast.ImportFrom) and not inFunctions and child.level == 0:
+            names.append(child.module)
+        if isFunction and inFunctions:
+            names.extend(_importedNames(child, False))
+            names.extend(_importedNames(child, True))
+        elif not isFunction and not isinstance(child, (ast.Import, ast.ImportFrom)):
+            names.extend(_importedNames(child, inFunctions))
+    return names
+
+
+def importedModules(name, inFunctions=False):
+    """Names of the modules imported by a boundlessprovider module."""
+    with open(_moduleFile(name)) as sourceFile:
+        tree = ast.parse(sourceFile.read())
+    return _importedNames(tree, inFunctions)
+
+
+def moduleClosure(names):
+    """Return the sorted list of the modules imported by importing
+    names: the boundlessprovider ones with their imports, and the
+    others, without QGIS modules.
+    """
+    pending = list(names)
+    seen = set()
+    while pending:
+        name = pending.pop()
+        if name in seen or name.split('.')[0] in QGIS_PACKAGES:
+            continue
+        seen.add(name)
+        if name.split('.')[0] == PACKAGE:
+            pending.extend(importedModules(name))
+    return sorted(seen)
+
+
+def importsQgis(name):
+    return any(imported.split('.')[0] in QGIS_PACKAGES for imported in importedModules(name))
+
+
+def timeImports(imported, names, repeat):
+    """Return the best seconds of importing names in a fresh
+    interpreter that has already imported the imported ones, and the
+    heavy packages imported then.
+    """
+    environment = dict(os.environ)
+    environment['PYTHONPATH'] = os.pathsep.join(
+        [os.path.dirname(PACKAGE_FOLDER)] + [path for path in [environment.get('PYTHONPATH')] if path])
+    best = None
+    heavy = []
+    for _ in range(repeat):
+        output = subprocess.check_output([sys.executable, '-c', TIMING_SCRIPT] + imported + ['--'] + names, env=environment)
+        lines = output.decode('ascii').splitlines()
+        seconds = float(lines[0])
+        heavy = lines[1].split() if len(lines) > 1 else []
+        best = seconds if best is None else min(best, seconds)
+    return best, heavy
+
+
+def run(repeat=DEFAULT_REPEAT):
+    try:
+        import qgis.core
+        import processing
+        withQgis = True
+    except ImportError:
+        withQgis = False
+
+    startup = moduleClosure([PACKAGE + '.provider'])
+    firstRun = []
+    for name in startup:
+        if name.split('.')[0] == PACKAGE:
+            firstRun.extend(importedModules(name, inFunctions=True))
+    firstRun = [name for name in moduleClosure(firstRun) if name not in startup]
+
+    if withQgis:
+        imported = ['qgis.core', 'processing']
+    else:
+        startup = [name for name in startup if name.split('.')[0] != PACKAGE or not importsQgis(name)]
+        firstRun = [name for name in firstRun if name.split('.')[0] != PACKAGE or not importsQgis(name)]
+        imported = []
+
+    print('QGIS {}found'.format('' if withQgis else 'not '))
+    print('{:<12} {:>8} {:>10}  {}'.format('imports', 'modules', 'seconds', 'NumPy/pygeodesy'))
+    for label, names in (('startup', startup), ('first run', firstRun)):
+        seconds, heavy = timeImports(imported, names, repeat)
+        print('{:<12} {:>8} {:>10.4f}  {}'.format(label, len(names), seconds, ', '.join(heavy) or '-'))
+        imported = imported + names
+
+
+if __name__ == "__main__":
+    run(int(sys.argv[1]) if len(sys.argv) > 1 else DEFAULT_REPEAT)
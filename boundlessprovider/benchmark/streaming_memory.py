@@ -0,0 +1,105 @@
+# -*- coding: utf-8 -*-
+#
+# (c) 2017 Boundless Spatial Inc, http://boundlessgeo.com
+# This code is licensed under the GPL 2.0 license.
+#
+"""Peak memory and time of the chunked conversion pipeline by chunk size.
+
+A table of the given number of rows (id, DMS lon, DMS lat and a text
+column) is generated lazily, read a chunk at a time with
+streaming.chunks, converted to DD through a ConversionCache and written
+with csv writerows to the null device, as processAlgorithm does with
+the layer features and the table writer.
+
+Every chunk size runs in a new process, so that the peak resident set
+size (ru_maxrss) is its own. Chunk size 0 is the whole table at once.
+
+    python -m boundlessprovider.benchmark.streaming_memory [rows] [chunk size ...]
+"""
+from __future__ import print_function
+
+__copyright__ = '(C) Boundless Spatial Inc'
+
+# This will get replaced with a git SHA1 when you do a git archive
+__revision__ = '$Format:%H$'
+
+import csv
+import os
+import resource
+import subprocess
+import sys
+import time
+
+from boundlessprovider.coordinate_parser import columnsToWgs
+from boundlessprovider.coordinate_tokenizer import DMS_index
+from boundlessprovider.conversion_cache import ConversionCache
+from boundlessprovider.streaming import chunks
+
+DEFAULT_ROWS = 1000000
+DEFAULT_CHUNK_SIZES = [0, 100000, 10000, 1000]
+
+
+def generateRows(rows):
+    """Yield rows of a table with mostly distinct coordinates, ASCII
+    only for the Python 2 csv module.
+    """
+    for index in range(rows):
+        seconds = (index % 36000) / 10.0
+        yield [index,
+               u'{}:{}:{:.1f}W'.format(index % 180, (index // 180) % 60, seconds % 60),
+               u'{}:{}:{:.1f}N'.format(index % 90, (index // 90) % 60, seconds % 60),
+               u'row number {}'.format(index)]
+
+
+def convertPairs(pairs):
+    lon, lat, valid = columnsToWgs([x for x, y in pairs], [y for x, y in pairs], DMS_index)
+    return [(round(lon[index], 8), round(lat[index], 8)) if valid[index] else (None, None)
+            for index in range(len(pairs))]
+
+
+def convertTable(rows, chunkSize):
+    cache = ConversionCache()
+    with open(os.devnull, 'w') as output:
+        writer = csv.writer(output)
+        for chunk in chunks(generateRows(rows), chunkSize):
+            pairs = [(record[1], record[2]) for record in chunk]
+            results = cache.convertColumn(pairs, convertPairs)
+            for record, result in zip(chunk, results):
+                record.extend(result)
+            writer.writerows(chunk)
+
+
+def peakRss():
+    """Peak resident set size in MB. ru_maxrss is in KB on Linux and in
+    bytes on macOS.
+    """
+    peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    return peak / (1024.0 * 1024.0) if sys.platform == 'darwin' else peak / 1024.0
+
+
+def child(rows, chunkSize):
+    baseline = peakRss()
+    start = time.time()
+    convertTable(rows, chunkSize)
+    print(time.time() - start, baseline, peakRss())
+
+
+def run(rows=DEFAULT_ROWS, chunkSizes=DEFAULT_CHUNK_SIZES):
+    print('{} rows'.format(rows))
+    print('{:>10} {:>10} {:>12} {:>12} {:>12}'.format(
+        'chunk', 'seconds', 'rows/s', 'base MB', 'peak MB'))
+    for chunkSize in chunkSizes:
+        output = subprocess.check_output([
+            sys.executable, '-m', 'boundlessprovider.benchmark.streaming_memory',
+            '--child', str(rows), str(chunkSize)])
+        seconds, baseline, peak = [float(value) for value in output.split()]
+        print('{:>10} {:>10.2f} {:>12.0f} {:>12.1f} {:>12.1f}'.format(
+            chunkSize or 'all', seconds, rows / seconds, baseline, peak))
+
+
+if __name__ == "__main__":
+    if sys.argv[1:2] == ['--child']:
+        child(int(sys.argv[2]), int(sys.argv[3]))
+    else:
+        run(int(sys.argv[1]) if len(sys.argv) > 1 else DEFAULT_ROWS,
+            [int(value) for value in sys.argv[2:]] or DEFAULT_CHUNK_SIZES)
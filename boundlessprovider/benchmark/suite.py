@@ -0,0 +1,209 @@
+# -*- coding: utf-8 -*-
+#
+# (c) 2017 Boundless Spatial Inc, http://boundlessgeo.com
+# This code is licensed under the GPL 2.0 license.
+#
+"""Benchmark suite over the corpora of every source and destination
+format.
+
+For a corpus size and seed it measures:
+
+- parse/<source>: coordinate_parser.columnsToWgs of the corpus;
+- parse/Auto-<source>: the same with format detection, and
+  parse/Auto-mixed on a corpus of all the formats in runs of 100;
+- format/<destination>: converter.formatWgs of the parsed DD points;
+- convert/<source>-><destination>: converter.convertPairs through a
+  ConversionCache, as processAlgorithm does, for the 25 pairs.
+
+Each entry has the best throughput (values/s) over the repeats, the
+number of valid values and, with Python 3, the peak memory allocated
+(tracemalloc, numpy arrays included).
+
+Results are saved as JSON with --save and compared with a previous
+file with --compare: an entry is a regression when its throughput is
+lower by more than --threshold, its peak memory is higher by more than
+--threshold or its number of valid values changed. The exit status is
+1 if there are regressions.
+
+    python -m boundlessprovider.benchmark.suite --size 20000 --save before.json
+    python -m boundlessprovider.benchmark.suite --size 20000 --compare before.json
+"""
+from __future__ import print_function
+
+__copyright__ = '(C) Boundless Spatial Inc'
+
+# This will get replaced with a git SHA1 when you do a git archive
+__revision__ = '$Format:%H$'
+
+import argparse
+import json
+import platform
+import sys
+import time
+import timeit
+
+try:
+    import tracemalloc
+except ImportError:
+    tracemalloc = None
+
+import numpy
+
+from boundlessprovider.benchmark.corpora import (
+    generateCorpus,
+    generateMixedCorpus,
+    FORMAT_NAMES,
+    DEFAULT_SEED,
+)
+from boundlessprovider.conversion_cache import ConversionCache
+from boundlessprovider.converter import ConversionParameters, convertPairs, formatWgs, DD_index
+from boundlessprovider.coordinate_parser import columnsToWgs, AUTO_index
+
+DEFAULT_SIZE = 20000
+DEFAULT_REPEAT = 3
+DEFAULT_THRESHOLD = 0.15
+SINGLE_FIELD_FORMAT = u'{X} {Y}'
+
+
+def measure(function, size, repeat):
+    """Return the entry of a stage: best values/s over repeat runs and
+    the peak memory of a run in KB, None without tracemalloc.
+    """
+    seconds = min(timeit.repeat(function, number=1, repeat=repeat))
+    entry = {'rate': size / seconds, 'peakKB': None}
+    if tracemalloc is not None:
+        tracemalloc.start()
+        function()
+        entry['peakKB'] = tracemalloc.get_traced_memory()[1] / 1024.0
+        tracemalloc.stop()
+    return entry
+
+
+def parameters(sourceFormat, destinationFormat, hasY):
+    return ConversionParameters(sourceFormat, destinationFormat, None,
+                                SINGLE_FIELD_FORMAT, True, hasY)
+
+
+def run(size=DEFAULT_SIZE, seed=DEFAULT_SEED, repeat=DEFAULT_REPEAT, log=print):
+    """Run the suite and return the results dictionary."""
+    corpora = [generateCorpus(formatIndex, size, seed) for formatIndex in range(len(FORMAT_NAMES))]
+    entries = {}
+
+    for sourceFormat, (xValues, yValues) in enumerate(corpora):
+        name = 'parse/{}'.format(FORMAT_NAMES[sourceFormat])
+        entry = measure(lambda: columnsToWgs(xValues, yValues, sourceFormat), size, repeat)
+        entry['valid'] = int(columnsToWgs(xValues, yValues, sourceFormat)[2].sum())
+        entries[name] = entry
+        log(describe(name, entry))
+
+    autoCorpora = [('Auto-' + FORMAT_NAMES[sourceFormat], corpus) for sourceFormat, corpus in enumerate(corpora)]
+    autoCorpora.append(('Auto-mixed', generateMixedCorpus(size, seed)))
+    for autoName, (xValues, yValues) in autoCorpora:
+        name = 'parse/{}'.format(autoName)
+        entry = measure(lambda: columnsToWgs(xValues, yValues, AUTO_index), size, repeat)
+        entry['valid'] = int(columnsToWgs(xValues, yValues, AUTO_index)[2].sum())
+        entries[name] = entry
+        log(describe(name, entry))
+
+    lon, lat, valid = columnsToWgs(*corpora[DD_index], sourceFormatIndex=DD_index)
+    for destinationFormat, destinationName in enumerate(FORMAT_NAMES):
+        name = 'format/{}'.format(destinationName)
+        destination = parameters(DD_index, destinationFormat, True)
+        entry = measure(lambda: formatWgs(lon, lat, valid, destination), size, repeat)
+        entry['valid'] = sum(1 for result in formatWgs(lon, lat, valid, destination) if result[0])
+        entries[name] = entry
+        log(describe(name, entry))
+
+    for sourceFormat, (xValues, yValues) in enumerate(corpora):
+        pairs = list(zip(xValues, yValues or [None] * size))
+        for destinationFormat, destinationName in enumerate(FORMAT_NAMES):
+            name = 'convert/{}->{}'.format(FORMAT_NAMES[sourceFormat], destinationName)
+            conversion = parameters(sourceFormat, destinationFormat, yValues is not None)
+
+            def convert():
+                return ConversionCache(0).convertColumn(
+                    pairs, lambda distinctPairs: convertPairs(distinctPairs, conversion))
+            entry = measure(convert, size, repeat)
+            entry['valid'] = sum(1 for result in convert() if result[0])
+            entries[name] = entry
+            log(describe(name, entry))
+
+    return {
+        'meta': {
+            'size': size,
+            'seed': seed,
+            'repeat': repeat,
+            'python': platform.python_version(),
+            'numpy': numpy.__version__,
+            'machine': platform.machine(),
+            'platform': platform.platform(),
+            'time': time.strftime('%Y-%m-%dT%H:%M:%S'),
+        },
+        'entries': entries,
+    }
+
+
+def describe(name, entry):
+    peak = '{:>10.0f}'.format(entry['peakKB']) if entry['peakKB'] is not None else '{:>10}'.format('-')
+    return '{:<18} {:>12.0f} values/s {} KB {:>8} valid'.format(name, entry['rate'], peak, entry['valid'])
+
+
+def compare(results, baseline, threshold=DEFAULT_THRESHOLD, log=print):
+    """Compare results with baseline results. Return the list of the
+    regression messages.
+    """
+    regressions = []
+    for key in ('size', 'seed'):
+        if results['meta'][key] != baseline['meta'][key]:
+            regressions.append('different {}: {} and {}'.format(
+                key, results['meta'][key], baseline['meta'][key]))
+    if regressions:
+        return regressions
+
+    for name in sorted(baseline['entries']):
+        before = baseline['entries'][name]
+        after = results['entries'].get(name)
+        if after is None:
+            regressions.append('{}: missing'.format(name))
+            continue
+        change = after['rate'] / before['rate'] - 1
+        log('{:<18} {:>+8.1%}'.format(name, change))
+        if change < -threshold:
+            regressions.append('{}: throughput {:+.1%}'.format(name, change))
+        if before['peakKB'] and after['peakKB'] and after['peakKB'] > before['peakKB'] * (1 + threshold):
+            regressions.append('{}: peak memory {:.0f} KB, was {:.0f} KB'.format(
+                name, after['peakKB'], before['peakKB']))
+        if after['valid'] != before['valid']:
+            regressions.append('{}: {} valid values, were {}'.format(name, after['valid'], before['valid']))
+    return regressions
+
+
+def main(arguments=None):
+    parser = argparse.ArgumentParser(description='Coordinate conversion benchmark suite')
+    parser.add_argument('--size', type=int, default=DEFAULT_SIZE, help='values per corpus')
+    parser.add_argument('--seed', type=int, default=DEFAULT_SEED, help='corpora seed')
+    parser.add_argument('--repeat', type=int, default=DEFAULT_REPEAT, help='runs per measure, the best is kept')
+    parser.add_argument('--save', help='JSON file to save the results to')
+    parser.add_argument('--compare', help='JSON file of the results to compare with')
+    parser.add_argument('--threshold', type=float, default=DEFAULT_THRESHOLD,
+                        help='relative change that is a regression')
+    options = parser.parse_args(arguments)
+
+    results = run(options.size, options.seed, options.repeat)
+    if options.save:
+        with open(options.save, 'w') as resultsFile:
+            json.dump(results, resultsFile, indent=1, sort_keys=True)
+    if options.compare:
+        with open(options.compare) as baselineFile:
+            baseline = json.load(baselineFile)
+        regressions = compare(results, baseline, options.threshold)
+        for regression in regressions:
+            print('REGRESSION {}'.format(regression))
+        if regressions:
+            return 1
+        print('NO REGRESSIONS')
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
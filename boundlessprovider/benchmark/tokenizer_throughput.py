@@ -0,0 +1,119 @@
+# -*- coding: utf-8 -*-
+#
+# (c) 2017 Boundless Spatial Inc, http://boundlessgeo.com
+# This code is licensed under the GPL 2.0 license.
+#
+"""Throughput of coordinate_tokenizer compared with the geodesy_regex
+patterns, on the geodesy_regex test fixtures, copied here: the module
+has Python 2 print statements.
+
+Each fixture list is repeated to a column of the given size and parsed:
+
+- regexp: what the parser did before the tokenizer, match, check that
+  the whole value matched and read the numbers with findall;
+- tokenizer: coordinate_tokenizer.toDegrees on each value;
+- column: coordinate_parser.parseColumn on the whole column.
+
+    python -m boundlessprovider.benchmark.tokenizer_throughput [size]
+"""
+from __future__ import print_function
+
+__copyright__ = '(C) Boundless Spatial Inc'
+
+# This will get replaced with a git SHA1 when you do a git archive
+__revision__ = '$Format:%H$'
+
+import re
+import sys
+import timeit
+
+from boundlessprovider.coordinate_parser import parseColumn
+from boundlessprovider.coordinate_tokenizer import (
+    toDegrees,
+    DD_index,
+    DMS_index,
+)
+
+NUMBERS_REGEXP = re.compile(r'\d+(?:\.\d*)?')
+
+# test fixtures and patterns of geodesy_regex
+DMS_LAT_MATCHES = ['-12/23/59.999999999999999', '-1/2/1.000234', '-1:2:12.000234', '0 59 0.22', '60/34/34']
+DMS_LAT_MATCHES_NEW = ['-12º23\'59.999999999999999"', '-1º2\'1.000234"', '-1º2\'12.000234"', '0º 59\' 0.22"', '60º34\'34"']
+DMS_LAT_FAILS = ['20/60/0', '80/60/1.11', '80/59/70', '90/59/0', '86/60/1']
+DMS_LON_MATCHES = ['-179/59/0.23', '127/12/12.223', '-180/0/0', '179:59:59.99999999', '-59:13:58.22212345',
+                   '0:0:2.3', '127 12 12.333', '180 0 0', '-0 0 0.00001']
+DMS_LON_FAILS = ['123:60:59.99999999', '-180:12:0', '180:60:0', '700 50 50.11', '23/79/22.22', '0 60 2.2', '0 60 0']
+DECIMAL_MATCHES = ["-22.311", "-12", "-170", "28.324125", "179.0111111111111", "13", "-100.0"]
+DECIMAL_FAILS = ["323.312.0", "ABC", "abc", "2.a23", "e2.31", "123-213", "-123e", "180.1", "-190", "-200.1"]
+
+DMS_LAT_REGEXP = r'([+-])?(((90)\s*(\/|\:|\s|\º)\s*((0*)\s*(\/|\:|\s|\'))?\s*((0*)(\.(0*))?(\")?)?)|([1-8]?\d)(\/|\:|\s|\º)\s*([1-5]?\d)(\/|\:|\s|\')\s*([1-5]?\d(\.(\d*))?)(\")?)\s*([nNsS])?'
+DMS_LON_REGEXP = r'([-+])?\s*(((180)\s*(\/|\:|\s|\º)\s*((0*)\s*(\/|\:|\s|\'))?\s*((0*)(\.(0*))?(\")?)?)|(([1]?[1-7]\d)|\d?\d)\s*(\/|\:|\s|\º)\s*([1-5]?\d)\s*(\/|\:|\s|\')\s*([1-5]?\d(\.(\d*))?)\s*(\")?)\s*([eEwW])?'
+DD_LON_REGEXP = r'([+-])?(((180)(\.(0*))?)|(([1]?[0-7]\d)|(\d?\d))(\.(\d+))?)\s*(\º)?\s*([eEwW])?'
+
+# (name, format index, isLat, regexp, values)
+FIXTURES = [
+    ('dmsLatMatches', DMS_index, True, DMS_LAT_REGEXP, DMS_LAT_MATCHES),
+    ('dmsLatMatches_new', DMS_index, True, DMS_LAT_REGEXP, DMS_LAT_MATCHES_NEW),
+    ('dmsLatFails', DMS_index, True, DMS_LAT_REGEXP, DMS_LAT_FAILS),
+    ('dmsLonMatches', DMS_index, False, DMS_LON_REGEXP, DMS_LON_MATCHES),
+    ('dmsLonFails', DMS_index, False, DMS_LON_REGEXP, DMS_LON_FAILS),
+    ('decimalMatches', DD_index, False, DD_LON_REGEXP, DECIMAL_MATCHES),
+    ('decimalFails', DD_index, False, DD_LON_REGEXP, DECIMAL_FAILS),
+]
+
+
+def asText(values):
+    return [value.decode('utf-8') if isinstance(value, bytes) else value
+            for value in values]
+
+
+def regexParse(expression, values):
+    match = expression.match
+    findall = NUMBERS_REGEXP.findall
+    hemisphereGroup = expression.groups
+    result = []
+    for value in values:
+        matched = match(value)
+        if not matched or matched.group(0) != value:
+            result.append(None)
+            continue
+        signItem = matched.group(1)
+        hemisphereItem = matched.group(hemisphereGroup)
+        if signItem and hemisphereItem:
+            result.append(None)
+            continue
+        numbers = [float(number) for number in findall(value)] + [0.0, 0.0]
+        degrees = numbers[0] + numbers[1] / 60.0 + numbers[2] / 3600.0
+        if signItem == '-' or (hemisphereItem and hemisphereItem in 'sSwW'):
+            degrees = -degrees
+        result.append(degrees)
+    return result
+
+
+def tokenizerParse(sourceFormatIndex, isLat, values):
+    return [toDegrees(value, sourceFormatIndex, isLat) for value in values]
+
+
+def best(function, repeat=3):
+    return min(timeit.repeat(function, number=1, repeat=repeat))
+
+
+def run(size=100000):
+    print('{:<20} {:>12} {:>12} {:>12} {:>10}'.format(
+        'values/s', 'regexp', 'tokenizer', 'column', 'speedup'))
+    for name, sourceFormatIndex, isLat, pattern, values in FIXTURES:
+        values = asText(values)
+        column = (values * (size // len(values) + 1))[:size]
+        if isinstance(pattern, bytes):
+            pattern = pattern.decode('utf-8')
+        expression = re.compile(pattern)
+        regexTime = best(lambda: regexParse(expression, column))
+        tokenizerTime = best(lambda: tokenizerParse(sourceFormatIndex, isLat, column))
+        columnTime = best(lambda: parseColumn(column, sourceFormatIndex, isLat))
+        print('{:<20} {:>12.0f} {:>12.0f} {:>12.0f} {:>9.1f}x'.format(
+            name, size / regexTime, size / tokenizerTime, size / columnTime,
+            regexTime / columnTime))
+
+
+if __name__ == "__main__":
+    run(int(sys.argv[1]) if len(sys.argv) > 1 else 100000)
@@ -0,0 +1,284 @@
+# -*- coding: utf-8 -*-
+#
+# (c) 2017 Boundless Spatial Inc, http://boundlessgeo.com
+# This code is licensed under the GPL 2.0 license.
+#
+"""Bulk MGRS/UTM conversion over NumPy arrays.
+
+pygeodesy builds a Mgrs, an Utm and a LatLon object for every value and
+derives the projection constants each time. Here the transverse
+Mercator constants are computed once and the inverse and forward
+projections run on whole arrays: zone and hemisphere are arrays of the
+same length, so rows of every zone are converted in the same pass.
+
+The projection is the 6th order Krüger series (Karney 2011), the same
+used by pygeodesy. Compared with pygeodesy 17.x+ over a global grid
+the results agree within TOLERANCE_DEGREES (inverse) and
+TOLERANCE_METERS (forward), see test_bulk_utm.
+
+Zones, bands and the texts of the references are looked up in the
+precomputed tables of grid_tables. Only the reading of the strings is
+done value by value. References that are not in the usual forms are
+reported as not parsed, so that the caller can fall back to pygeodesy.
+"""
+__copyright__ = '(C) Boundless Spatial Inc'
+
+# This will get replaced with a git SHA1 when you do a git archive
+__revision__ = '$Format:%H$'
+
+import re
+
+import numpy
+
+from boundlessprovider.grid_tables import (
+    utmZones,
+    UTM_LAT_MIN,
+    BANDS,
+    BAND_N,
+    BAND_W,
+    COLUMN_LETTERS,
+    ROW_LETTERS,
+)
+
+# WGS84 ellipsoid and UTM projection parameters
+WGS84_A = 6378137.0
+WGS84_F = 1 / 298.257223563
+UTM_K0 = 0.9996
+FALSE_EASTING = 500e3
+FALSE_NORTHING = 10000e3
+
+TOLERANCE_DEGREES = 1e-9
+TOLERANCE_METERS = 1e-3
+
+# zone, band, 100 km square letters and easting/northing digits of a
+# MGRS reference once spaces are removed, e.g. 31UDQ4825111932
+MGRS_REGEXP = re.compile(r'(\d{1,2})([C-HJ-NP-X])([A-HJ-NP-Z])([A-HJ-NP-V])(\d{2,10})$', re.IGNORECASE)
+UTM_ZONE_REGEXP = re.compile(r'(\d{1,2})([C-HJ-NP-X])?$', re.IGNORECASE)
+
+
+class TransverseMercator(object):
+    """Krüger series transverse Mercator of an ellipsoid, with all the
+    constants computed once.
+    """
+
+    def __init__(self, a=WGS84_A, f=WGS84_F, k0=UTM_K0):
+        n = f / (2 - f)
+        n2 = n * n
+        n3 = n2 * n
+        n4 = n3 * n
+        n5 = n4 * n
+        n6 = n5 * n
+        self.e = numpy.sqrt(f * (2 - f))
+        self.e2 = f * (2 - f)
+        # rectifying radius by the scale factor
+        self.k0A = k0 * a / (1 + n) * (1 + n2 / 4 + n4 / 64 + n6 / 256)
+        self.alpha = (
+            n / 2 - 2 * n2 / 3 + 5 * n3 / 16 + 41 * n4 / 180 - 127 * n5 / 288 + 7891037 * n6 / 37800,
+            13 * n2 / 48 - 3 * n3 / 5 + 557 * n4 / 1440 + 281 * n5 / 630 - 1983433 * n6 / 1935360,
+            61 * n3 / 240 - 103 * n4 / 140 + 15061 * n5 / 26880 + 167603 * n6 / 181440,
+            49561 * n4 / 161280 - 179 * n5 / 168 + 6601661 * n6 / 7257600,
+            34729 * n5 / 80640 - 3418889 * n6 / 1995840,
+            212378941 * n6 / 319334400,
+        )
+        self.beta = (
+            n / 2 - 2 * n2 / 3 + 37 * n3 / 96 - n4 / 360 - 81 * n5 / 512 + 96199 * n6 / 604800,
+            n2 / 48 + n3 / 15 - 437 * n4 / 1440 + 46 * n5 / 105 - 1118711 * n6 / 3870720,
+            17 * n3 / 480 - 37 * n4 / 840 - 209 * n5 / 4480 + 5569 * n6 / 90720,
+            4397 * n4 / 161280 - 11 * n5 / 504 - 830251 * n6 / 7257600,
+            4583 * n5 / 161280 - 108847 * n6 / 3991680,
+            20648693 * n6 / 638668800,
+        )
+
+    def _conformal(self, tau):
+        """Conformal latitude tangent of the latitude tangent tau."""
+        sigma = numpy.sinh(self.e * numpy.arctanh(self.e * tau / numpy.hypot(1.0, tau)))
+        return tau * numpy.hypot(1.0, sigma) - sigma * numpy.hypot(1.0, tau)
+
+    def forward(self, lat, lon, lon0):
+        """Project degrees arrays to (x, y) meters from the central
+        meridian lon0 and the equator.
+        """
+        lam = numpy.radians(lon - lon0)
+        taup = self._conformal(numpy.tan(numpy.radians(lat)))
+        cosLam = numpy.cos(lam)
+        xip = numpy.arctan2(taup, cosLam)
+        etap = numpy.arcsinh(numpy.sin(lam) / numpy.hypot(taup, cosLam))
+        xi = xip.copy()
+        eta = etap.copy()
+        for j, alpha in enumerate(self.alpha, 1):
+            xi += alpha * numpy.sin(2 * j * xip) * numpy.cosh(2 * j * etap)
+            eta += alpha * numpy.cos(2 * j * xip) * numpy.sinh(2 * j * etap)
+        return self.k0A * eta, self.k0A * xi
+
+    def inverse(self, x, y, lon0):
+        """Unproject (x, y) meters arrays from the central meridian lon0
+        and the equator to (lat, lon) degrees.
+        """
+        xi = y / self.k0A
+        eta = x / self.k0A
+        xip = xi.copy()
+        etap = eta.copy()
+        for j, beta in enumerate(self.beta, 1):
+            xip -= beta * numpy.sin(2 * j * xi) * numpy.cosh(2 * j * eta)
+            etap -= beta * numpy.cos(2 * j * xi) * numpy.sinh(2 * j * eta)
+        sinhEtap = numpy.sinh(etap)
+        cosXip = numpy.cos(xip)
+        taup = numpy.sin(xip) / numpy.hypot(sinhEtap, cosXip)
+        lam = numpy.arctan2(sinhEtap, cosXip)
+
+        # Newton iterations for the latitude tangent
+        tau = taup.copy()
+        e2m = 1 - self.e2
+        for _ in range(8):
+            taui = self._conformal(tau)
+            delta = ((taup - taui) / numpy.hypot(1.0, taui) *
+                     (1 + e2m * tau * tau) / (e2m * numpy.hypot(1.0, tau)))
+            tau += delta
+            if not numpy.any(numpy.abs(delta) > 1e-12):
+                break
+        return numpy.degrees(numpy.arctan(tau)), lon0 + numpy.degrees(lam)
+
+
+WGS84_TM = TransverseMercator()
+
+
+def centralMeridian(zones):
+    return (numpy.asarray(zones) - 1) * 6.0 - 180.0 + 3.0
+
+
+def _bandBottomNorthings(projection):
+    """Northing of the bottom of each band at longitude 0, truncated to
+    the 100 km square, as MGRS uses it to place the 2000 km row cycle.
+    """
+    latitudes = UTM_LAT_MIN + 8.0 * numpy.arange(len(BANDS))
+    x, y = projection.forward(latitudes, numpy.zeros(len(BANDS)), centralMeridian(31))
+    y = numpy.where(latitudes < 0, y + FALSE_NORTHING, y)
+    return numpy.floor(y / 100e3) * 100e3
+
+BAND_BOTTOM_NORTHINGS = _bandBottomNorthings(WGS84_TM)
+
+
+def utmToLatLon(zones, south, eastings, northings, projection=WGS84_TM):
+    """Convert UTM arrays (zone number, True for southern hemisphere,
+    easting, northing) to (lat, lon) degrees arrays. Longitudes past
+    the antimeridian, of eastings out of zones 1 and 60, are wrapped
+    into [-180, 180).
+    """
+    x = numpy.asarray(eastings, dtype=numpy.float64) - FALSE_EASTING
+    y = numpy.asarray(northings, dtype=numpy.float64) - numpy.where(south, FALSE_NORTHING, 0.0)
+    lat, lon = projection.inverse(x, y, centralMeridian(zones))
+    return lat, (lon + 180.0) % 360.0 - 180.0
+
+
+def latLonToUtm(lat, lon, projection=WGS84_TM):
+    """Convert lat/lon degrees arrays to UTM arrays (zones, bands,
+    south, eastings, northings). Points out of the UTM latitude range
+    have zone -1 and NaN easting and northing.
+    """
+    lat = numpy.asarray(lat, dtype=numpy.float64)
+    lon = numpy.asarray(lon, dtype=numpy.float64)
+    zones, bands = utmZones(lat, lon)
+    x, y = projection.forward(lat, lon, centralMeridian(zones))
+    south = lat < 0
+    eastings = x + FALSE_EASTING
+    northings = numpy.where(south, y + FALSE_NORTHING, y)
+    outOfRange = zones < 0
+    eastings[outOfRange] = numpy.nan
+    northings[outOfRange] = numpy.nan
+    return zones, bands, south, eastings, northings
+
+
+def mgrsToUtm(zones, bands, columns, rows, eastings, northings):
+    """Convert MGRS arrays (zone, band index in BANDS, 100 km column and
+    row letter indexes, easting and northing in the square) to UTM
+    arrays (south, eastings, northings).
+    """
+    eastings = (numpy.asarray(columns) + 1) * 100e3 + eastings
+    northings = numpy.asarray(rows) * 100e3 + northings
+    bands = numpy.asarray(bands)
+    # the row letters repeat every 2000 km: add enough 2000 km cycles
+    # to get into the band
+    cycles = (BAND_BOTTOM_NORTHINGS[bands] - northings) / 2000e3
+    cycles = numpy.where(cycles > 0, numpy.floor(cycles) + 1, 0)
+    cycles = numpy.minimum(cycles, numpy.where(bands == BAND_W, 3, 4))
+    return bands < BAND_N, eastings, northings + cycles * 2000e3
+
+
+def parseMgrsColumn(values):
+    """Read MGRS references as 31U DQ 48251 11932 or 31UDQ4825111932.
+
+    Return the arrays (zones, bands, south, eastings, northings, parsed)
+    where parsed is False for the values that are empty or not in one of
+    these forms, or have letters that do not exist in the zone.
+    """
+    count = len(values)
+    parts = numpy.zeros((count, 6), dtype=numpy.float64)
+    parsed = numpy.zeros(count, dtype=bool)
+    match = MGRS_REGEXP.match
+    for index, value in enumerate(values):
+        if not value:
+            continue
+        matched = match(''.join(value.split()))
+        if not matched:
+            continue
+        zone, band, column, row, digits = matched.groups()
+        zone = int(zone)
+        if not 1 <= zone <= 60 or len(digits) % 2:
+            continue
+        column = COLUMN_LETTERS[(zone - 1) % 3].find(column.upper())
+        row = ROW_LETTERS[(zone - 1) % 2].find(row.upper())
+        if column < 0 or row < 0:
+            continue
+        half = len(digits) // 2
+        scale = 10 ** (5 - half)
+        parts[index] = (zone, BANDS.index(band.upper()), column, row,
+                        int(digits[:half]) * scale, int(digits[half:]) * scale)
+        parsed[index] = True
+
+    zones = parts[:, 0].astype(numpy.int64)
+    bands = parts[:, 1].astype(numpy.int64)
+    south, eastings, northings = mgrsToUtm(zones, bands, parts[:, 2], parts[:, 3],
+                                           parts[:, 4], parts[:, 5])
+    return zones, bands, south, eastings, northings, parsed
+
+
+def parseUtmColumn(values):
+    """Read UTM references as 31 N 448251 5411932, the zone possibly
+    followed by the band letter and the parts possibly separated by
+    commas.
+
+    Return the arrays (zones, south, eastings, northings, parsed) where
+    parsed is False for the values that are empty or not in this form.
+    """
+    count = len(values)
+    zones = numpy.zeros(count, dtype=numpy.int64)
+    south = numpy.zeros(count, dtype=bool)
+    eastings = numpy.zeros(count, dtype=numpy.float64)
+    northings = numpy.zeros(count, dtype=numpy.float64)
+    parsed = numpy.zeros(count, dtype=bool)
+    for index, value in enumerate(values):
+        if not value:
+            continue
+        tokens = value.replace(',', ' ').split()
+        if len(tokens) != 4:
+            continue
+        zone, hemisphere, easting, northing = tokens
+        matched = UTM_ZONE_REGEXP.match(zone)
+        hemisphere = hemisphere.upper()
+        if not matched or hemisphere not in ('N', 'S'):
+            continue
+        try:
+            easting = float(easting)
+            northing = float(northing)
+        except ValueError:
+            continue
+        zone = int(matched.group(1))
+        if not 1 <= zone <= 60 or easting <= 0 or northing < 0:
+            continue
+        zones[index] = zone
+        south[index] = hemisphere == 'S'
+        eastings[index] = easting
+        northings[index] = northing
+        parsed[index] = True
+    return zones, south, eastings, northings, parsed
+
@@ -0,0 +1,123 @@
+# -*- coding: utf-8 -*-
+#
+# (c) 2017 Boundless Spatial Inc, http://boundlessgeo.com
+# This code is licensed under the GPL 2.0 license.
+#
+"""Checkpoint journal of resumable conversion jobs.
+
+After each chunk is written, a job commits a small JSON journal with
+the number of rows done, the last feature id and chunk, and the path
+and size of each output file. A later run of a job with the same hash
+(jobHash of its source and parameters) loads the journal, truncates the
+outputs to the committed sizes, dropping a chunk that was being written
+when the job died, and goes on appending after the committed rows.
+
+The journal is replaced atomically, so it is always the one of the last
+committed chunk.
+"""
+__copyright__ = '(C) Boundless Spatial Inc'
+
+# This will get replaced with a git SHA1 when you do a git archive
+__revision__ = '$Format:%H$'
+
+import hashlib
+import json
+import os
+
+JOURNAL_VERSION = 1
+
+
+def jobHash(*values):
+    """Hash of the JSON serializable values that define a job."""
+    text = json.dumps(values, sort_keys=True, ensure_ascii=True)
+    return hashlib.sha1(text.encode('ascii')).hexdigest()
+
+
+def conversionHash(source, fieldNames, fieldPairs, sourceFields, parameters, spatialKey, maxProjectionError, *values):
+    """jobHash of the conversion of the table source to the fieldNames
+    output fields. fieldPairs are the names and sourceFields the (x, y)
+    indexes of the source field pairs that are read, parameters the
+    ConversionParameters and values any other parameter that changes
+    the outputs.
+    """
+    return jobHash(source, fieldNames, fieldPairs, sourceFields, list(parameters), spatialKey, maxProjectionError, *values)
+
+
+def _replace(source, destination):
+    try:
+        os.replace(source, destination)
+    except AttributeError:
+        # Python 2, rename does not overwrite on Windows
+        if os.path.exists(destination):
+            os.remove(destination)
+        os.rename(source, destination)
+
+
+def truncate(path, size):
+    """Truncate a file to size bytes."""
+    with open(path, 'r+b') as stream:
+        stream.truncate(size)
+
+
+class Checkpoint(object):
+    """Journal file of a job. state is the last committed state, a dict
+    with hash, rows, featureId, chunk, outputs ({name: [path, size]})
+    and any extra counter of the job, or None.
+    """
+
+    def __init__(self, path, hashValue):
+        self.path = path
+        self.hash = hashValue
+        self.state = None
+
+    def load(self):
+        """Load the committed state of the job, if any and if its
+        outputs are still there, at least as large as committed.
+        Return the state or None.
+        """
+        self.state = None
+        try:
+            with open(self.path, 'r') as stream:
+                state = json.load(stream)
+        except (IOError, OSError, ValueError):
+            return None
+        if state.get('version') != JOURNAL_VERSION or state.get('hash') != self.hash:
+            return None
+        for path, size in state['outputs'].values():
+            if not os.path.exists(path) or os.path.getsize(path) < size:
+                return None
+        self.state = state
+        return state
+
+    def truncateOutputs(self):
+        """Drop what was written to the outputs after the commit."""
+        for path, size in self.state['outputs'].values():
+            truncate(path, size)
+
+    def commit(self, rows, featureId, chunk, outputs, **counters):
+        """Commit the state after the chunk is written. outputs is a
+        {name: path} dictionary of the output files, closed.
+        """
+        state = dict(counters)
+        state.update({
+            'version': JOURNAL_VERSION,
+            'hash': self.hash,
+            'rows': rows,
+            'featureId': featureId,
+            'chunk': chunk,
+            'outputs': dict((name, [path, os.path.getsize(path)]) for name, path in outputs.items()),
+        })
+        directory = os.path.dirname(self.path)
+        if directory and not os.path.isdir(directory):
+            os.makedirs(directory)
+        temporary = self.path + '.tmp'
+        with open(temporary, 'w') as stream:
+            json.dump(state, stream)
+        _replace(temporary, self.path)
+        self.state = state
+
+    def clear(self):
+        """Remove the journal of a finished job."""
+        if os.path.exists(self.path):
+            os.remove(self.path)
+        self.state = None
@@ -0,0 +1,444 @@
+# -*- coding: utf-8 -*-
+#
+# (c) 2017 Boundless Spatial Inc, http://boundlessgeo.com
+# This code is licensed under the GPL 2.0 license.
+#
+"""Command line coordinate format conversion of delimited files.
+
+Runs the conversion engine without QGIS. The input file is streamed a
+chunk of rows at a time and written to the output file with the
+converted columns appended, as the Processing algorithm does with the
+features of a table:
+
+    python -m boundlessprovider.cli points.csv converted.csv \\
+        --delimiter ";" --x-field LON --y-field LAT \\
+        --source-format DMS --destination-format DD --output-x LON_DD --output-y LAT_DD
+
+The input is memory mapped and only the selected fields are decoded,
+the other columns are copied as they are (see mapped_reader); with
+--no-mmap rows are read and written again by the csv module. Fields
+are selected by name in the header, or by 0 based index with
+--no-header. The exit status is 1 if a value is malformed, after the
+rows before it are written (none with --sort, that writes the rows at
+the end), and 2 for invalid arguments.
+
+With --rejects the conversion goes on past malformed values: their
+rows get empty destination values and are written to the rejects file,
+with the row number, the source values and the reason, up to
+--max-rejects rows.
+
+With --extra-pairs and --extra-destinations other source field pairs
+and destination formats are converted in the same scan, each value is
+parsed once (see engine):
+
+    --extra-pairs "LON2,LAT2" --extra-destinations "MGRS:,,MGRS;DMS:LON_DMS,LAT_DMS"
+
+writes LON_DD, LAT_DD, MGRS, LON_DMS and LAT_DMS of LON and LAT, then
+LON_DD_2, LAT_DD_2, MGRS_2, LON_DMS_2 and LAT_DMS_2 of LON2 and LAT2.
+
+With --source-datum ED50, NAD27 or OSGB36 the source values are of
+that datum, MGRS and UTM references on its ellipsoid, and are shifted
+to WGS84 before they are formatted (see datum_shift).
+
+With --spatial-key a Hilbert index or a geohash of the converted point
+(of the first source field pair) is written to --key-field, and/or the
+rows are written sorted by it with --sort, spilling runs of
+--sort-run-size rows to temporary files (see external_sort).
+
+With --pipeline-stages the reader, the converter and the writer run in
+threads of their own, with at most --queue-depth chunks between them
+(see pipeline).
+"""
+from __future__ import print_function
+
+__copyright__ = '(C) Boundless Spatial Inc'
+
+# This will get replaced with a git SHA1 when you do a git archive
+__revision__ = '$Format:%H$'
+
+import argparse
+import csv
+import io
+import sys
+
+from boundlessprovider.conversion_cache import DEFAULT_CACHE_SIZE
+from boundlessprovider.converter import ConversionParameters, CUSTOM_COORD_FORMAT
+from boundlessprovider.engine import (
+    ConversionEngine,
+    FORMAT_NAMES,
+    malformedValue,
+    outputColumns,
+    parseDestinations,
+    parseFieldPairs,
+    rejectReason,
+    REJECT_FIELDS,
+)
+from boundlessprovider.external_sort import ExternalSorter, DEFAULT_RUN_SIZE
+from boundlessprovider.format_detection import MGRS_index, UTM_index
+from boundlessprovider.formats import WGS84_DATUM_index, DATUM_NAMES
+from boundlessprovider.instrumentation import StageTimer, NULL_TIMER
+from boundlessprovider.mapped_reader import MappedDelimitedReader, MappedDelimitedWriter, cellText
+from boundlessprovider.parallel import workerCount
+from boundlessprovider.pipeline import Pipeline, DEFAULT_QUEUE_DEPTH
+from boundlessprovider.spatial_keys import spatialKeys, NO_KEY_index, HILBERT_index
+from boundlessprovider.streaming import chunks, DEFAULT_CHUNK_SIZE
+
+PY2 = sys.version_info[0] == 2
+SINGLE_FIELD_COORD_FORMAT = u'{X} {Y}'
+# by index of spatial_keys
+SPATIAL_KEY_NAMES = ['None', 'Hilbert', 'Geohash']
+
+
+def _text(value):
+    """Command line arguments are bytes with Python 2."""
+    if isinstance(value, bytes):
+        return value.decode(sys.getfilesystemencoding() or 'utf-8')
+    return value
+
+
+def printError(message):
+    """Print a text message to stderr, encoded with Python 2."""
+    if PY2:
+        message = message.encode(sys.stderr.encoding or 'utf-8', 'replace')
+    print(message, file=sys.stderr)
+
+
+class CsvReader(object):
+    """Delimited file read with the csv module, with the interface of
+    MappedDelimitedReader: rows are the lists of all the text values.
+    """
+
+    def __init__(self, path, delimiter=u',', encoding='utf-8'):
+        if PY2:
+            self.file = open(path, 'rb')
+            reader = csv.reader(self.file, delimiter=delimiter.encode(encoding))
+            self.rows = ([cell.decode(encoding) for cell in row] for row in reader)
+        else:
+            self.file = io.open(path, 'r', encoding=encoding, newline='')
+            self.rows = csv.reader(self.file, delimiter=delimiter)
+
+    def close(self):
+        self.file.close()
+
+    def readHeader(self):
+        header = next(self.rows, None)
+        if header is None:
+            return None
+        return header, header
+
+    def readChunks(self, indexes, chunkSize, width=0):
+        for records in chunks(self.rows, chunkSize):
+            records = [record if len(record) >= width else record + [u''] * (width - len(record))
+                       for record in records]
+            yield records, [[record[index] for record in records] if index is not None else None
+                            for index in indexes]
+
+
+class CsvWriter(object):
+    """Writes the rows of a CsvReader with the csv module."""
+
+    def __init__(self, path, delimiter=u',', encoding='utf-8'):
+        self.encoding = encoding
+        if PY2:
+            self.file = open(path, 'wb')
+            self.writer = csv.writer(self.file, delimiter=delimiter.encode(encoding), lineterminator='\n')
+        else:
+            self.file = io.open(path, 'w', encoding=encoding, newline='')
+            self.writer = csv.writer(self.file, delimiter=delimiter, lineterminator='\n')
+
+    def close(self):
+        self.file.close()
+
+    def writeRows(self, rows, newValues):
+        if PY2:
+            encoding = self.encoding
+            self.writer.writerows([[cellText(value).encode(encoding) for value in row + values]
+                                   for row, values in zip(rows, newValues)])
+        else:
+            self.writer.writerows([[cellText(value) for value in row + values]
+                                   for row, values in zip(rows, newValues)])
+
+
+def openFiles(args, delimiter):
+    """Return the (reader, writer) of the input and output files, memory
+    mapped unless --no-mmap is set or the delimiter is not a single
+    byte.
+    """
+    if args.mmap:
+        try:
+            reader = MappedDelimitedReader(args.input, delimiter, args.encoding)
+        except ValueError:
+            pass
+        else:
+            return reader, MappedDelimitedWriter(args.output, reader)
+    return CsvReader(args.input, delimiter, args.encoding), CsvWriter(args.output, delimiter, args.encoding)
+
+
+def fieldIndex(field, header):
+    """Index of a field name in header, or of a 0 based index. Return
+    None if field is not set, raise ValueError if it is not found.
+    """
+    if field is None:
+        return None
+    if header is not None and field in header:
+        return header.index(field)
+    if field.isdigit():
+        return int(field)
+    raise ValueError('Field {} not found in the header'.format(field))
+
+
+def buildParser():
+    parser = argparse.ArgumentParser(
+        prog='python -m boundlessprovider.cli',
+        description='Convert the coordinate format of columns of a delimited file.')
+    parser.add_argument('input', help='input delimited file')
+    parser.add_argument('output', help='output delimited file')
+    parser.add_argument('--delimiter', default=',', help='field delimiter (default ,)')
+    parser.add_argument('--encoding', default='utf-8', help='encoding of the files (default utf-8)')
+    parser.add_argument('--no-header', dest='header', action='store_false',
+                        help='the input has no header, fields are 0 based indexes')
+    parser.add_argument('--x-field', help='X (lon) or MGRS/UTM field')
+    parser.add_argument('--y-field', help='Y (lat) or MGRS/UTM field')
+    parser.add_argument('--source-format', choices=FORMAT_NAMES, default=FORMAT_NAMES[0])
+    parser.add_argument('--source-datum', choices=DATUM_NAMES, default=DATUM_NAMES[WGS84_DATUM_index],
+                        help='datum of the source values, shifted to WGS84 (default {})'.format(DATUM_NAMES[WGS84_DATUM_index]))
+    parser.add_argument('--destination-format', choices=FORMAT_NAMES[:-1], default=FORMAT_NAMES[0])
+    parser.add_argument('--custom-format', default=CUSTOM_COORD_FORMAT,
+                        help='DMS destination format (default {})'.format(CUSTOM_COORD_FORMAT.encode('utf-8') if PY2 else CUSTOM_COORD_FORMAT))
+    parser.add_argument('--output-x', help='destination X field')
+    parser.add_argument('--output-y', help='destination Y field')
+    parser.add_argument('--output-xy', help='destination single XY field')
+    parser.add_argument('--xy-format', default=SINGLE_FIELD_COORD_FORMAT,
+                        help='single XY field format (default {})'.format(SINGLE_FIELD_COORD_FORMAT))
+    parser.add_argument('--extra-pairs', metavar='X,Y;X,Y',
+                        help='other source field pairs, converted to the destination fields with a _2, _3... suffix')
+    parser.add_argument('--extra-destinations', metavar='FORMAT:X,Y,XY;...',
+                        help='other destination formats and fields of the source values')
+    parser.add_argument('--spatial-key', choices=SPATIAL_KEY_NAMES, default=SPATIAL_KEY_NAMES[NO_KEY_index],
+                        help='spatial key of the converted points, for --key-field and --sort')
+    parser.add_argument('--key-field', help='spatial key field')
+    parser.add_argument('--sort', action='store_true', help='write the rows sorted by spatial key')
+    parser.add_argument('--sort-run-size', type=int, default=DEFAULT_RUN_SIZE,
+                        help='rows sorted in memory before spilling a run to a temporary file (default {})'.format(DEFAULT_RUN_SIZE))
+    parser.add_argument('--chunk-size', type=int, default=DEFAULT_CHUNK_SIZE,
+                        help='rows converted at a time, 0 for the whole file (default {})'.format(DEFAULT_CHUNK_SIZE))
+    parser.add_argument('--workers', type=int, default=1,
+                        help='worker processes, 0 for the number of cores (default 1)')
+    parser.add_argument('--cache-size', type=int, default=DEFAULT_CACHE_SIZE,
+                        help='distinct values kept by the conversion cache (default {})'.format(DEFAULT_CACHE_SIZE))
+    parser.add_argument('--rejects', metavar='FILE',
+                        help='write empty values for malformed rows and collect them in FILE')
+    parser.add_argument('--max-rejects', type=int, default=0,
+                        help='stop after this number of rejected rows, 0 for no limit (default 0)')
+    parser.add_argument('--no-mmap', dest='mmap', action='store_false',
+                        help='read the input with the csv module instead of memory mapping it')
+    parser.add_argument('--pipeline-stages', type=int, choices=range(4), default=0,
+                        help='stages run in threads: 1 the reader, 2 also the converter, 3 also the writer (default 0)')
+    parser.add_argument('--queue-depth', type=int, default=DEFAULT_QUEUE_DEPTH,
+                        help='chunks queued between threaded stages (default {})'.format(DEFAULT_QUEUE_DEPTH))
+    parser.add_argument('--stats', action='store_true', help='print the stage timings to stderr')
+    return parser
+
+
+def readChunks(reader, sourceFields, chunkSize, width, timer=NULL_TIMER):
+    """Yield a ((first, rows, pairs), pairs) item for each chunk of the
+    reader rows, first being the number of the first row of the chunk
+    and pairs the source value pairs of each of the (xIndex, yIndex)
+    sourceFields, one list after the other. Rows shorter than width
+    fields are padded with empty values.
+    """
+    iterator = reader.readChunks([index for fieldPair in sourceFields for index in fieldPair], chunkSize, width)
+    first = 1
+    while True:
+        with timer.stage('read') as stage:
+            chunk = next(iterator, None)
+            if chunk is None:
+                return
+            rows, columns = chunk
+            count = stage.count = len(rows)
+            pairs = []
+            for xValues, yValues in zip(columns[::2], columns[1::2]):
+                pairs.extend(zip(xValues or [None] * count, yValues or [None] * count))
+        yield (first, rows, pairs), pairs
+        first += count
+
+
+def pointColumns(results):
+    """Return the lon and lat lists of results, the last two values,
+    NaN for the rows that are not valid.
+    """
+    nan = float('nan')
+    return ([result[-2] if result[0] else nan for result in results],
+            [result[-1] if result[0] else nan for result in results])
+
+
+def timedWrite(timer, name, write, rows, newValues):
+    """Call write(rows, newValues) timed as the name stage, in the
+    thread that writes: with a threaded writer the stage is the time of
+    the writes, not of queueing them.
+    """
+    with timer.stage(name, len(rows)):
+        write(rows, newValues)
+
+
+def writeConverted(pipeline, writer, sorter, rows, newValues, timer=NULL_TIMER):
+    """Write the rows converted before a malformed value stops the run,
+    unless they are sorted: then nothing is written.
+    """
+    if sorter is None and rows:
+        pipeline.write(timedWrite, timer, 'write', writer.writeRows, rows, newValues)
+
+
+def main(argv=None):
+    parser = buildParser()
+    args = parser.parse_args(argv)
+    xField = _text(args.x_field)
+    yField = _text(args.y_field)
+    outputFields = [_text(field) for field in (args.output_x, args.output_y, args.output_xy)]
+    try:
+        extraPairs = parseFieldPairs(_text(args.extra_pairs))
+        extraDestinations = parseDestinations(_text(args.extra_destinations))
+    except ValueError as ex:
+        parser.error(u'{}'.format(ex))
+
+    # same checks of the Processing algorithm
+    if not xField and not yField:
+        parser.error('At least an input field have to be set')
+    if not any(outputFields):
+        parser.error('At least an output field have to be set')
+    if args.output_xy and not args.xy_format:
+        parser.error('If --output-xy is set, it\'s necessary to set also --xy-format')
+    sourceFormat = FORMAT_NAMES.index(args.source_format)
+    if sourceFormat in [MGRS_index, UTM_index] and xField and yField:
+        parser.error('Ambiguity: source format is {} and both --x-field and --y-field are set. '
+                     'Please select only one source field'.format(args.source_format))
+    sourceDatum = DATUM_NAMES.index(args.source_datum)
+    if sourceDatum != WGS84_DATUM_index and sourceFormat not in [MGRS_index, UTM_index] and not (xField and yField):
+        parser.error('Source datum is {}: both --x-field and --y-field have to be set to shift the points'.format(args.source_datum))
+    for extraX, extraY in extraPairs:
+        if bool(extraX) != bool(xField) or bool(extraY) != bool(yField):
+            parser.error('The extra source field pairs have to set the same fields of --x-field and --y-field')
+    destinationFormat = FORMAT_NAMES.index(args.destination_format)
+    try:
+        columns = outputColumns([(destinationFormat, outputFields)] + extraDestinations, 1 + len(extraPairs))
+    except ValueError as ex:
+        parser.error(u'{}'.format(ex))
+    outputSlots = [(pairIndex, resultIndex) for _, _, pairIndex, resultIndex in columns]
+    keyType = SPATIAL_KEY_NAMES.index(args.spatial_key)
+    keyField = _text(args.key_field)
+    if keyType == NO_KEY_index and (keyField or args.sort):
+        parser.error('--key-field and --sort require a --spatial-key')
+    if keyType != NO_KEY_index and not (keyField or args.sort):
+        parser.error('--spatial-key is set: set also --key-field or --sort')
+    if keyField:
+        if keyField in [column[0] for column in columns]:
+            parser.error(u'Destination field {} is set more than once'.format(keyField))
+        columns.append((keyField, keyType == HILBERT_index, None, None))
+
+    parameters = ConversionParameters(
+        sourceFormat, destinationFormat, _text(args.custom_format),
+        _text(args.xy_format), bool(xField), bool(yField), keyType != NO_KEY_index,
+        extraDestinations=tuple(extraFormat for extraFormat, _ in extraDestinations),
+        sourceDatum=sourceDatum)
+    delimiter = _text(args.delimiter)
+    timer = StageTimer() if args.stats else NULL_TIMER
+
+    reader, writer = openFiles(args, delimiter)
+    rejectsWriter = None
+    if args.rejects:
+        rejectsWriter = CsvWriter(args.rejects, delimiter, args.encoding)
+        rejectsWriter.writeRows([['row'] + REJECT_FIELDS], [[]])
+    rejected = 0
+    done = 0
+    sorter = ExternalSorter(args.sort_run_size) if args.sort else None
+    # the engine is closed after the pipeline threads that use it stop
+    pipeline = Pipeline(args.pipeline_stages, args.queue_depth)
+    engine = ConversionEngine(parameters, workerCount(args.workers), cacheSize=args.cache_size, timer=timer)
+    try:
+        header = reader.readHeader() if args.header else None
+        names = header[0] if header is not None else None
+        try:
+            sourceFields = [(fieldIndex(fieldX, names), fieldIndex(fieldY, names))
+                            for fieldX, fieldY in [(xField, yField)] + extraPairs]
+        except ValueError as ex:
+            parser.error(u'{}'.format(ex))
+        if header is not None:
+            writer.writeRows([header[1]], [[column[0] for column in columns]])
+        width = len(names) if names is not None else max(
+            index for fieldPair in sourceFields for index in fieldPair if index is not None) + 1
+
+        items = pipeline.read(readChunks(reader, sourceFields, args.chunk_size, width, timer))
+        pairIndexes = range(len(sourceFields))
+        for (first, rows, pairs), results in pipeline.convert(engine.convertChunks(items)):
+            # the rows and rejects of the results, written after it
+            with timer.stage('collect', len(rows)):
+                count = len(rows)
+                newValues = []
+                rejects = []
+                if keyType != NO_KEY_index:
+                    with timer.stage('spatial key', count):
+                        keys, sortKeys = spatialKeys(keyType, *pointColumns(results[:count]))
+                for row, offset in zip(range(first, first + count), range(count)):
+                    rowResults = [results[offset + count * pairIndex] for pairIndex in pairIndexes]
+                    for pairIndex, result in zip(pairIndexes, rowResults):
+                        if result[0]:
+                            continue
+                        pair = pairs[offset + count * pairIndex]
+                        value = malformedValue(pair)
+                        if value is not None:
+                            timer.count('parse failures')
+                            if rejectsWriter is None:
+                                printError(u'Malformed value {} in row {}'.format(value, row))
+                                writeConverted(pipeline, writer, sorter, rows[:offset], newValues, timer)
+                                return 1
+                            rejects.append([row, pair[0], pair[1], rejectReason(pair, parameters)])
+                            rejected += 1
+                            if args.max_rejects and rejected > args.max_rejects:
+                                writeConverted(pipeline, writer, sorter, rows[:offset], newValues, timer)
+                                pipeline.write(timedWrite, timer, 'write rejects', rejectsWriter.writeRows,
+                                               rejects, [[]] * len(rejects))
+                                printError(u'More than {} rejected rows, the last is row {}: {}'.format(
+                                    args.max_rejects, row, rejects[-1][-1]))
+                                return 1
+                        else:
+                            timer.count('empty values')
+                    values = [rowResults[pairIndex][resultIndex] for pairIndex, resultIndex in outputSlots]
+                    if keyField:
+                        values.append(keys[offset])
+                    newValues.append(values)
+                if sorter is not None:
+                    sorter.add(sortKeys.tolist(), list(zip(rows, newValues)))
+            if sorter is None:
+                pipeline.write(timedWrite, timer, 'write', writer.writeRows, rows, newValues)
+            if rejects:
+                pipeline.write(timedWrite, timer, 'write rejects', rejectsWriter.writeRows, rejects, [[]] * len(rejects))
+            done += len(rows)
+        if sorter is not None:
+            for sortedRows in sorter.sortedChunks(args.chunk_size):
+                with timer.stage('sort', len(sortedRows)):
+                    rows, newValues = zip(*sortedRows)
+                pipeline.write(timedWrite, timer, 'write', writer.writeRows, list(rows), list(newValues))
+        pipeline.flush()
+    finally:
+        pipeline.close()
+        engine.close()
+        writer.close()
+        reader.close()
+        if rejectsWriter is not None:
+            rejectsWriter.close()
+        if sorter is not None:
+            sorter.close()
+
+    if rejectsWriter is not None:
+        printError(u'{} rejected rows'.format(rejected))
+
+    if timer.enabled:
+        timer.count('cache hits', engine.hits)
+        timer.count('cache misses', engine.misses)
+        for line in timer.report(done):
+            printError(line)
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
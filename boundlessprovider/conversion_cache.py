@@ -0,0 +1,133 @@
+# -*- coding: utf-8 -*-
+#
+# (c) 2017 Boundless Spatial Inc, http://boundlessgeo.com
+# This code is licensed under the GPL 2.0 license.
+#
+"""Memoization of coordinate conversions.
+
+Source tables repeat the same coordinate values (site lists, MGRS cell
+references...). A column is dictionary encoded so that each distinct
+value is converted once, and the conversion of the distinct values goes
+through a bounded LRU cache that can be kept between runs.
+"""
+__copyright__ = '(C) Boundless Spatial Inc'
+
+# This will get replaced with a git SHA1 when you do a git archive
+__revision__ = '$Format:%H$'
+
+from collections import OrderedDict
+
+DEFAULT_CACHE_SIZE = 100000
+# shared caches kept, of different conversion parameters: the least
+# recently used ones are dropped
+MAX_SHARED_CACHES = 16
+
+
+def dictionaryEncode(values):
+    """Return a tuple (distinct, codes): the list of distinct values in
+    order of first appearance and the list of the index in distinct of
+    each value, so that distinct[codes[i]] == values[i].
+    """
+    positions = {}
+    distinct = []
+    codes = []
+    for value in values:
+        code = positions.get(value)
+        if code is None:
+            code = positions[value] = len(distinct)
+            distinct.append(value)
+        codes.append(code)
+    return distinct, codes
+
+
+class ConversionCache(object):
+    """Bounded LRU cache of conversion results by source value.
+
+    maxSize is the maximum number of results kept, 0 disables caching.
+    hits and misses count the lookups since creation or reset().
+    """
+
+    def __init__(self, maxSize=DEFAULT_CACHE_SIZE):
+        self.maxSize = maxSize
+        self.results = OrderedDict()
+        self.hits = 0
+        self.misses = 0
+
+    def __len__(self):
+        return len(self.results)
+
+    def resize(self, maxSize):
+        self.maxSize = maxSize
+        while len(self.results) > maxSize:
+            self.results.popitem(last=False)
+
+    def reset(self):
+        self.results.clear()
+        self.hits = 0
+        self.misses = 0
+
+    def lookup(self, keys, convert):
+        """Return the results of the distinct keys.
+
+        Cached results are reused, the missing ones are computed with a
+        single convert(missingKeys) call, that has to return the list of
+        their results, and are added to the cache.
+        """
+        results = [None] * len(keys)
+        missingKeys = []
+        missingIndexes = []
+        cached = self.results
+        for index, key in enumerate(keys):
+            try:
+                result = cached.pop(key)
+            except KeyError:
+                missingKeys.append(key)
+                missingIndexes.append(index)
+                continue
+            # reinsert as most recently used
+            cached[key] = result
+            results[index] = result
+        self.hits += len(keys) - len(missingKeys)
+        self.misses += len(missingKeys)
+        if not missingKeys:
+            return results
+
+        converted = convert(missingKeys)
+        for index, key, result in zip(missingIndexes, missingKeys, converted):
+            results[index] = result
+            if self.maxSize > 0:
+                cached[key] = result
+        while len(cached) > self.maxSize:
+            cached.popitem(last=False)
+        return results
+
+    def convertColumn(self, values, convert):
+        """Return the list of the results of values, converting each
+        distinct value once.
+        """
+        distinct, codes = dictionaryEncode(values)
+        results = self.lookup(distinct, convert)
+        return [results[code] for code in codes]
+
+
+_sharedCaches = OrderedDict()
+
+
+def sharedCache(key, maxSize=DEFAULT_CACHE_SIZE):
+    """Return the ConversionCache shared between runs with the same
+    key, that has to identify all the conversion parameters. Only the
+    caches of the last MAX_SHARED_CACHES keys are kept.
+    """
+    cache = _sharedCaches.pop(key, None)
+    if cache is None:
+        cache = ConversionCache(maxSize)
+    elif cache.maxSize != maxSize:
+        cache.resize(maxSize)
+    _sharedCaches[key] = cache
+    while len(_sharedCaches) > MAX_SHARED_CACHES:
+        _sharedCaches.popitem(last=False)
+    return cache
+
+
+def clearSharedCaches():
+    _sharedCaches.clear()
@@ -0,0 +1,114 @@
+# -*- coding: utf-8 -*-
+#
+# (c) 2017 Boundless Spatial Inc, http://boundlessgeo.com
+# This code is licensed under the GPL 2.0 license.
+#
+"""Conversion of source value pairs to the destination format.
+
+This module does not use QGIS, so conversions can run in worker
+processes: ConversionParameters and the value pairs are all that has
+to be sent to them.
+"""
+__copyright__ = '(C) Boundless Spatial Inc'
+
+# This will get replaced with a git SHA1 when you do a git archive
+__revision__ = '$Format:%H$'
+
+from collections import namedtuple
+
+import numpy
+
+from boundlessprovider.bulk_utm import latLonToUtm
+from boundlessprovider.formats import WGS84_DATUM_index
+from boundlessprovider.grid_tables import formatMgrs, formatUtm
+from boundlessprovider.instrumentation import NULL_TIMER
+from boundlessprovider.output_formatter import (
+    formatDestinationColumns,
+    CUSTOM_COORD_FORMAT,
+)
+from boundlessprovider.coordinate_parser import (
+    columnsToWgs,
+    DD_index,
+    DMS_index,
+    DDM_index,
+    MGRS_index,
+    UTM_index,
+)
+
+# the parameters that define the result of a conversion, also used as
+# key of the conversion caches shared between runs. extraDestinations
+# is a tuple of other destination format indexes, formatted from the
+# same parsed values. With withWgs the results have also the WGS84 lon
+# and lat. sourceDatum is the index in datum_shift.DATUMS of the datum
+# of the source values
+ConversionParameters = namedtuple('ConversionParameters', [
+    'sourceFormat', 'destinationFormat', 'customFormat', 'singleFieldFormat',
+    'hasX', 'hasY', 'withWgs', 'extraDestinations', 'sourceDatum'])
+ConversionParameters.__new__.__defaults__ = (False, (), WGS84_DATUM_index)
+
+
+def convertPairs(pairs, parameters, timer=NULL_TIMER):
+    """Convert (x, y) source value pairs to the destination format.
+    Return a list of (valid, X, Y, XY) tuples, one for each pair, see
+    formatWgs for the values of the extra destinations and the lon/lat.
+    Values of another source datum are shifted to WGS84 first. The
+    parse and format stages are timed with timer.
+    """
+    with timer.stage('parse', len(pairs)):
+        xValues = [x for x, y in pairs] if parameters.hasX else None
+        yValues = [y for x, y in pairs] if parameters.hasY else None
+        lon, lat, valid = columnsToWgs(xValues, yValues, parameters.sourceFormat, parameters.sourceDatum)
+    with timer.stage('format', len(pairs)):
+        return formatWgs(lon, lat, valid, parameters)
+
+
+def formatWgs(lon, lat, valid, parameters):
+    """Format WGS84 lon/lat arrays in the destination format. Return a
+    list of (valid, X, Y, XY) tuples, one for each row, followed by the
+    X, Y and XY of each of parameters.extraDestinations and then by lon
+    and lat with parameters.withWgs. A row is valid if it is valid in
+    every destination format, otherwise all its values are None.
+    """
+    results = formatDestination(lon, lat, valid, parameters.destinationFormat, parameters)
+    if parameters.extraDestinations:
+        for destinationFormat in parameters.extraDestinations:
+            extraResults = formatDestination(lon, lat, valid, destinationFormat, parameters)
+            results = [result + extraResult[1:] if result[0] and extraResult[0] else
+                       (False,) + (None,) * (len(result) + 2)
+                       for result, extraResult in zip(results, extraResults)]
+    if parameters.withWgs:
+        results = [result + ((lonValue, latValue) if result[0] else (None, None))
+                   for result, lonValue, latValue in zip(results, lon.tolist(), lat.tolist())]
+    return results
+
+
+def formatDestination(lon, lat, valid, destFormatIndex, parameters):
+    """Format WGS84 lon/lat arrays in a destination format. Return a
+    list of (valid, X, Y, XY) tuples, one for each row.
+    """
+    if destFormatIndex in [MGRS_index, UTM_index]:
+        return toGridReferences(lon, lat, valid, destFormatIndex)
+    rows = numpy.flatnonzero(valid)
+    columns = formatDestinationColumns(
+        lon[rows], lat[rows], destFormatIndex,
+        parameters.customFormat, parameters.singleFieldFormat)
+    results = [(False, None, None, None)] * len(valid)
+    for row, newX, newY, newXY in zip(rows.tolist(), *columns):
+        results[row] = (True, newX, newY, newXY)
+    return results
+
+
+def toGridReferences(lon, lat, valid, destFormatIndex):
+    """Convert WGS84 lon/lat arrays to MGRS or UTM references, that
+    are a single value returned as X, Y and XY. Return a list of
+    (valid, X, Y, XY) tuples, not valid out of the UTM latitudes.
+    """
+    zones, bands, south, eastings, northings = latLonToUtm(
+        numpy.where(valid, lat, 0.0), numpy.where(valid, lon, 0.0))
+    zones[~valid] = -1
+    if destFormatIndex == MGRS_index:
+        references = formatMgrs(zones, bands, eastings, northings)
+    else:
+        references = formatUtm(zones, south, eastings, northings)
+    return [(reference is not None, reference, reference, reference)
+            for reference in references]
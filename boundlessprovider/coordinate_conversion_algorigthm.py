@@ -12,6 +12,7 @@ __revision__ = '$Format:%H$'
 
 import os
 import re
+from itertools import islice
 
 from qgis.PyQt.QtCore import QVariant
 from qgis.PyQt.QtGui import QIcon
@@ -21,10 +22,12 @@ try:
 except ImportError:
     from qgis.core import  Qgis as QGis
 
-from qgis.core import QgsField, QgsFields, QgsFeature, QgsGeometry, QgsPoint, QgsRaster
+from qgis.core import QgsField, QgsFields, QgsFeature, QgsFeatureRequest, QgsGeometry, QgsPoint, QgsRaster
+from qgis.core import QgsCoordinateReferenceSystem
 
 from processing.core.GeoAlgorithm import GeoAlgorithm
 from processing.core.parameters import (
+    ParameterBoolean,
     ParameterSelection,
     ParameterString,
     ParameterNumber,
@@ -34,27 +37,52 @@ from processing.core.outputs import (
     OutputTable,
     OutputVector)
 from processing.tools import dataobjects, vector, raster
+from processing.tools.system import userFolder
 from processing.core.GeoAlgorithmExecutionException import GeoAlgorithmExecutionException
+from processing.core.ProcessingConfig import ProcessingConfig
+from processing.core.ProcessingLog import ProcessingLog
 
-from geodesy_regex import (
-    DD_lat_regexp,
-    DD_lon_regexp,
-    DMS_lat_regexp,
-    DMS_lon_regexp,
-    DDM_lat_regexp,
-    DDM_lat_regexp,
+from boundlessprovider.checkpoint import Checkpoint, conversionHash
+from boundlessprovider.external_sort import ExternalSorter, DEFAULT_RUN_SIZE
+from boundlessprovider.formats import (
+    PROJECTED_index,
+    WGS84_DATUM_index,
+    DATUM_NAMES,
+    CUSTOM_COORD_FORMAT,
+    DDM_COORD_FORMAT,
+    FIELD_PRECISION,
+    DD_PRECISION,
 )
+from boundlessprovider.inplace_update import InPlaceUpdater
+from boundlessprovider.instrumentation import StageTimer, NULL_TIMER, STATS_FIELDS
+from boundlessprovider.pipeline import Pipeline, DEFAULT_QUEUE_DEPTH
+from boundlessprovider.streaming import chunks, percentage, DEFAULT_CHUNK_SIZE
+from boundlessprovider.conversion_cache import DEFAULT_CACHE_SIZE
+
+# This module is imported when QGIS loads the provider, so it imports
+# only what defines the algorithm. The conversion modules, that import
+# NumPy and pygeodesy, are imported by the methods that run it, on the
+# first run.
 
 # external pypi library pygeodesy with MIT license
 # https://github.com/mrJean1/PyGeodesy
 # https://pypi.python.org/pypi/PyGeodesy
-# pygeodesy is used to parse MGRS and UTM, but LatLon is parsed
-# using complex custom RegExp that allow more flexibility in format
+# pygeodesy is used to parse MGRS and UTM references in less common
+# forms, the usual ones are converted in bulk by bulk_utm. LatLon is
+# parsed using complex custom RegExp that allow more flexibility in format
 # e.g. LatLon is NOT parsed using pygeodesy parser
-from pygeodesy import 
-    mgrs,
-    utm,
-)
+
+class AppendingTableWriter(vector.TableWriter):
+    """TableWriter of a table written by a previous run: records are
+    appended to it and the header is not written again.
+    """
+
+    def __init__(self, fileName, encoding):
+        self.fileName = fileName
+        self.encoding = encoding
+        if self.encoding is None or encoding == 'System':
+            self.encoding = 'utf-8'
+
 
 class CoordinateFormatConversion(GeoAlgorithm):
     """Algorithm to transform coordinate format adding a add a new
@@ -68,30 +96,53 @@ class CoordinateFormatConversion(GeoAlgorithm):
     SOURCE_X_FIELD = 'SOURCE_X_FIELD'
     SOURCE_Y_FIELD = 'SOURCE_Y_FIELD'
     SOURCE_FORMAT = 'SOURCE_FORMAT'
+    SOURCE_DATUM = 'SOURCE_DATUM'
     DESTINATION_FORMAT = 'DESTINATION_FORMAT'
     CUSTOM_FORMAT = 'CUSTOM_FORMAT'
     OUTPUT_X_FIELD = 'OUTPUT_X_FIELD'
     OUTPUT_Y_FIELD = 'OUTPUT_Y_FIELD'
     OUTPUT_XY_FIELD = 'OUTPUT_XY_FIELD'
     OUTPUT_COORDINATE_FORMAT = 'OUTPUT_COORDINATE_FORMAT'
+    EXTRA_SOURCE_PAIRS = 'EXTRA_SOURCE_PAIRS'
+    EXTRA_DESTINATIONS = 'EXTRA_DESTINATIONS'
+    INSTRUMENT = 'INSTRUMENT'
+    COLLECT_ERRORS = 'COLLECT_ERRORS'
+    ERROR_BUDGET = 'ERROR_BUDGET'
+    RESUMABLE = 'RESUMABLE'
+    REUSE_UNCHANGED = 'REUSE_UNCHANGED'
+    UPDATE_IN_PLACE = 'UPDATE_IN_PLACE'
+    MAX_PROJECTION_ERROR = 'MAX_PROJECTION_ERROR'
+    CREATE_POINTS = 'CREATE_POINTS'
+    SPATIAL_KEY = 'SPATIAL_KEY'
+    SPATIAL_KEY_FIELD = 'SPATIAL_KEY_FIELD'
+    SORT_BY_SPATIAL_KEY = 'SORT_BY_SPATIAL_KEY'
     OUTPUT_TABLE = 'OUTPUT_TABLE'
-    # OUTPUT_VECTOR = 'OUTPUT_VECTOR'
+    OUTPUT_STATS = 'OUTPUT_STATS'
+    OUTPUT_REJECTS = 'OUTPUT_REJECTS'
+    OUTPUT_VECTOR = 'OUTPUT_VECTOR'
 
     DD_index = 0
     DMS_index = 1
     DDM_index = 2
     MGRS_index = 3
     UTM_index = 4
+    AUTO_index = 5
+    PROJECTED_index = PROJECTED_index
     FORMAT_LIST = ['DD-Decimal degrees', 'DMS-Degrees-minutes-seconds', 'DDM-Decimal minutes', 'MGRS-Military Grid Reference System', 'UTM-Universal Transverse Mercator']
-    FORMAT_REGEXP = [
-        {'lat':re.compile(self.DD_lat_regexp), 'lon':re.compile(self.DD_lon_regexp)},
-        {'lat':re.compile(self.DMS_lat_regexp), 'lon':re.compile(self.DMS_lon_regexp)},
-        {'lat':re.compile(self.DDM_lat_regexp), 'lon':re.compile(self.DDM_lat_regexp)},
-    ]
-    CUSTOM_COORD_FORMAT = u'{degree}º{minutes}\'{seconds}"'
+    SOURCE_FORMAT_LIST = FORMAT_LIST + ['Auto-Detect the format of each value', 'Projected-X/Y in the CRS of the source table']
+    WGS84_DATUM_index = WGS84_DATUM_index
+    SOURCE_DATUM_LIST = DATUM_NAMES
+    CUSTOM_COORD_FORMAT = CUSTOM_COORD_FORMAT
+    DDM_COORD_FORMAT = DDM_COORD_FORMAT
     SINGLE_FIELD_COORD_FORMAT = '{X} {Y}'
     FIELD_LENGHT = 10
-    FIELD_PRECISION = 3
+    FIELD_PRECISION = FIELD_PRECISION
+    DD_PRECISION = DD_PRECISION
+    NUMERIC_FIELD_TYPES = [QVariant.Int, QVariant.UInt, QVariant.LongLong, QVariant.ULongLong, QVariant.Double]
+    # same indexes of spatial_keys
+    NO_KEY_index = 0
+    HILBERT_index = 1
+    SPATIAL_KEY_LIST = ['None', 'Hilbert index', 'Geohash']
 
     def defineCharacteristics(self):
         """Inputs and output description of the algorithm, along
@@ -108,22 +159,56 @@ class CoordinateFormatConversion(GeoAlgorithm):
         self.addParameter(ParameterTable(self.SOURCE_TABLE, 'Source table', optional=False))
         self.addParameter(ParameterTableField(self.SOURCE_X_FIELD, "X (lon) or mgrs field ", parent=self.SOURCE_TABLE, optional=True))
         self.addParameter(ParameterTableField(self.SOURCE_Y_FIELD, "Y (lat) or mgrs field", parent=self.SOURCE_TABLE, optional=True))
-        self.addParameter(ParameterSelection(self.SOURCE_FORMAT, "Source format", options=self.FORMAT_LIST, default=0))
+        self.addParameter(ParameterSelection(self.SOURCE_FORMAT, "Source format", options=self.SOURCE_FORMAT_LIST, default=0))
+        self.addParameter(ParameterSelection(self.SOURCE_DATUM, "Source datum, shifted to WGS84", options=self.SOURCE_DATUM_LIST, default=0))
         self.addParameter(ParameterSelection(self.DESTINATION_FORMAT, "Destination format", options=self.FORMAT_LIST, default=0, optional=True))
         self.addParameter(ParameterString(self.CUSTOM_FORMAT, "Custom coordinate format", default=self.CUSTOM_COORD_FORMAT, optional=True))
         self.addParameter(ParameterString(self.OUTPUT_X_FIELD, "Destination X field", optional=True))
         self.addParameter(ParameterString(self.OUTPUT_Y_FIELD, "Destination Y field", optional=True))
         self.addParameter(ParameterString(self.OUTPUT_XY_FIELD, "Destination single XY field", optional=True))
         self.addParameter(ParameterString(self.OUTPUT_COORDINATE_FORMAT, "Single field coord fromat", default=self.SINGLE_FIELD_COORD_FORMAT, optional=True))
-        # We add a table layer as output
+        # other source field pairs and destinations converted in the
+        # same scan, e.g. LON2,LAT2;LON3,LAT3 and MGRS:,,MGRS;DMS:X_DMS,Y_DMS
+        self.addParameter(ParameterString(self.EXTRA_SOURCE_PAIRS, "Other source X,Y field pairs separated by ; (destination fields get a _2, _3... suffix)", optional=True))
+        self.addParameter(ParameterString(self.EXTRA_DESTINATIONS, "Other destinations as FORMAT:X,Y,XY fields separated by ;", optional=True))
+        self.addParameter(ParameterBoolean(self.INSTRUMENT, "Record conversion statistics", default=False))
+        self.addParameter(ParameterBoolean(self.COLLECT_ERRORS, "Write NULL for malformed values and collect them in the rejects table", default=False))
+        self.addParameter(ParameterNumber(self.ERROR_BUDGET, "Maximum number of rejected rows (0 for no limit)", minValue=0, default=0))
+        self.addParameter(ParameterBoolean(self.RESUMABLE, "Keep a checkpoint to resume an interrupted conversion", default=False))
+        # every feature is still read and the whole output written again
+        self.addParameter(ParameterBoolean(self.REUSE_UNCHANGED, "Skip reconverting the features unchanged since the previous run of the same conversion", default=False))
+        self.addParameter(ParameterNumber(self.MAX_PROJECTION_ERROR, "Maximum error in metres of the approximate reprojection of projected X/Y (0 for the exact one)", minValue=0.0, default=0.0))
+        self.addParameter(ParameterBoolean(self.UPDATE_IN_PLACE, "Add the destination fields to the source table instead of writing a new table", default=False))
+        self.addParameter(ParameterBoolean(self.CREATE_POINTS, "Write also a layer of the converted points", default=False))
+        self.addParameter(ParameterSelection(self.SPATIAL_KEY, "Spatial key of the converted points", options=self.SPATIAL_KEY_LIST, default=0))
+        self.addParameter(ParameterString(self.SPATIAL_KEY_FIELD, "Spatial key field", optional=True))
+        self.addParameter(ParameterBoolean(self.SORT_BY_SPATIAL_KEY, "Sort the output rows by spatial key", default=False))
+        # We add a table layer as output, not written if UPDATE_IN_PLACE is set
         self.addOutput(OutputTable(self.OUTPUT_TABLE, 'Input table modified'))
+        # written only if INSTRUMENT is set
+        self.addOutput(OutputTable(self.OUTPUT_STATS, 'Conversion statistics'))
+        # written only if COLLECT_ERRORS is set
+        self.addOutput(OutputTable(self.OUTPUT_REJECTS, 'Rejected rows'))
+        # written only if CREATE_POINTS is set
+        self.addOutput(OutputVector(self.OUTPUT_VECTOR, 'Converted points'))
 
     def processAlgorithm(self, progress):
         """Here is where the processing itself takes place."""
+        from boundlessprovider.converter import ConversionParameters
+        from boundlessprovider.engine import (
+            malformedValue,
+            outputColumns,
+            parseDestinations,
+            parseFieldPairs,
+            rejectReason,
+            REJECT_FIELDS,
+        )
+        from boundlessprovider.parallel import workerCount
+        from boundlessprovider.projected import rejectReason as projectedRejectReason
 
         # check input parameters
         SOURCE_X_FIELD_value = self.getParameterValue(self.SOURCE_X_FIELD)
-        SOURCE_Y_FIELD_value = self.getParameterValue(self.SOURCE_X_FIELD)
+        SOURCE_Y_FIELD_value = self.getParameterValue(self.SOURCE_Y_FIELD)
         if not SOURCE_X_FIELD_value and not SOURCE_Y_FIELD_value:
             raise GeoAlgorithmExecutionException('At least an input field have to be set')
 
@@ -132,247 +217,636 @@ class CoordinateFormatConversion(GeoAlgorithm):
         OUTPUT_XY_FIELD_value = self.getParameterValue(self.OUTPUT_XY_FIELD)
         if not OUTPUT_X_FIELD_value and not OUTPUT_Y_FIELD_value and not OUTPUT_XY_FIELD_value:
             raise GeoAlgorithmExecutionException('At least an output field have to be set')
-        
-        OUTPUT_COORDINATE_FORMAT_value = self.getParameterValue(self.OUTPUT_COORDINATE_FORMAT)
-        if OUTPUT_XY_FIELD_value and not OUTPUT_COORDINATE_FORMAT_value:
-            raise GeoAlgorithmExecutionException('If OUTPUT_XY_FIELD is set, it\'s necessary to set also OUTPUT_COORDINATE_FORMAT' )
 
         DESTINATION_FORMAT_value = self.getParameterValue(self.DESTINATION_FORMAT)
         CUSTOM_FORMAT_value = self.getParameterValue(self.CUSTOM_FORMAT)
-        if not DESTINATION_FORMAT_value and not CUSTOM_FORMAT_value:
+        if DESTINATION_FORMAT_value is None and not CUSTOM_FORMAT_value:
             raise GeoAlgorithmExecutionException('At least DESTINATION_FORMAT or CUSTOM_FORMAT have to be set' )
 
         OUTPUT_COORDINATE_FORMAT_value = self.getParameterValue(self.OUTPUT_COORDINATE_FORMAT)
         if OUTPUT_XY_FIELD_value and not OUTPUT_COORDINATE_FORMAT_value:
             raise GeoAlgorithmExecutionException('If OUTPUT_XY_FIELD is set, it\'s necessary to set also OUTPUT_COORDINATE_FORMAT' )
-        
+
         SOURCE_FORMAT_value = self.getParameterValue(self.SOURCE_FORMAT)
-        if SOURCE_FORMAT_value == MGRS_index and SOURCE_X_FIELD_value and SOURCE_Y_FIELD_value:
-            raise GeoAlgorithmExecutionException('Ambiguity: OUTPUT_COORDINATE_FORMAT is {} and both SOURCE_X_FIELD and SOURCE_Y_FIELD are set. Please select only one source field'.format(self.FORMAT_LIST[OUTPUT_COORDINATE_FORMAT_value]) )
+        if SOURCE_FORMAT_value in [self.MGRS_index, self.UTM_index] and SOURCE_X_FIELD_value and SOURCE_Y_FIELD_value:
+            raise GeoAlgorithmExecutionException('Ambiguity: SOURCE_FORMAT is {} and both SOURCE_X_FIELD and SOURCE_Y_FIELD are set. Please select only one source field'.format(self.SOURCE_FORMAT_LIST[SOURCE_FORMAT_value]) )
+        if SOURCE_FORMAT_value == self.PROJECTED_index and not (SOURCE_X_FIELD_value and SOURCE_Y_FIELD_value):
+            raise GeoAlgorithmExecutionException('SOURCE_FORMAT is {}: both SOURCE_X_FIELD and SOURCE_Y_FIELD have to be set'.format(self.SOURCE_FORMAT_LIST[SOURCE_FORMAT_value]))
+        SOURCE_DATUM_value = self.getParameterValue(self.SOURCE_DATUM) or self.WGS84_DATUM_index
+        if SOURCE_DATUM_value != self.WGS84_DATUM_index:
+            if SOURCE_FORMAT_value == self.PROJECTED_index:
+                # the CRS of the source table defines the datum
+                raise GeoAlgorithmExecutionException('SOURCE_DATUM can not be set with SOURCE_FORMAT {}'.format(self.SOURCE_FORMAT_LIST[SOURCE_FORMAT_value]))
+            if SOURCE_FORMAT_value not in [self.MGRS_index, self.UTM_index] and not (SOURCE_X_FIELD_value and SOURCE_Y_FIELD_value):
+                raise GeoAlgorithmExecutionException('SOURCE_DATUM is {}: both SOURCE_X_FIELD and SOURCE_Y_FIELD have to be set to shift the points'.format(self.SOURCE_DATUM_LIST[SOURCE_DATUM_value]))
+        MAX_PROJECTION_ERROR_value = float(self.getParameterValue(self.MAX_PROJECTION_ERROR) or 0)
+
+        try:
+            extraPairs = parseFieldPairs(self.getParameterValue(self.EXTRA_SOURCE_PAIRS))
+            extraDestinations = parseDestinations(self.getParameterValue(self.EXTRA_DESTINATIONS))
+            columns = outputColumns(
+                [(DESTINATION_FORMAT_value, (OUTPUT_X_FIELD_value, OUTPUT_Y_FIELD_value, OUTPUT_XY_FIELD_value))] +
+                extraDestinations, 1 + len(extraPairs))
+        except ValueError as ex:
+            raise GeoAlgorithmExecutionException(unicode(ex))
+        for extraX, extraY in extraPairs:
+            if bool(extraX) != bool(SOURCE_X_FIELD_value) or bool(extraY) != bool(SOURCE_Y_FIELD_value):
+                raise GeoAlgorithmExecutionException('EXTRA_SOURCE_PAIRS have to set the same fields of SOURCE_X_FIELD and SOURCE_Y_FIELD')
 
-        # get parameters
-        fieldType = QVariant.String
-        if DESTINATION_FORMAT_value in [DD_index]:
-            fieldType = QVariant.Double
+        RESUMABLE_value = self.getParameterValue(self.RESUMABLE)
+        REUSE_UNCHANGED_value = self.getParameterValue(self.REUSE_UNCHANGED)
+        if RESUMABLE_value and REUSE_UNCHANGED_value:
+            # a resumed run does not see the features before the
+            # checkpoint, that the run would delete from the store
+            raise GeoAlgorithmExecutionException('RESUMABLE and REUSE_UNCHANGED can not be set together')
+        UPDATE_IN_PLACE_value = self.getParameterValue(self.UPDATE_IN_PLACE)
+        if REUSE_UNCHANGED_value and (extraPairs or extraDestinations):
+            # the store keeps the values of a single destination
+            raise GeoAlgorithmExecutionException('REUSE_UNCHANGED can not be set with EXTRA_SOURCE_PAIRS or EXTRA_DESTINATIONS')
+        if UPDATE_IN_PLACE_value and (RESUMABLE_value or REUSE_UNCHANGED_value):
+            # both keep track of an output table, that is not written
+            raise GeoAlgorithmExecutionException('UPDATE_IN_PLACE can not be set with RESUMABLE or REUSE_UNCHANGED')
+        CREATE_POINTS_value = self.getParameterValue(self.CREATE_POINTS)
+        if CREATE_POINTS_value and (RESUMABLE_value or UPDATE_IN_PLACE_value):
+            # a points layer can not be truncated to a checkpoint, and
+            # in place the other fields are not read
+            raise GeoAlgorithmExecutionException('CREATE_POINTS can not be set with RESUMABLE or UPDATE_IN_PLACE')
+
+        SPATIAL_KEY_value = self.getParameterValue(self.SPATIAL_KEY) or self.NO_KEY_index
+        SPATIAL_KEY_FIELD_value = self.getParameterValue(self.SPATIAL_KEY_FIELD)
+        SORT_BY_SPATIAL_KEY_value = self.getParameterValue(self.SORT_BY_SPATIAL_KEY)
+        if SPATIAL_KEY_value == self.NO_KEY_index and (SPATIAL_KEY_FIELD_value or SORT_BY_SPATIAL_KEY_value):
+            raise GeoAlgorithmExecutionException('SPATIAL_KEY_FIELD and SORT_BY_SPATIAL_KEY require a SPATIAL_KEY')
+        if SPATIAL_KEY_value != self.NO_KEY_index and not (SPATIAL_KEY_FIELD_value or SORT_BY_SPATIAL_KEY_value):
+            raise GeoAlgorithmExecutionException('SPATIAL_KEY is set: set also SPATIAL_KEY_FIELD or SORT_BY_SPATIAL_KEY')
+        if SORT_BY_SPATIAL_KEY_value and (RESUMABLE_value or UPDATE_IN_PLACE_value):
+            # sorted rows are written after the whole table is read, and
+            # the rows of the source table can not be reordered
+            raise GeoAlgorithmExecutionException('SORT_BY_SPATIAL_KEY can not be set with RESUMABLE or UPDATE_IN_PLACE')
+        if SPATIAL_KEY_FIELD_value:
+            if SPATIAL_KEY_FIELD_value in [column[0] for column in columns]:
+                raise GeoAlgorithmExecutionException('Destination field {} is set more than once'.format(SPATIAL_KEY_FIELD_value))
+            # Hilbert indexes are exact as doubles
+            columns.append((SPATIAL_KEY_FIELD_value, SPATIAL_KEY_value == self.HILBERT_index, None, None))
+
+        COLLECT_ERRORS_value = self.getParameterValue(self.COLLECT_ERRORS)
+        ERROR_BUDGET_value = int(self.getParameterValue(self.ERROR_BUDGET) or 0)
 
         output = self.getOutputFromName(self.OUTPUT_TABLE)
+        rejectsOutput = self.getOutputFromName(self.OUTPUT_REJECTS)
 
         # do process
 
-        layer = processing.getObject(self.SOURCE_TABLE)
-        sourceXFieldIndex = None
-        sourceYFieldIndex = None
-        if SOURCE_X_FIELD_value:
-            sourceXFieldIndex = inputTable.fieldNameIndex(SOURCE_X_FIELD_value)
-        if SOURCE_Y_FIELD_value:
-            sourceYFieldIndex = inputTable.fieldNameIndex(SOURCE_Y_FIELD_value)
-        
-        # set new field types
+        layer = dataobjects.getObjectFromUri(self.getParameterValue(self.SOURCE_TABLE))
+        # (x, y) field indexes of the source field pairs, all of them
+        # converted in the same scan
+        sourceFields = []
+        for xField, yField in [(SOURCE_X_FIELD_value, SOURCE_Y_FIELD_value)] + extraPairs:
+            fieldPair = tuple(layer.fieldNameIndex(field) if field else None for field in (xField, yField))
+            if -1 in fieldPair:
+                raise GeoAlgorithmExecutionException('Source field not found in SOURCE_TABLE')
+            sourceFields.append(fieldPair)
+        sourceXFieldIndex, sourceYFieldIndex = sourceFields[0]
+
         # copy table structure and add new columns
-        fields = layer.fields()
-        if OUTPUT_X_FIELD_value:
-            fields.append(QgsField(OUTPUT_X_FIELD_value, fieldType, '',
-                                self.FIELD_LENGHT, self.FIELD_PRECISION))
-            OUTPUT_X_FIELD_index = fields.size()
-        if OUTPUT_Y_FIELD_value:
-            fields.append(QgsField(OUTPUT_Y_FIELD_value, fieldType, '',
-                                self.FIELD_LENGHT, self.FIELD_PRECISION))
-            OUTPUT_Y_FIELD_index = fields.size()
-        if OUTPUT_XY_FIELD_value:
-            fields.append(QgsField(OUTPUT_XY_FIELD_value,  QVariant.String, '', 20, 20))
-
-            OUTPUT_XY_FIELD_index = fields.size()
-        
-        # create writer
-        writer = output.getVectorWriter(fields, layer.wkbType(), layer.crs())
-        outFeat = QgsFeature()
-        features = vector.features(layer)
-        total = 100.0 / len(features) if len(features) > 0 else 1
-
-        # populate new layer
-        for current, feat in enumerate(features):
-            progress.setPercentage(int(current * total))
-            # get source data to transform
-            attributes = feat.attributes()
-            x = None
-            y = None
-            if sourceXFieldIndex:
-                x = str(attributes[sourceXFieldIndex]).replace(' ', '')
-            if sourceYFieldIndex:
-                y = str(attributes[sourceYFieldIndex]).replace(' ', '')
-
-            # from source to wgs
-            try:
-                if SOURCE_FORMAT_value == MGRS_index:
-                    mgrsObject = mgrs.parseMGRS( x? x:y )
-                    utmObject = mgrsObject.toUtm()
-                    latLonObject = utmObject.toLatLon()
-                    newX = latLonObject.lon()
-                    newY = latLonObject.lat()
-                elif SOURCE_FORMAT_value == UTM_index:
-                    utmObject = utm.parseUTM( x? x:y )
-                    latLonObject = utmObject.toLatLon()
-                    newX = latLonObject.lon()
-                    newY = latLonObject.lat()
-                elif SOURCE_FORMAT_value in [DD_index, DMS_index, DDM_index]
-                    newX = self.lonFromSourceToWgs(x, SOURCE_FORMAT_value)
-                    newY = self.latFromSourceToWgs(y, SOURCE_FORMAT_value)
+        fieldNames = [field.name() for field in layer.fields()]
+        fieldNames.extend(column[0] for column in columns)
+        # the results index of each destination value, the spatial key
+        # is appended after them
+        outputSlots = [(pairIndex, resultIndex) for _, _, pairIndex, resultIndex in columns
+                       if pairIndex is not None]
+        pairIndexes = range(len(sourceFields))
+
+        parameters = ConversionParameters(
+            SOURCE_FORMAT_value, DESTINATION_FORMAT_value, CUSTOM_FORMAT_value,
+            OUTPUT_COORDINATE_FORMAT_value, sourceXFieldIndex is not None, sourceYFieldIndex is not None,
+            bool(CREATE_POINTS_value or SPATIAL_KEY_value != self.NO_KEY_index),
+            tuple(destinationFormat for destinationFormat, _ in extraDestinations),
+            SOURCE_DATUM_value)
+
+        # projected X/Y are transformed to WGS84 when they are read, the
+        # engine converts them from DD
+        projection = None
+        engineParameters = parameters
+        if SOURCE_FORMAT_value == self.PROJECTED_index:
+            projection = self.getProjection(layer, sourceXFieldIndex, sourceYFieldIndex, MAX_PROJECTION_ERROR_value, progress)
+            engineParameters = parameters._replace(sourceFormat=self.DD_index)
+
+        # an in place update adds the destination fields to the source
+        # table, before reading it, and writes only their values, in a
+        # transaction or in the edit buffer of the layer that is
+        # committed at the end. Only the source fields are read, without
+        # geometries
+        updater = None
+        request = QgsFeatureRequest()
+        if UPDATE_IN_PLACE_value:
+            updater = InPlaceUpdater(layer, [(name, isNumeric) for name, isNumeric, _, _ in columns], self.DD_PRECISION)
+            if updater.added:
+                progress.setInfo('Adding fields {} to the source table'.format(', '.join(updater.added)))
+            request.setFlags(QgsFeatureRequest.NoGeometry)
+            request.setSubsetOfAttributes([index for fieldPair in sourceFields for index in fieldPair if index is not None])
+
+        # features are streamed a chunk at a time. len() is the provider
+        # feature count, that is only an estimate (-1 if unknown)
+        features = vector.features(layer, request)
+        estimate = len(features)
+        features = iter(features)
+
+        # a resumable job commits a checkpoint after each chunk, and a
+        # later run of the same job goes on from the last one
+        checkpoint = None
+        state = None
+        if RESUMABLE_value:
+            checkpoint = self.getCheckpoint(
+                layer, parameters, fieldNames, [(SOURCE_X_FIELD_value, SOURCE_Y_FIELD_value)] + extraPairs, sourceFields,
+                SPATIAL_KEY_value, MAX_PROJECTION_ERROR_value, COLLECT_ERRORS_value, ERROR_BUDGET_value)
+            state = checkpoint.load()
+        if state is not None:
+            lastId = None
+            for feat in islice(features, state['rows']):
+                lastId = feat.id()
+            if lastId != state['featureId']:
+                progress.setInfo('The source table changed since the checkpoint, converting it all again')
+                state = None
+                features = iter(vector.features(layer))
+
+        instrumented = self.getParameterValue(self.INSTRUMENT) or ProcessingConfig.getSetting(self.provider.INSTRUMENTATION)
+        timer = StageTimer() if instrumented else NULL_TIMER
+
+        # from source to wgs to destination format, each distinct
+        # source value once, in this process or in a pool of workers
+        # that return the chunks in order
+        workers = workerCount(ProcessingConfig.getSetting(self.provider.WORKERS))
+        if workers > 1:
+            progress.setInfo('Converting with {} worker processes'.format(workers))
+        engine = self.getEngine(engineParameters, workers, timer)
+
+        # rejected rows are streamed to their table a chunk at a time
+        rejectsWriter = None
+        pointsWriter = None
+        if state is None:
+            writer = output.getTableWriter(fieldNames) if updater is None else None
+            if COLLECT_ERRORS_value:
+                rejectsWriter = rejectsOutput.getTableWriter(['feature_id'] + REJECT_FIELDS)
+            rejected = 0
+            done = 0
+            chunkIndex = 0
+            # points are written in WGS84, with the fields of the table
+            if CREATE_POINTS_value:
+                pointsFields = self.getPointsFields(layer, columns)
+                pointsWriter = self.getOutputFromName(self.OUTPUT_VECTOR).getVectorWriter(
+                    pointsFields, QGis.WKBPoint, QgsCoordinateReferenceSystem('EPSG:4326'))
+        else:
+            # outputs of the previous run, without what was written after
+            # the checkpoint
+            checkpoint.truncateOutputs()
+            outputs = state['outputs']
+            output.value = outputs[self.OUTPUT_TABLE][0]
+            writer = AppendingTableWriter(output.value, output.encoding)
+            if COLLECT_ERRORS_value:
+                rejectsOutput.value = outputs[self.OUTPUT_REJECTS][0]
+                rejectsWriter = AppendingTableWriter(rejectsOutput.value, rejectsOutput.encoding)
+            rejected = state['rejected']
+            done = state['rows']
+            chunkIndex = state['chunk'] + 1
+            progress.setInfo('Resuming after {} rows, from chunk {}'.format(done, chunkIndex))
+
+        # with REUSE_UNCHANGED only the inserted and changed features are
+        # converted, the others take the values stored by the last run.
+        # All of them are still read, hashed and written
+        store = None
+        if REUSE_UNCHANGED_value:
+            store = self.getIncrementalStore(
+                layer, parameters, fieldNames, [(SOURCE_X_FIELD_value, SOURCE_Y_FIELD_value)] + extraPairs, sourceFields,
+                SPATIAL_KEY_value, MAX_PROJECTION_ERROR_value)
+            progress.setInfo('{} features stored by the previous run'.format(len(store)))
+
+        # sorted rows are written after the last chunk, spilled to
+        # temporary files in runs when they do not fit in memory
+        sorter = None
+        if SORT_BY_SPATIAL_KEY_value:
+            sorter = ExternalSorter(self.getSortRunSize())
+
+        # features are read and the outputs written on this thread, as
+        # QGIS providers, iterators and writers require: only the QGIS
+        # free conversion can run in a thread of its own, overlapping
+        # them. The pipeline is closed before the engine it uses
+        pipeline = self.getPipeline()
+        items = self.readChunks(features, sourceFields, timer, projection)
+        if store is not None:
+            # the store is used only by this thread, as SQLite requires
+            items = self.incrementalChunks(items, store, timer)
+        if pipeline is not None:
+            converted = pipeline.convertInThread(items, engine.convertChunks)
+        else:
+            converted = engine.convertChunks(items)
+        if store is not None:
+            converted = self.mergeIncremental(converted, store, timer, parameters.withWgs)
+
+        try:
+            for (chunk, records, pairs), results in converted:
+                with timer.stage('write', len(records)):
+                    count = len(records)
+                    rejects = []
+                    newValues = []
+                    for row, (feat, attributes) in enumerate(zip(chunk, records)):
+                        # the results of the source field pairs of the row
+                        rowResults = [results[row + count * pairIndex] for pairIndex in pairIndexes]
+                        for pairIndex, result in zip(pairIndexes, rowResults):
+                            if result[0]:
+                                continue
+                            pair = pairs[row + count * pairIndex]
+                            value = malformedValue(pair)
+                            if value is not None:
+                                timer.count('parse failures')
+                                if rejectsWriter is None:
+                                    raise GeoAlgorithmExecutionException('Malformed value {} in feature with id {}'.format(value, feat.id()))
+                                if projection is not None:
+                                    reason = projectedRejectReason(pair)
+                                else:
+                                    reason = rejectReason(pair, parameters)
+                                rejects.append([feat.id(), pair[0], pair[1], reason])
+                                rejected += 1
+                                if ERROR_BUDGET_value and rejected > ERROR_BUDGET_value:
+                                    rejectsWriter.addRecords(rejects)
+                                    raise GeoAlgorithmExecutionException('More than {} rejected rows, the last is feature with id {}: {}'.format(ERROR_BUDGET_value, feat.id(), rejects[-1][-1]))
+                            else:
+                                timer.count('empty values')
+                        values = attributes
+                        if updater is not None:
+                            values = []
+                            newValues.append(values)
+                        values.extend([rowResults[pairIndex][resultIndex] for pairIndex, resultIndex in outputSlots])
+                    sortKeys = None
+                    if SPATIAL_KEY_value != self.NO_KEY_index:
+                        sortKeys = self.addSpatialKeys(SPATIAL_KEY_value, records if updater is None else newValues,
+                                                       results[:count], SPATIAL_KEY_FIELD_value, timer)
+                    if sorter is not None:
+                        # with the point of the row, if written
+                        sorter.add(sortKeys, records if pointsWriter is None else
+                                   [(attributes, result[0], result[-2], result[-1])
+                                    for attributes, result in zip(records, results[:count])])
+                    elif updater is not None:
+                        # one batched attribute change call for the chunk
+                        updater.changeValues([feat.id() for feat in chunk], newValues)
+                    else:
+                        writer.addRecords(records)
+                    if pointsWriter is not None and sorter is None:
+                        self.writePoints(pointsWriter, pointsFields, records, results[:count], timer)
+                    if rejects:
+                        rejectsWriter.addRecords(rejects)
+
+                done += len(records)
+                progress.setPercentage(percentage(done, estimate))
+                if checkpoint is not None:
+                    outputs = {self.OUTPUT_TABLE: writer.fileName}
+                    if rejectsWriter is not None:
+                        outputs[self.OUTPUT_REJECTS] = rejectsWriter.fileName
+                    # after the writes of the chunk
+                    checkpoint.commit(done, chunk[-1].id(), chunkIndex, outputs, rejected=rejected)
+                chunkIndex += 1
+            if sorter is not None:
+                self.writeSorted(sorter, writer, pointsWriter, pointsFields if pointsWriter is not None else None, timer)
+                progress.setInfo('Sorted {} rows by spatial key, in {} runs on disk'.format(done, sorter.runs))
+            if store is not None:
+                store.deleteMissing()
+                store.commit()
+                progress.setInfo('Reused the conversions of unchanged features: {} features converted, {} deleted'.format(store.changed, store.deleted))
+            if updater is not None:
+                updater.commit()
+                progress.setInfo('Updated {} features of the source table'.format(updater.updated))
+        except GeoAlgorithmExecutionException:
+            self.closePipeline(pipeline)
+            if updater is not None:
+                updater.rollback()
+            raise
+        except Exception as ex:
+            self.closePipeline(pipeline)
+            if updater is not None:
+                updater.rollback()
+            raise GeoAlgorithmExecutionException(unicode(ex))
+        finally:
+            self.closePipeline(pipeline)
+            engine.close()
+            if store is not None:
+                store.close()
+            if sorter is not None:
+                sorter.close()
+        del writer
+        if pointsWriter is not None:
+            del pointsWriter
+        else:
+            # nothing written, do not try to load it
+            self.getOutputFromName(self.OUTPUT_VECTOR).open = False
+        if updater is not None:
+            # the source table is updated, there is no output table
+            output.open = False
+        if checkpoint is not None:
+            checkpoint.clear()
+        progress.setInfo('Conversion cache: {} hits, {} misses'.format(engine.hits, engine.misses))
+        if rejectsWriter is not None:
+            del rejectsWriter
+            ProcessingLog.addToLog(ProcessingLog.LOG_INFO, 'Coordinate conversion rejected {} of {} rows'.format(rejected, done))
+            progress.setInfo('{} rejected rows'.format(rejected))
+        else:
+            # nothing written, do not try to load it
+            rejectsOutput.open = False
+
+        statsOutput = self.getOutputFromName(self.OUTPUT_STATS)
+        if timer.enabled:
+            timer.count('cache hits', engine.hits)
+            timer.count('cache misses', engine.misses)
+            self.writeStats(timer, done, statsOutput, progress)
+        else:
+            # nothing written, do not try to load it
+            statsOutput.open = False
+
+    def readChunks(self, features, sourceFields, timer=NULL_TIMER, projection=None):
+        """Yield a ((features, records, pairs), pairs) item for each
+        chunk of features, where records are the attribute lists and
+        pairs the (x, y) source values of each of the (xIndex, yIndex)
+        sourceFields, one list after the other, as text (engine.pairsOf):
+        None for NULL and for a field not set. With a Projection the pairs of the item are the WGS84
+        (lon, lat) of the source values.
+        """
+        from boundlessprovider.engine import fieldPairsOf
+
+        iterator = chunks(features, self.getChunkSize())
+        while True:
+            with timer.stage('read') as stage:
+                chunk = next(iterator, None)
+                if chunk is None:
+                    return
+                records = [feat.attributes() for feat in chunk]
+                stage.count = len(records)
+                pairs = fieldPairsOf(records, sourceFields)
+            if projection is None:
+                yield (chunk, records, pairs), pairs
+                continue
+            with timer.stage('project', len(pairs)):
+                wgsPairs = projection.toWgs(pairs)
+            yield (chunk, records, pairs), wgsPairs
+
+    def incrementalChunks(self, items, store, timer=NULL_TIMER):
+        """Yield a ((context, fids, hashes, changed), pairs) item for
+        each readChunks item, with only the pairs of the features that
+        changed since the run stored in store.
+        """
+        from boundlessprovider.incremental import rowHashes
+
+        for context, pairs in items:
+            with timer.stage('diff', len(pairs)):
+                fids = [feat.id() for feat in context[0]]
+                hashes = rowHashes(pairs)
+                changed = store.changes(fids, hashes)
+                changedPairs = [pair for pair, isChanged in zip(pairs, changed.tolist()) if isChanged]
+            yield (context, fids, hashes, changed), changedPairs
+
+    def mergeIncremental(self, converted, store, timer=NULL_TIMER, withWgs=False):
+        """Yield the (context, results) of each chunk, taking the stored
+        results of the unchanged features and storing the valid results
+        of the changed ones. Stored results have the lon/lat only if
+        withWgs is set.
+        """
+        import numpy
+
+        width = 6 if withWgs else 4
+        for (context, fids, hashes, changed), changedResults in converted:
+            with timer.stage('merge', len(fids)):
+                results = [None] * len(fids)
+                unchanged = numpy.flatnonzero(~changed).tolist()
+                for row, values in zip(unchanged, store.storedValues([fids[row] for row in unchanged])):
+                    results[row] = ((True,) + tuple(values))[:width]
+                storedRows = []
+                for row, result in zip(numpy.flatnonzero(changed).tolist(), changedResults):
+                    results[row] = result
+                    if result[0]:
+                        storedRows.append(row)
+                store.store([fids[row] for row in storedRows], hashes[storedRows],
+                            [results[row][1:] for row in storedRows])
+            yield context, results
+
+    def addSpatialKeys(self, keyType, rows, results, keyField, timer=NULL_TIMER):
+        """Compute the spatial keys of the lon/lat of results, the last
+        two values, and append them to rows if keyField is set. Return
+        the integer keys to sort the rows by.
+        """
+        import numpy
+
+        from boundlessprovider.spatial_keys import spatialKeys
+
+        with timer.stage('spatial key', len(results)):
+            lon = numpy.array([result[-2] if result[0] else numpy.nan for result in results], dtype=numpy.float64)
+            lat = numpy.array([result[-1] if result[0] else numpy.nan for result in results], dtype=numpy.float64)
+            keys, sortKeys = spatialKeys(keyType, lon, lat)
+            if keyField:
+                for values, key in zip(rows, keys):
+                    values.append(key)
+        return sortKeys.tolist()
+
+    def writeSorted(self, sorter, writer, pointsWriter=None, pointsFields=None, timer=NULL_TIMER):
+        """Write the rows of sorter in key order, a chunk at a time. With
+        a pointsWriter the sorted rows are (attributes, valid, lon, lat)
+        tuples, also written to the points layer.
+        """
+        for rows in sorter.sortedChunks(self.getChunkSize()):
+            with timer.stage('sort', len(rows)):
+                if pointsWriter is None:
+                    records = rows
                 else:
-                    raise GeoAlgorithmExecutionException('Unrecognised SOURCE_FORMAT in feature with id {}. It should be one of: {}'format(feat.id(), str(self.FORMAT_LIST) )
-
-            except Exception as ex:
-                raise GeoAlgorithmExecutionException(unicode(ex))
-
-            # wrom wgs to destination format
-            if SOURCE_FORMAT_value == MGRS_index:
-                mgrsObject = mgrs.parseMGRS( x? x:y )
-                utmObject = mgrsObject.toUtm()
-                latLonObject = utmObject.toLatLon()
-                newX = latLonObject.lon()
-                newY = latLonObject.lat()
-            elif SOURCE_FORMAT_value == UTM_index:
-                utmObject = utm.parseUTM( x? x:y )
-                latLonObject = utmObject.toLatLon()
-                newX = latLonObject.lon()
-                newY = latLonObject.lat()
-            elif SOURCE_FORMAT_value in [DD_index, DMS_index, DDM_index]
-                newX = self.lonFromSourceToWgs(x, SOURCE_FORMAT_value)
-                newY = self.latFromSourceToWgs(y, SOURCE_FORMAT_value)
+                    records = [row[0] for row in rows]
+                    self.writePoints(pointsWriter, pointsFields, records, [row[1:] for row in rows], timer)
+                writer.addRecords(records)
+
+    def getPointsFields(self, layer, columns):
+        """Return the QgsFields of the points layer: the fields of
+        layer and the destination fields of engine.outputColumns.
+        """
+        fields = QgsFields()
+        for field in layer.fields():
+            fields.append(field)
+        for name, isNumeric, _, _ in columns:
+            if isNumeric:
+                fields.append(QgsField(name, QVariant.Double, 'double', 20, self.DD_PRECISION))
             else:
-                raise GeoAlgorithmExecutionException('Unrecognised SOURCE_FORMAT in feature with id {}. It should be one of: {}'format(feat.id(), str(self.FORMAT_LIST) )
-
-            geom = feat.geometry()
-            outFeat.setGeometry(geom)
-            atMap = feat.attributes()
-            atMap.append(None)
-            outFeat.setAttributes(atMap)
-            writer.addFeature(outFeat)
+                fields.append(QgsField(name, QVariant.String, 'string', 254))
+        return fields
+
+    def writePoints(self, pointsWriter, fields, records, results, timer=NULL_TIMER):
+        """Write a chunk of records to the points layer, with the point
+        geometries of the lon/lat of results, the last two values, all
+        of them built from a single packed WKB buffer. Rows not valid
+        have no geometry.
+        """
+        from boundlessprovider.wkb import pointsWkb
+
+        with timer.stage('points', len(records)):
+            wkbs = pointsWkb([result[-2] if result[0] else None for result in results],
+                             [result[-1] if result[0] else None for result in results])
+            features = []
+            for attributes, wkb in zip(records, wkbs):
+                feat = QgsFeature(fields)
+                feat.setAttributes(attributes)
+                if wkb is not None:
+                    geometry = QgsGeometry()
+                    geometry.fromWkb(wkb)
+                    feat.setGeometry(geometry)
+                features.append(feat)
+            if getattr(pointsWriter, 'isNotFileBased', False):
+                # memory and database layers: a single provider call
+                pointsWriter.writer.addFeatures(features)
+            else:
+                for feat in features:
+                    pointsWriter.addFeature(feat)
+
+    def writeStats(self, timer, rows, statsOutput, progress):
+        """Write the stage stats to the Processing log and to the stats
+        output table.
+        """
+        for line in timer.report(rows):
+            ProcessingLog.addToLog(ProcessingLog.LOG_INFO, 'Coordinate conversion {}'.format(line))
+            progress.setInfo(line)
+        writer = statsOutput.getTableWriter(STATS_FIELDS)
+        writer.addRecords(timer.rows(rows))
         del writer
 
-    def lonFromSourceToWgs(value, sourceFormatIndex):
-        """Parse and convert Lon value form a format to another.
-        Beaware that regext group position have to be aligned to the 
-        related regexp 
+    def getCheckpoint(self, layer, parameters, fieldNames, fieldPairs, sourceFields, spatialKey, maxProjectionError,
+                      collectErrors, errorBudget):
+        """Return the Checkpoint of the job converting the fieldPairs
+        (sourceFields indexes) of layer with these parameters, in the
+        checkpoints folder of the user.
         """
-        if not value or not sourceFormatIndex:
-            return None
+        hashValue = conversionHash(layer.source(), fieldNames, fieldPairs, sourceFields, parameters, spatialKey,
+                                   maxProjectionError, collectErrors, errorBudget)
+        return Checkpoint(os.path.join(userFolder(), 'checkpoints', hashValue + '.json'), hashValue)
 
-        expression = FORMAT_REGEXP[sourceFormatIndex]['lon']
-        match = expression.match(value)
-        # general parsing error
-        if not match:
-            return None
-        # if something does not match but other parts match
-        if match.group(0) != value:
-            return None
-        # now parse 
-        if sourceFormatIndex == DD_index:
-            signItem = match.group(1)
-            eastingNorthingItem = match.group(13)
-            sign = self.giveMeSign(signItem, eastingNorthingItem)
-            degrees = float(match.group(2))
-            return sign * degrees
-        elif sourceFormatIndex == DMS_index:
-            signItem = match.group(1)
-            eastingNorthingItem = match.group(23)
-            sign = self.giveMeSign(signItem, eastingNorthingItem)
-            if match.group(4): # case 180
-                degrees == float(match.group(4))
-                minutes = 0.0
-                seconds = 0.0
-            else: # case any value
-                degrees = float(match.group(14))
-                minutes = float(match.group(17))
-                seconds = float(match.group(19))
-            return sign * degrees + minutes/60.0 + seconds/3600.0
-        elif sourceFormatIndex == DDM_index:
-            signItem = match.group(1)
-            eastingNorthingItem = match.group(18)
-            sign = self.giveMeSign(signItem, eastingNorthingItem)
-            if match.group(4): # case 180
-                degrees == float(match.group(4))
-                minutes = 0.0
-            else: # case any value
-                degrees = float(match.group(11))
-                minutes = float(match.group(14))
-            return sign * degrees + minutes/60.0
-        else:
-            raise GeoAlgorithmExecutionException('Invalid SOURCE_FORMAT value' )
+    def getIncrementalStore(self, layer, parameters, fieldNames, fieldPairs, sourceFields, spatialKey, maxProjectionError):
+        """Return the IncrementalStore of the job converting the
+        fieldPairs (sourceFields indexes) of layer with these parameters,
+        in the stores folder of the user: the output can be a temporary
+        file, with a new name at each run.
+        """
+        from boundlessprovider.incremental import IncrementalStore, STORE_SUFFIX
 
-    def latFromSourceToWgs(value, sourceFormatIndex):
-        """Parse and convert Lat value form a format to another.
-        Beaware that regext group position have to be aligned to the 
-        related regexp 
+        hashValue = conversionHash(layer.source(), fieldNames, fieldPairs, sourceFields, parameters, spatialKey,
+                                   maxProjectionError)
+        return IncrementalStore(os.path.join(userFolder(), 'stores', hashValue + STORE_SUFFIX), hashValue)
+
+    def getProjection(self, layer, sourceXFieldIndex, sourceYFieldIndex, maxError, progress):
+        """Return the Projection of the X/Y fields of layer from the
+        layer CRS to WGS84. With maxError its interpolation grid covers
+        the range of the fields, if they are numeric.
         """
-        if not value or not sourceFormatIndex:
-            return None
+        import numpy
+        from osgeo import osr
 
-        expression = FORMAT_REGEXP[sourceFormatIndex]['lat']
-        match = expression.match(value)
-        # general parsing error
-        if not match:
-            return None
-        # if something does not match but other parts match
-        if match.group(0) != value:
-            return None
-        # now parse 
-        if sourceFormatIndex == DD_index:
-            signItem = match.group(1)
-            eastingNorthingItem = match.group(11)
-            sign = self.giveMeSign(signItem, eastingNorthingItem)
-            degrees = float(match.group(2))
-            return sign * degrees
-        elif sourceFormatIndex == DMS_index:
-            signItem = match.group(1)
-            eastingNorthingItem = match.group(22)
-            sign = self.giveMeSign(signItem, eastingNorthingItem)
-            if match.group(4): # case 90
-                degrees == float(match.group(4))
-                minutes = 0.0
-                seconds = 0.0
-            else: # case any value
-                degrees = float(match.group(14))
-                minutes = float(match.group(16))
-                seconds = float(match.group(18))
-            return sign * degrees + minutes/60.0 + seconds/3600.0
-        elif sourceFormatIndex == DDM_index:
-            signItem = match.group(1)
-            eastingNorthingItem = match.group(18)
-            sign = self.giveMeSign(signItem, eastingNorthingItem)
-            if match.group(4): # case 90
-                degrees == float(match.group(4))
-                minutes = 0.0
-            else: # case any value
-                degrees = float(match.group(12))
-                minutes = float(match.group(14))
-            return sign * degrees + minutes/60.0
-        else:
-            raise GeoAlgorithmExecutionException('Invalid SOURCE_FORMAT value' )
-
-    def giveMeSign(signItem, eastingNorthingItem):
-        sign = 1
-        # only one can be set
-        if signItem and eastingNorthingItem:
-            raise GeoAlgorithmExecutionException('Malformed value: {}'.format(value) ) 
-        
-        if signItem and signItem == '+':
-            sign = 1
-        else: 
-            sign = -1
-        if eastingNorthingItem and eastingNorthingItem in []'e', 'E', 'n', 'N':
-            sign = 1
-        else: 
-            sign = -1
-        
-        
-    def fromSourceToDest(value, sourceFormatIndex, destFormatIndex, isLat=True):
-        """Parse and convert a value form a format to another.
+        from boundlessprovider.projected import Projection
+
+        crs = layer.crs()
+        if not crs.isValid():
+            raise GeoAlgorithmExecutionException('SOURCE_TABLE has no valid CRS to transform the projected X/Y from')
+        # the CRS transform of OGR, that ships with QGIS, transforms a
+        # whole chunk of points in a call
+        source = osr.SpatialReference()
+        wgs84 = osr.SpatialReference()
+        wgs84.ImportFromEPSG(4326)
+        try:
+            error = source.ImportFromProj4(crs.toProj4())
+        except RuntimeError:
+            error = True
+        if error:
+            raise GeoAlgorithmExecutionException('The CRS {} of SOURCE_TABLE can not be transformed by OGR'.format(crs.authid()))
+        for reference in (source, wgs84):
+            if hasattr(reference, 'SetAxisMappingStrategy'):
+                # GDAL 3: x/y and lon/lat, as in QGIS
+                reference.SetAxisMappingStrategy(osr.OAMS_TRADITIONAL_GIS_ORDER)
+        transform = osr.CoordinateTransformation(source, wgs84)
+
+        def transformPoint(point):
+            try:
+                return transform.TransformPoint(*point)
+            except RuntimeError:
+                return (numpy.nan, numpy.nan, numpy.nan)
+
+        def transformPoints(x, y):
+            points = numpy.column_stack((x, y)).tolist()
+            try:
+                transformed = transform.TransformPoints(points)
+            except RuntimeError:
+                # OGR exceptions are enabled and some of the points can
+                # not be transformed
+                transformed = [transformPoint(point) for point in points]
+            # points that can not be transformed are infinite
+            lonLat = numpy.array(transformed, dtype=numpy.float64).reshape(-1, 3)[:, :2]
+            lonLat[~numpy.isfinite(lonLat).all(axis=1)] = numpy.nan
+            return lonLat[:, 0].copy(), lonLat[:, 1].copy()
+
+        projection = Projection(transformPoints, maxError)
+        if maxError > 0:
+            # the minimum and maximum of text fields are the ones of the
+            # texts: the grid covers the first chunk
+            extent = None
+            fields = layer.fields()
+            if all(fields[index].type() in self.NUMERIC_FIELD_TYPES for index in (sourceXFieldIndex, sourceYFieldIndex)):
+                try:
+                    extent = (float(layer.minimumValue(sourceXFieldIndex)), float(layer.minimumValue(sourceYFieldIndex)),
+                              float(layer.maximumValue(sourceXFieldIndex)), float(layer.maximumValue(sourceYFieldIndex)))
+                except (TypeError, ValueError):
+                    # only NULL values
+                    extent = None
+            if extent is not None and projection.buildGrid(extent) is not None:
+                progress.setInfo('Reprojecting from {} with a grid of {} cells per side, measured error {:.3g} m'.format(
+                    crs.authid(), projection.grid.cells, projection.grid.error))
+            elif projection.gridFailure is not None:
+                progress.setInfo('{}, reprojecting every point'.format(projection.gridFailure))
+        return projection
+
+    def getPipeline(self):
+        """Return the Pipeline that converts in a thread of its own, with
+        the queue depth of the provider settings, None if the conversion
+        runs on the thread of the algorithm.
         """
-        expression = FORMAT_REGEXP[sourceFormatIndex][isLat? 'lat':'lon']
-        match = expression.match(value)
-        # general parsing error
-        if not match:
-            return None
-        # if something does not match but other parts match
-        if match.group(0) != value:
+        if not ProcessingConfig.getSetting(self.provider.CONVERT_IN_THREAD):
             return None
+        depth = ProcessingConfig.getSetting(self.provider.PIPELINE_QUEUE_DEPTH)
+        return Pipeline(depth=DEFAULT_QUEUE_DEPTH if depth is None else int(depth))
+
+    def closePipeline(self, pipeline):
+        if pipeline is not None:
+            pipeline.close()
+
+    def getChunkSize(self):
+        """Return the number of features converted and written at a
+        time, 0 for the whole table.
+        """
+        chunkSize = ProcessingConfig.getSetting(self.provider.CHUNK_SIZE)
+        if chunkSize is None:
+            return DEFAULT_CHUNK_SIZE
+        return int(chunkSize)
+
+    def getSortRunSize(self):
+        """Return the number of rows sorted in memory before a run is
+        spilled to a temporary file.
+        """
+        runSize = ProcessingConfig.getSetting(self.provider.SORT_RUN_SIZE)
+        if runSize is None:
+            return DEFAULT_RUN_SIZE
+        return int(runSize)
+
+    def getCacheSize(self):
+        cacheSize = ProcessingConfig.getSetting(self.provider.CONVERSION_CACHE_SIZE)
+        if cacheSize is None:
+            return DEFAULT_CACHE_SIZE
+        return int(cacheSize)
+
+    def getEngine(self, parameters, workers, timer=NULL_TIMER):
+        """Return the ConversionEngine of a run: with the worker pool and
+        the caches kept by the provider between runs if it is configured
+        so, otherwise with its own.
+        """
+        if ProcessingConfig.getSetting(self.provider.SHARED_ENGINE):
+            shared = self.provider.conversionEngine()
+            shared.configure(workers, self.getCacheSize())
+            return shared.engine(parameters, timer)
+        from boundlessprovider.engine import ConversionEngine
+        return ConversionEngine(parameters, workers, cacheSize=self.getCacheSize(), timer=timer)
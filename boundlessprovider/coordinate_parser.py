@@ -0,0 +1,335 @@
+# -*- coding: utf-8 -*-
+#
+# (c) 2017 Boundless Spatial Inc, http://boundlessgeo.com
+# This code is licensed under the GPL 2.0 license.
+#
+"""Batch parsing of coordinate columns.
+
+Parse a whole column (or a chunk of it) of DD/DMS/DDM strings in one
+call and return NumPy arrays of decimal degrees plus a validity mask,
+instead of parsing one feature at a time.
+
+Values are read with the coordinate_tokenizer scanners, that accept
+the same values as the geodesy_regex patterns. MGRS and UTM references
+are converted with the bulk_utm arrays engine. With the AUTO_index
+source format the format of the values is detected (format_detection)
+and each group of values of the same format goes to its parser.
+
+Values of another source datum than WGS84, MGRS and UTM references
+unprojected on its ellipsoid, are shifted to WGS84 in bulk by
+datum_shift.
+"""
+__copyright__ = '(C) Boundless Spatial Inc'
+
+# This will get replaced with a git SHA1 when you do a git archive
+__revision__ = '$Format:%H$'
+
+import numpy
+
+from boundlessprovider.coordinate_tokenizer import (
+    SCANNERS,
+    SHAPE_TABLE,
+    NEGATIVE,
+    scanPlan,
+    toDegrees,
+    DD_index,
+    DMS_index,
+    DDM_index,
+)
+from boundlessprovider.bulk_utm import (
+    parseMgrsColumn,
+    parseUtmColumn,
+    utmToLatLon,
+)
+from boundlessprovider.datum_shift import DATUMS, WGS84_DATUM_index
+from boundlessprovider.format_detection import (
+    detectFormats,
+    classifyValues,
+    MGRS_index,
+    UTM_index,
+    AUTO_index,
+    DEFAULT_SAMPLE_SIZE,
+)
+
+# external pypi library pygeodesy with MIT license
+# https://github.com/mrJean1/PyGeodesy
+from pygeodesy import mgrs
+from pygeodesy.datums import Datums
+from pygeodesy.ellipsoidalVincenty import LatLon
+try:
+    from pygeodesy.utm import parseUTM5 as parseUTM
+except ImportError:
+    from pygeodesy.utm import parseUTM
+
+try:
+    textType = unicode
+except NameError:
+    textType = str
+
+# coordinate_tokenizer.SHAPE_TABLE as a lookup array of character codes.
+# Codes over 255 never belong to a valid value and are all the same
+SHAPE_CODES = numpy.arange(257, dtype=numpy.uint32)
+for code, shape in SHAPE_TABLE.items():
+    SHAPE_CODES[code] = ord(shape)
+SHAPE_CODES[256] = 0xffff
+
+# over this number of digits an integer is not exact as float64, and
+# the number is read with float()
+EXACT_DIGITS = 15
+
+
+def asText(value):
+    """Return the stripped text of an attribute value or None if the
+    value is empty or NULL.
+    """
+    if value is None:
+        return None
+    if isinstance(value, bytes):
+        value = value.decode('utf-8')
+    elif isinstance(value, float):
+        value = textType('%.12f' % value).rstrip(u'0').rstrip(u'.')
+    elif not isinstance(value, textType):
+        value = textType(value)
+    value = value.strip()
+    if not value or value == 'NULL':
+        return None
+    return value
+
+
+def _parts(codes, rows, shape, part, texts):
+    """Read the number at the [start, stop) part of the rows of a shape
+    group. All the rows have the decimal point at the same position, so
+    the number is the integer of its digits over a power of ten, that
+    is exactly what float() returns while the integer is exact.
+    """
+    start, stop = part
+    point = shape.find(u'.', start, stop)
+    columns = [column for column in range(start, stop) if column != point]
+    if len(columns) > EXACT_DIGITS:
+        return numpy.array([float(texts[row][start:stop]) for row in rows])
+    powers = 10 ** numpy.arange(len(columns) - 1, -1, -1, dtype=numpy.int64)
+    digits = codes[rows][:, columns].astype(numpy.int64) - 48
+    fractionDigits = stop - point - 1 if point >= 0 else 0
+    return digits.dot(powers).astype(numpy.float64) / 10.0 ** fractionDigits
+
+
+def parseColumn(values, sourceFormatIndex, isLat=True):
+    """Parse a sequence of DD, DMS or DDM values.
+
+    Return a tuple (degrees, valid) where degrees is a float64 array of
+    signed decimal degrees and valid is a bool array that is False for
+    values that are empty, do not match or are malformed (both a sign
+    and a hemisphere letter). Invalid values have NaN degrees.
+
+    Values are grouped by shape (see coordinate_tokenizer): each shape
+    is scanned once and the numbers of its values are read for the
+    whole group with array arithmetic.
+    """
+    if sourceFormatIndex not in SCANNERS:
+        raise ValueError('Invalid source format index: {}'.format(sourceFormatIndex))
+
+    # text values are the common case, and are stripped inline
+    texts = [value.strip() if type(value) is textType else asText(value) or u''
+             for value in values]
+    count = len(texts)
+    result = numpy.full(count, numpy.nan, dtype=numpy.float64)
+    valid = numpy.zeros(count, dtype=bool)
+    if not count:
+        return result, valid
+
+    array = numpy.array(texts, dtype=textType)
+    width = array.dtype.itemsize // 4
+    codes = array.view(numpy.uint32).reshape(count, width)
+    shapes = SHAPE_CODES[numpy.minimum(codes, 256)].view(array.dtype).ravel()
+    uniqueShapes, inverse = numpy.unique(shapes, return_inverse=True)
+
+    # mostly distinct shapes: grouping costs more than it saves
+    if len(uniqueShapes) > max(64, count // 8):
+        for index, value in enumerate(texts):
+            # None if not valid or if both a sign and a hemisphere are set
+            degrees = toDegrees(value, sourceFormatIndex, isLat)
+            if degrees is not None:
+                result[index] = degrees
+                valid[index] = True
+        return result, valid
+
+    order = numpy.argsort(inverse, kind='mergesort')
+    stops = numpy.cumsum(numpy.bincount(inverse))
+    for group, shape in enumerate(uniqueShapes):
+        plan = scanPlan(shape, sourceFormatIndex, isLat)
+        # not valid, or both a sign and a hemisphere are set
+        if plan is None or (plan.sign >= 0 and plan.hemisphere >= 0):
+            continue
+        rows = order[stops[group - 1] if group else 0:stops[group]]
+        if plan.degrees is None:
+            degrees = numpy.full(len(rows), plan.limit, dtype=numpy.float64)
+        else:
+            degrees = _parts(codes, rows, shape, plan.degrees, texts)
+        if plan.minutes is not None:
+            degrees += _parts(codes, rows, shape, plan.minutes, texts) / 60.0
+        if plan.seconds is not None:
+            degrees += _parts(codes, rows, shape, plan.seconds, texts) / 3600.0
+        # sign and hemisphere letters are kept as they are in the shape
+        if ((plan.sign >= 0 and shape[plan.sign] == u'-') or
+                (plan.hemisphere >= 0 and shape[plan.hemisphere] in NEGATIVE)):
+            degrees = -degrees
+        result[rows] = degrees
+        valid[rows] = True
+
+    return result, valid
+
+
+def parseGridColumn(values, sourceFormatIndex, datumIndex=WGS84_DATUM_index):
+    """Parse a sequence of MGRS or UTM references, on the ellipsoid of
+    the datum of index datumIndex in datum_shift.DATUMS.
+
+    Return a tuple (lon, lat, valid) of arrays, as parseColumn does,
+    of that datum.
+    """
+    if sourceFormatIndex not in (MGRS_index, UTM_index):
+        raise ValueError('Invalid source format index: {}'.format(sourceFormatIndex))
+    isMgrs = sourceFormatIndex == MGRS_index
+
+    texts = [asText(value) for value in values]
+    if isMgrs:
+        zones, bands, south, eastings, northings, valid = parseMgrsColumn(texts)
+    else:
+        zones, south, eastings, northings, valid = parseUtmColumn(texts)
+    datum = DATUMS[datumIndex]
+    lat, lon = utmToLatLon(zones, south, eastings, northings, datum.projection)
+    lon[~valid] = numpy.nan
+    lat[~valid] = numpy.nan
+
+    # references in less common forms are left to pygeodesy
+    pyDatum = getattr(Datums, datum.name)
+    for index in numpy.flatnonzero(~valid):
+        value = texts[index]
+        if value is None:
+            continue
+        # pygeodesy parsing errors are ValueError subclasses
+        try:
+            if isMgrs:
+                utmObject = mgrs.parseMGRS(value, datum=pyDatum).toUtm()
+            else:
+                utmObject = parseUTM(value, datum=pyDatum)
+            latLonObject = utmObject.toLatLon(LatLon)
+        except ValueError:
+            continue
+        lon[index] = latLonObject.lon
+        lat[index] = latLonObject.lat
+        valid[index] = True
+
+    return lon, lat, valid
+
+
+def _parseRows(rows, xTexts, yTexts, xFormats, yFormats, lon, lat, valid, datumIndex):
+    """Parse the rows of the text columns, each with the parser of its
+    formats, setting lon, lat and valid of those rows. formats arrays
+    are aligned with rows. Rows are MGRS or UTM if the reference column,
+    xTexts or yTexts if xTexts is None, has that format, and are
+    unprojected on the ellipsoid of datumIndex.
+    """
+    gridTexts, gridFormats = (xTexts, xFormats) if xTexts is not None else (yTexts, yFormats)
+    isGrid = numpy.zeros(len(rows), dtype=bool)
+    for gridFormat in (MGRS_index, UTM_index):
+        selected = gridFormats == gridFormat
+        if not selected.any():
+            continue
+        isGrid |= selected
+        gridRows = rows[selected]
+        lon[gridRows], lat[gridRows], valid[gridRows] = parseGridColumn(
+            [gridTexts[row] for row in gridRows], gridFormat, datumIndex)
+
+    angleRows = rows[~isGrid]
+    angleValid = numpy.ones(len(angleRows), dtype=bool)
+    for texts, formats, degrees, isLat in ((xTexts, xFormats, lon, False), (yTexts, yFormats, lat, True)):
+        if texts is None:
+            continue
+        formats = formats[~isGrid]
+        columnValid = numpy.zeros(len(angleRows), dtype=bool)
+        for angleFormat in (DD_index, DMS_index, DDM_index):
+            selected = formats == angleFormat
+            if not selected.any():
+                continue
+            selectedRows = angleRows[selected]
+            degrees[selectedRows], columnValid[selected] = parseColumn(
+                [texts[row] for row in selectedRows], angleFormat, isLat)
+        angleValid &= columnValid
+    valid[angleRows] = angleValid
+
+
+def autoColumnsToDatum(xValues, yValues, datumIndex=WGS84_DATUM_index, sampleSize=DEFAULT_SAMPLE_SIZE):
+    """Convert the source X and Y columns of values of any format to
+    decimal degrees of the datum of index datumIndex, as columnsToDatum.
+
+    The format of each column is detected from a sample of its first
+    values. If the sample is of a single format, the whole column is
+    read as such and only the values that the parser rejects are then
+    classified one by one and parsed again.
+    """
+    xTexts = [asText(value) or u'' for value in xValues] if xValues is not None else None
+    yTexts = [asText(value) or u'' for value in yValues] if yValues is not None else None
+    count = len(xTexts if xTexts is not None else yTexts)
+    lon = numpy.full(count, numpy.nan, dtype=numpy.float64)
+    lat = numpy.full(count, numpy.nan, dtype=numpy.float64)
+    valid = numpy.zeros(count, dtype=bool)
+    rows = numpy.arange(count)
+
+    xFormats, xHomogeneous = detectFormats(xTexts, sampleSize) if xTexts is not None else (None, False)
+    yFormats, yHomogeneous = detectFormats(yTexts, sampleSize) if yTexts is not None else (None, False)
+    _parseRows(rows, xTexts, yTexts, xFormats, yFormats, lon, lat, valid, datumIndex)
+
+    if xHomogeneous or yHomogeneous:
+        rejected = rows[~valid]
+        if len(rejected):
+            _parseRows(rejected, xTexts, yTexts,
+                       classifyValues(xTexts, rejected) if xTexts is not None else None,
+                       classifyValues(yTexts, rejected) if yTexts is not None else None,
+                       lon, lat, valid, datumIndex)
+    lon[~valid] = numpy.nan
+    lat[~valid] = numpy.nan
+    return lon, lat, valid
+
+
+def columnsToWgs(xValues, yValues, sourceFormatIndex, datumIndex=WGS84_DATUM_index):
+    """Convert the source X and Y columns of the datum of index
+    datumIndex in datum_shift.DATUMS to WGS84 decimal degrees, as
+    columnsToDatum. Shifting a point from another datum needs both its
+    coordinates: raise ValueError for a single X or Y column of DD, DMS,
+    DDM or Auto values.
+    """
+    if datumIndex == WGS84_DATUM_index:
+        return columnsToDatum(xValues, yValues, sourceFormatIndex)
+    if sourceFormatIndex not in (MGRS_index, UTM_index) and (xValues is None or yValues is None):
+        raise ValueError('The datum shift of {} values needs both the X and Y columns'.format(DATUMS[datumIndex].name))
+    lon, lat, valid = columnsToDatum(xValues, yValues, sourceFormatIndex, datumIndex)
+    lon, lat = DATUMS[datumIndex].toWgs84(lon, lat)
+    return lon, lat, valid
+
+
+def columnsToDatum(xValues, yValues, sourceFormatIndex, datumIndex=WGS84_DATUM_index):
+    """Convert the source X and Y columns to decimal degrees of the
+    datum of index datumIndex, MGRS and UTM references unprojected on
+    its ellipsoid.
+
+    MGRS and UTM references are read from xValues, or from yValues if
+    xValues is None. Return a tuple (lon, lat, valid) of arrays where
+    valid is True only if every set column is valid in that row.
+    """
+    if sourceFormatIndex == AUTO_index:
+        return autoColumnsToDatum(xValues, yValues, datumIndex)
+    if sourceFormatIndex in (MGRS_index, UTM_index):
+        return parseGridColumn(xValues if xValues is not None else yValues,
+                               sourceFormatIndex, datumIndex)
+
+    count = len(xValues if xValues is not None else yValues)
+    valid = numpy.ones(count, dtype=bool)
+    lon = numpy.full(count, numpy.nan, dtype=numpy.float64)
+    lat = numpy.full(count, numpy.nan, dtype=numpy.float64)
+    if xValues is not None:
+        lon, lonValid = parseColumn(xValues, sourceFormatIndex, isLat=False)
+        valid &= lonValid
+    if yValues is not None:
+        lat, latValid = parseColumn(yValues, sourceFormatIndex, isLat=True)
+        valid &= latValid
+    return lon, lat, valid
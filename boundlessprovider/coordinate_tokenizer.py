@@ -0,0 +1,377 @@
+# -*- coding: utf-8 -*-
+#
+# (c) 2017 Boundless Spatial Inc, http://boundlessgeo.com
+# This code is licensed under the GPL 2.0 license.
+#
+"""Single pass tokenizer for DD, DMS and DDM coordinate values.
+
+The scanner reads the sign, degrees, minutes, seconds and hemisphere
+letter walking the string once, without backtracking, and stops at the
+first character that cannot be part of a valid value.
+
+What the scanner finds only depends on the class of each character
+(which digit range, which separator), so it runs on the shape of the
+value, e.g. '-12/23/59.9' and '-13/24/39.9' both have shape
+'-12/22/29.9'. The result, the positions of the parts or a failure, is
+cached by shape: a column with a few shapes is scanned a few times
+and the remaining values are only translated and sliced.
+
+It accepts exactly the values accepted by the geodesy_regex patterns
+(DD_*_regexp, DMS_*_regexp and DDM_*_regexp) when the first match of
+the pattern has to cover the whole value. The rules below are the ones
+the regexp engine applies, quirks included, e.g.:
+
+- the 90 or 180 alternative wins as soon as the value starts with it,
+  so '90.5' is not a valid DD latitude;
+- three digits longitude degrees have to be in 1[0-7]x for DD and in
+  1[1-7]x for DMS and DDM, so '105/0/0' is not a valid DMS longitude;
+- DDM latitude minutes need a decimal point, DDM longitude minutes
+  need the closing quote.
+"""
+__copyright__ = '(C) Boundless Spatial Inc'
+
+# This will get replaced with a git SHA1 when you do a git archive
+__revision__ = '$Format:%H$'
+
+from collections import namedtuple
+
+from boundlessprovider.formats import DD_index, DMS_index, DDM_index
+
+DEGREE_SYMBOL = u'\xba'
+
+DIGITS = frozenset(u'0123456789')
+# the same characters matched by \s in the regexps
+SPACES = frozenset(u' \t\n\r\f\v')
+DEGREE_SEPARATORS = frozenset([u'/', u':', DEGREE_SYMBOL])
+MINUTE_SEPARATORS = frozenset(u'/:\'')
+LAT_DEGREE_FIRST_DIGITS = frozenset(u'12345678')
+LON_DD_DEGREE_SECOND_DIGITS = frozenset(u'01234567')
+LON_DEGREE_SECOND_DIGITS = frozenset(u'1234567')
+MINUTE_FIRST_DIGITS = frozenset(u'12345')
+LAT_HEMISPHERES = frozenset(u'nNsS')
+LON_HEMISPHERES = frozenset(u'eEwW')
+NEGATIVE = frozenset(u'-sSwW')
+
+# digits that the regexps never tell apart share a class; every space
+# is a space
+SHAPE_TABLE = dict((ord(digit), shape) for digit, shape in zip(u'0123456789', u'0122226689'))
+SHAPE_TABLE.update((ord(space), u' ') for space in u'\t\n\r\f\v')
+
+# cached plans per scanner are dropped when they exceed this size
+PLAN_CACHE_SIZE = 4096
+
+# where the parts are in a value, as [start, stop) slices. limit is the
+# degrees of the 90 or 180 alternative, that has no degrees slice
+ScanPlan = namedtuple('ScanPlan', 'sign limit degrees minutes seconds hemisphere')
+
+
+def _skipDigits(value, position, end):
+    while position < end and value[position] in DIGITS:
+        position += 1
+    return position
+
+
+def _skipSpaces(value, position, end):
+    while position < end and value[position] in SPACES:
+        position += 1
+    return position
+
+
+def _skipZeros(value, position, end):
+    while position < end and value[position] == u'0':
+        position += 1
+    return position
+
+
+def _separator(value, position, end, separators):
+    """Match \\s*(separator) where separator can also be a space.
+    Return the position after the separator or -1.
+    """
+    spaced = _skipSpaces(value, position, end)
+    if spaced < end and value[spaced] in separators:
+        return spaced + 1
+    if spaced > position:
+        # the last space is the separator
+        return spaced
+    return -1
+
+
+def _isLatDegrees(value, start, stop):
+    # [1-8]?\d
+    length = stop - start
+    return length == 1 or (length == 2 and value[start] in LAT_DEGREE_FIRST_DIGITS)
+
+
+def _isLonDegrees(value, start, stop, secondDigits):
+    # [1]?[0-7]\d|\d?\d (DD) or [1]?[1-7]\d|\d?\d (DMS, DDM)
+    length = stop - start
+    return (length in (1, 2) or
+            (length == 3 and value[start] == u'1' and value[start + 1] in secondDigits))
+
+
+def _isMinutes(value, start, stop):
+    # [1-5]?\d
+    length = stop - start
+    return length == 1 or (length == 2 and value[start] in MINUTE_FIRST_DIGITS)
+
+
+def _sign(value, end):
+    """Match ([+-])?. Return the position after it and the sign
+    position or -1.
+    """
+    if end and value[0] in u'+-':
+        return 1, 0
+    return 0, -1
+
+
+def _hemisphere(value, position, end, isLat):
+    """Match the \\s*([nNsS])? or \\s*([eEwW])? tail. Return the
+    hemisphere position or -1 if the value does not end here.
+    """
+    position = _skipSpaces(value, position, end)
+    if position < end and value[position] in (LAT_HEMISPHERES if isLat else LON_HEMISPHERES):
+        return position if position + 1 == end else None
+    return -1 if position == end else None
+
+
+def _limit(value, position, isLat):
+    limit = u'90' if isLat else u'180'
+    if value.startswith(limit, position):
+        return position + len(limit), float(limit)
+    return position, None
+
+
+def _scanLimit(value, position, end, minuteGroup, closing):
+    """Match what follows 90 or 180 in the DMS and DDM regexps.
+    Return the position after it or -1.
+    """
+    position = _separator(value, position, end, DEGREE_SEPARATORS)
+    if position < 0:
+        return -1
+    position = _skipSpaces(value, position, end)
+    if minuteGroup:
+        # ((0*)\s*(\/|\:|\s|\'))?\s*
+        minutes = _separator(value, _skipZeros(value, position, end), end,
+                             MINUTE_SEPARATORS)
+        if minutes >= 0:
+            position = _skipSpaces(value, minutes, end)
+    # ((0*)(\.(0*))?(closing)?)?
+    position = _skipZeros(value, position, end)
+    if position < end and value[position] == u'.':
+        position = _skipZeros(value, position + 1, end)
+    if position < end and value[position] == closing:
+        position += 1
+    return position
+
+
+def _scanDegrees(value, position, end, isLat, lonSecondDigits):
+    """Match the degrees integer part. Return its stop or -1."""
+    stop = _skipDigits(value, position, end)
+    if isLat:
+        if _isLatDegrees(value, position, stop):
+            return stop
+    elif _isLonDegrees(value, position, stop, lonSecondDigits):
+        return stop
+    return -1
+
+
+def _scanDD(value, isLat):
+    end = len(value)
+    position, sign = _sign(value, end)
+    position, limit = _limit(value, position, isLat)
+    degrees = None
+    if limit is not None:
+        # (\.(0*))?
+        if position < end and value[position] == u'.':
+            position = _skipZeros(value, position + 1, end)
+    else:
+        start = position
+        position = _scanDegrees(value, start, end, isLat, LON_DD_DEGREE_SECOND_DIGITS)
+        if position < 0:
+            return None
+        # (\.(\d+))?
+        if (position + 1 < end and value[position] == u'.' and
+                value[position + 1] in DIGITS):
+            position = _skipDigits(value, position + 1, end)
+        degrees = (start, position)
+    # \s*(\º)?\s*([nNsS])?
+    position = _skipSpaces(value, position, end)
+    if position < end and value[position] == DEGREE_SYMBOL:
+        position += 1
+    hemisphere = _hemisphere(value, position, end, isLat)
+    if hemisphere is None:
+        return None
+    return ScanPlan(sign, limit, degrees, None, None, hemisphere)
+
+
+def _scanDMS(value, isLat):
+    end = len(value)
+    position, sign = _sign(value, end)
+    if not isLat:
+        # ([-+])?\s*
+        position = _skipSpaces(value, position, end)
+    position, limit = _limit(value, position, isLat)
+    degrees = minutes = seconds = None
+    if limit is not None:
+        position = _scanLimit(value, position, end, True, u'"')
+        if position < 0:
+            return None
+    else:
+        start = position
+        position = _scanDegrees(value, start, end, isLat, LON_DEGREE_SECOND_DIGITS)
+        if position < 0:
+            return None
+        degrees = (start, position)
+        if isLat:
+            # (\/|\:|\s|\º)\s*
+            if position == end or not (value[position] in DEGREE_SEPARATORS or
+                                       value[position] in SPACES):
+                return None
+            position = _skipSpaces(value, position + 1, end)
+        else:
+            # \s*(\/|\:|\s|\º)\s*
+            position = _separator(value, position, end, DEGREE_SEPARATORS)
+            if position < 0:
+                return None
+            position = _skipSpaces(value, position, end)
+
+        start = position
+        position = _skipDigits(value, start, end)
+        if not _isMinutes(value, start, position):
+            return None
+        minutes = (start, position)
+        if isLat:
+            # (\/|\:|\s|\')\s*
+            if position == end or not (value[position] in MINUTE_SEPARATORS or
+                                       value[position] in SPACES):
+                return None
+            position = _skipSpaces(value, position + 1, end)
+        else:
+            # \s*(\/|\:|\s|\')\s*
+            position = _separator(value, position, end, MINUTE_SEPARATORS)
+            if position < 0:
+                return None
+            position = _skipSpaces(value, position, end)
+
+        # [1-5]?\d(\.(\d*))?
+        start = position
+        position = _skipDigits(value, start, end)
+        if not _isMinutes(value, start, position):
+            return None
+        if position < end and value[position] == u'.':
+            position = _skipDigits(value, position + 1, end)
+        seconds = (start, position)
+        # (\")? or \s*(\")?
+        if not isLat:
+            position = _skipSpaces(value, position, end)
+        if position < end and value[position] == u'"':
+            position += 1
+    hemisphere = _hemisphere(value, position, end, isLat)
+    if hemisphere is None:
+        return None
+    return ScanPlan(sign, limit, degrees, minutes, seconds, hemisphere)
+
+
+def _scanDDM(value, isLat):
+    end = len(value)
+    position, sign = _sign(value, end)
+    position, limit = _limit(value, position, isLat)
+    degrees = minutes = None
+    if limit is not None:
+        position = _scanLimit(value, position, end, False, u'\'')
+        if position < 0:
+            return None
+    else:
+        start = position
+        position = _scanDegrees(value, start, end, isLat, LON_DEGREE_SECOND_DIGITS)
+        if position < 0:
+            return None
+        degrees = (start, position)
+        # \s*(\/|\:|\s|\º)\s*
+        position = _separator(value, position, end, DEGREE_SEPARATORS)
+        if position < 0:
+            return None
+        position = _skipSpaces(value, position, end)
+
+        start = position
+        position = _skipDigits(value, start, end)
+        if not _isMinutes(value, start, position):
+            return None
+        if isLat:
+            # [1-5]?\d(\.(\d+)?)(\')?
+            if position == end or value[position] != u'.':
+                return None
+            position = _skipDigits(value, position + 1, end)
+            minutes = (start, position)
+            if position < end and value[position] == u'\'':
+                position += 1
+        else:
+            # [1-5]?\d(\.(\d+))?(\')
+            if position < end and value[position] == u'.':
+                position = _skipDigits(value, position + 1, end)
+                if value[position - 1] == u'.':
+                    return None
+            minutes = (start, position)
+            if position == end or value[position] != u'\'':
+                return None
+            position += 1
+    hemisphere = _hemisphere(value, position, end, isLat)
+    if hemisphere is None:
+        return None
+    return ScanPlan(sign, limit, degrees, minutes, None, hemisphere)
+
+
+SCANNERS = {
+    DD_index: _scanDD,
+    DMS_index: _scanDMS,
+    DDM_index: _scanDDM,
+}
+
+_plans = {}
+
+
+def scanPlan(value, sourceFormatIndex, isLat=True):
+    """Return the ScanPlan of a text value, or None if the value is not
+    valid for the format. Plans are cached by value shape.
+    """
+    key = (sourceFormatIndex, isLat)
+    try:
+        plans = _plans[key]
+    except KeyError:
+        if sourceFormatIndex not in SCANNERS:
+            raise ValueError('Invalid source format index: {}'.format(sourceFormatIndex))
+        plans = _plans[key] = {}
+    shape = value.translate(SHAPE_TABLE)
+    try:
+        return plans[shape]
+    except KeyError:
+        pass
+    if len(plans) >= PLAN_CACHE_SIZE:
+        plans.clear()
+    plan = plans[shape] = SCANNERS[sourceFormatIndex](shape, isLat)
+    return plan
+
+
+def toDegrees(value, sourceFormatIndex, isLat=True):
+    """Signed decimal degrees of a text (unicode) value, or None if
+    the value is not valid or is malformed: it can have the sign or the
+    hemisphere, not both.
+    """
+    plan = scanPlan(value, sourceFormatIndex, isLat)
+    if plan is None:
+        return None
+    signAt, limit, degrees, minutes, seconds, hemisphereAt = plan
+    if signAt >= 0 and hemisphereAt >= 0:
+        return None
+    if degrees is None:
+        result = limit
+    else:
+        result = float(value[degrees[0]:degrees[1]])
+    if minutes is not None:
+        result += float(value[minutes[0]:minutes[1]]) / 60.0
+    if seconds is not None:
+        result += float(value[seconds[0]:seconds[1]]) / 3600.0
+    if ((signAt >= 0 and value[signAt] == u'-') or
+            (hemisphereAt >= 0 and value[hemisphereAt] in NEGATIVE)):
+        return -result
+    return result
@@ -0,0 +1,119 @@
+# -*- coding: utf-8 -*-
+#
+# (c) 2017 Boundless Spatial Inc, http://boundlessgeo.com
+# This code is licensed under the GPL 2.0 license.
+#
+"""Datum shift of lon/lat arrays to WGS84.
+
+pygeodesy shifts a point to another datum through a LatLon, a Cartesian
+and a Transform object built for each point. Here each Datum computes
+its ellipsoid and Helmert constants once, when this module is imported,
+and shifts whole arrays: lon/lat on the datum ellipsoid to geocentric
+x, y, z, the inverse of the Helmert transform from WGS84 to the datum,
+as pygeodesy applies it, and geocentric x, y, z back to lon/lat on the
+WGS84 ellipsoid. Source points are at height 0 and the shifted heights
+are dropped.
+
+The Helmert parameters are the ones of pygeodesy.Datums, good to a few
+metres: the datums have no single exact transform to WGS84. The shifts
+are tested against pygeodesy on reference points in test_datum_shift.
+"""
+__copyright__ = '(C) Boundless Spatial Inc'
+
+# This will get replaced with a git SHA1 when you do a git archive
+__revision__ = '$Format:%H$'
+
+import numpy
+
+from boundlessprovider.bulk_utm import TransverseMercator, WGS84_TM, WGS84_A, WGS84_F
+from boundlessprovider.formats import WGS84_DATUM_index
+
+TOLERANCE_DEGREES = 1e-9
+# fixed point iterations of the geocentric to geodetic latitude, each
+# one reduces the error of a point near the ellipsoid by about e2
+LATITUDE_ITERATIONS = 4
+
+_ARCSECOND = numpy.pi / (180.0 * 3600.0)
+
+
+def _geocentric(lon, lat, a, e2):
+    """Return the geocentric (x, y, z) arrays of lon/lat degrees arrays
+    on the ellipsoid of semi-major axis a and eccentricity squared e2.
+    """
+    lam = numpy.radians(lon)
+    phi = numpy.radians(lat)
+    sinPhi = numpy.sin(phi)
+    cosPhi = numpy.cos(phi)
+    n = a / numpy.sqrt(1 - e2 * sinPhi * sinPhi)
+    return n * cosPhi * numpy.cos(lam), n * cosPhi * numpy.sin(lam), n * (1 - e2) * sinPhi
+
+
+def _geodetic(x, y, z, a, e2):
+    """Return the (lon, lat) degrees arrays of geocentric x, y, z arrays
+    on the ellipsoid of semi-major axis a and eccentricity squared e2.
+    """
+    p = numpy.hypot(x, y)
+    phi = numpy.arctan2(z, p * (1 - e2))
+    for _ in range(LATITUDE_ITERATIONS):
+        sinPhi = numpy.sin(phi)
+        n = a / numpy.sqrt(1 - e2 * sinPhi * sinPhi)
+        phi = numpy.arctan2(z + e2 * n * sinPhi, p)
+    return numpy.degrees(numpy.arctan2(y, x)), numpy.degrees(phi)
+
+
+class Datum(object):
+    """Ellipsoid of semi-major axis a and flattening f, with the Helmert
+    transform from WGS84 to the datum: translations tx, ty, tz in
+    metres, scale s in ppm and rotations sx, sy, sz in arcseconds, as
+    pygeodesy.datums.Transform has them. projection is the UTM
+    projection on the ellipsoid.
+    """
+
+    def __init__(self, name, a, f, tx=0.0, ty=0.0, tz=0.0, s=0.0, sx=0.0, sy=0.0, sz=0.0, projection=None):
+        self.name = name
+        self.a = a
+        self.f = f
+        self.e2 = f * (2 - f)
+        self.projection = projection or TransverseMercator(a, f)
+        self.isWgs84 = (a, f, tx, ty, tz, s, sx, sy, sz) == (WGS84_A, WGS84_F, 0, 0, 0, 0, 0, 0, 0)
+        # the inverse transform, from the datum to WGS84: the small
+        # rotation matrix with the opposite angles and scale
+        s1 = 1 - s * 1e-6
+        rx, ry, rz = sx * _ARCSECOND, sy * _ARCSECOND, sz * _ARCSECOND
+        self.matrix = numpy.array([[s1, rz, -ry],
+                                   [-rz, s1, rx],
+                                   [ry, -rx, s1]])
+        self.translation = -numpy.array([tx, ty, tz])
+
+    def toWgs84(self, lon, lat):
+        """Shift lon/lat degrees arrays of the datum to WGS84. Return new
+        (lon, lat) arrays, NaN where a coordinate is NaN.
+        """
+        lon = numpy.asarray(lon, dtype=numpy.float64)
+        lat = numpy.asarray(lat, dtype=numpy.float64)
+        if self.isWgs84:
+            return lon.copy(), lat.copy()
+        x, y, z = self.matrix.dot(numpy.vstack(_geocentric(lon, lat, self.a, self.e2))) + self.translation[:, None]
+        return _geodetic(x, y, z, WGS84_A, WGS84_F * (2 - WGS84_F))
+
+
+# by the indexes of formats, DATUM_NAMES
+DATUMS = [
+    Datum('WGS84', WGS84_A, WGS84_F, projection=WGS84_TM),
+    # International 1924 ellipsoid
+    Datum('ED50', 6378388.0, 1 / 297.0, 89.5, 93.8, 123.1, -1.2, 0.0, 0.0, 0.156),
+    # Clarke 1866 ellipsoid
+    Datum('NAD27', 6378206.4, 1 / 294.978698213898, 8.0, -160.0, -176.0),
+    # Airy 1830 ellipsoid
+    Datum('OSGB36', 6377563.396, 1 / 299.3249646, -446.448, 125.157, -542.06, 20.4894, -0.1502, -0.247, -0.8421),
+]
+
+
+def datumToWgs84(lon, lat, datumIndex):
+    """Shift lon/lat degrees arrays of the datum of index datumIndex in
+    DATUMS to WGS84, see Datum.toWgs84.
+    """
+    if not 0 <= datumIndex < len(DATUMS):
+        raise ValueError('Invalid datum index: {}'.format(datumIndex))
+    return DATUMS[datumIndex].toWgs84(lon, lat)
+
@@ -0,0 +1,289 @@
+# -*- coding: utf-8 -*-
+#
+# (c) 2017 Boundless Spatial Inc, http://boundlessgeo.com
+# This code is licensed under the GPL 2.0 license.
+#
+"""Conversion engine, independent from QGIS.
+
+The engine converts chunks of (x, y) source value pairs to the
+destination format, serially through a conversion cache or in a pool
+of worker processes. It is used by the Processing algorithm on the
+layer features and by the command line (boundlessprovider.cli) on
+delimited files:
+
+    parameters = ConversionParameters(DMS_index, DD_index, None, None, True, True)
+    with ConversionEngine(parameters) as engine:
+        for context, results in engine.convertChunks(items):
+            ...
+
+where items yields a (context, pairs) tuple for each chunk, context
+being anything the caller needs back with the results.
+
+A SharedConversionEngine keeps the worker pool and the conversion caches
+between runs, for callers that convert many times in the same process
+(the Processing provider, for batch runs and models).
+
+Several source field pairs and destination formats are converted in the
+same scan: the pairs of every source field pair of a chunk are converted
+together, each value is parsed once and formatted in each destination
+format of ConversionParameters.extraDestinations. outputColumns maps
+the results to the destination fields.
+"""
+__copyright__ = '(C) Boundless Spatial Inc'
+
+# This will get replaced with a git SHA1 when you do a git archive
+__revision__ = '$Format:%H$'
+
+from boundlessprovider.conversion_cache import ConversionCache, clearSharedCaches, sharedCache, DEFAULT_CACHE_SIZE
+from boundlessprovider.converter import ConversionParameters, convertPairs
+from boundlessprovider.coordinate_parser import asText, parseColumn
+from boundlessprovider.format_detection import classify, MGRS_index, UTM_index, AUTO_index, UNKNOWN_index
+from boundlessprovider.formats import DD_index
+from boundlessprovider.instrumentation import NULL_TIMER
+from boundlessprovider.parallel import ParallelConverter
+
+# names of the source formats, by index
+FORMAT_NAMES = ['DD', 'DMS', 'DDM', 'MGRS', 'UTM', 'Auto']
+# fields of the rejected rows tables, after the row or feature id
+REJECT_FIELDS = ['x_value', 'y_value', 'reason']
+
+
+def pairsOf(records, xIndex, yIndex):
+    """Return the (x, y) source value pairs of records as text (see
+    coordinate_parser.asText), None for an empty or NULL value and for
+    an index not set. Attribute values of QGIS features, such as NULL
+    variants and dates, never get to the caches and the worker
+    processes.
+    """
+    return [(asText(record[xIndex]) if xIndex is not None else None,
+             asText(record[yIndex]) if yIndex is not None else None)
+            for record in records]
+
+
+def fieldPairsOf(records, sourceFields):
+    """Return the source value pairs of records, as pairsOf, for each
+    of the (xIndex, yIndex) sourceFields, one list after the other.
+    """
+    pairs = []
+    for xIndex, yIndex in sourceFields:
+        pairs.extend(pairsOf(records, xIndex, yIndex))
+    return pairs
+
+
+def _splitSpecs(text):
+    return [spec.strip() for spec in (text or u'').replace(u'\n', u';').split(u';') if spec.strip()]
+
+
+def parseFieldPairs(text):
+    """Parse source field pairs written as X,Y;X,Y, one of the two
+    names can be empty. Return a list of (xField, yField), None for an
+    empty name. Raise ValueError for a malformed pair.
+    """
+    fieldPairs = []
+    for spec in _splitSpecs(text):
+        names = [name.strip() or None for name in spec.split(u',')]
+        if len(names) != 2 or names == [None, None]:
+            raise ValueError(u'Malformed source field pair "{}", expected X,Y'.format(spec))
+        fieldPairs.append(tuple(names))
+    return fieldPairs
+
+
+def parseDestinations(text):
+    """Parse destinations written as FORMAT:X,Y,XY;FORMAT:X,Y,XY,
+    FORMAT being a name of FORMAT_NAMES but Auto, with empty or
+    missing names for the fields not written. Return a list of
+    (destinationFormat, (xField, yField, xyField)). Raise ValueError
+    for a malformed destination.
+    """
+    destinations = []
+    for spec in _splitSpecs(text):
+        formatName, _, fields = spec.partition(u':')
+        names = [name.upper() for name in FORMAT_NAMES[:AUTO_index]]
+        if formatName.strip().upper() not in names:
+            raise ValueError(u'Unknown destination format in "{}", expected one of {}'.format(
+                spec, u', '.join(FORMAT_NAMES[:AUTO_index])))
+        fieldNames = [name.strip() or None for name in fields.split(u',')]
+        fieldNames += [None] * (3 - len(fieldNames))
+        if len(fieldNames) != 3 or fieldNames == [None, None, None]:
+            raise ValueError(u'Malformed destination "{}", expected FORMAT:X,Y,XY'.format(spec))
+        destinations.append((names.index(formatName.strip().upper()), tuple(fieldNames)))
+    return destinations
+
+
+def outputColumns(destinations, pairCount):
+    """Return the (name, isNumeric, pairIndex, resultIndex) of each
+    destination field: the fields of every (destinationFormat,
+    (xField, yField, xyField)) of destinations for each of the
+    pairCount source field pairs, the ones of the second pair on with a
+    _2, _3... suffix. resultIndex is the index of the value in the
+    results of the pair. Raise ValueError for a field set twice.
+    """
+    columns = []
+    for pairIndex in range(pairCount):
+        for destinationIndex, (destinationFormat, fieldNames) in enumerate(destinations):
+            for valueIndex, name in enumerate(fieldNames):
+                if not name:
+                    continue
+                if pairIndex:
+                    name = u'{}_{}'.format(name, pairIndex + 1)
+                isNumeric = valueIndex < 2 and destinationFormat == DD_index
+                columns.append((name, isNumeric, pairIndex, 1 + 3 * destinationIndex + valueIndex))
+    names = [column[0] for column in columns]
+    for name in names:
+        if names.count(name) > 1:
+            raise ValueError(u'Destination field {} is set more than once'.format(name))
+    return columns
+
+
+def malformedValue(pair):
+    """Return the first non empty value of the pair of a row that is
+    not valid, None if all the values are empty.
+    """
+    for value in pair:
+        if asText(value) is not None:
+            return value
+    return None
+
+
+def rejectReason(pair, parameters):
+    """Return why the source values of a row that is not valid were
+    rejected, None if they are all empty. Rows are converted in bulk
+    without reasons: this parses the values of a single row again.
+    """
+    xText = asText(pair[0]) if parameters.hasX else None
+    yText = asText(pair[1]) if parameters.hasY else None
+    if xText is None and yText is None:
+        return None
+    sourceFormat = parameters.sourceFormat
+    gridText = xText if parameters.hasX else yText
+    if sourceFormat == AUTO_index and gridText is not None and classify(gridText) in (MGRS_index, UTM_index):
+        sourceFormat = classify(gridText)
+    if sourceFormat in (MGRS_index, UTM_index):
+        return u'Malformed {} reference'.format(FORMAT_NAMES[sourceFormat])
+
+    for text, name, isSet, isLat in ((xText, u'X', parameters.hasX, False), (yText, u'Y', parameters.hasY, True)):
+        if not isSet:
+            continue
+        if text is None:
+            return u'Missing {} value'.format(name)
+        valueFormat = classify(text) if sourceFormat == AUTO_index else sourceFormat
+        if valueFormat == UNKNOWN_index:
+            return u'Unrecognised format of {} value'.format(name)
+        if not parseColumn([text], valueFormat, isLat)[1][0]:
+            return u'Malformed {} {} value'.format(FORMAT_NAMES[valueFormat], name)
+    return u'Malformed value'
+
+
+class ConversionEngine(object):
+    """Converts chunks of source value pairs with ConversionParameters.
+
+    With workers > 1 chunks are converted in a process pool, otherwise
+    through cache, a new ConversionCache of cacheSize if not set. With
+    pool, a ParallelConverter of the caller, chunks are converted in it
+    and it is not closed with the engine. Stage times go to timer. hits
+    and misses count the cache lookups.
+    """
+
+    def __init__(self, parameters, workers=1, cache=None, cacheSize=DEFAULT_CACHE_SIZE, timer=NULL_TIMER, pool=None):
+        self.parameters = parameters
+        self.timer = timer
+        self.pool = pool
+        self.ownsPool = pool is None and workers > 1
+        self.cache = None
+        if self.ownsPool:
+            self.pool = ParallelConverter(workers, cacheSize, timer)
+        elif pool is None:
+            self.cache = cache if cache is not None else ConversionCache(cacheSize)
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, excType, excValue, traceback):
+        self.close()
+
+    def close(self):
+        if self.ownsPool:
+            self.pool.close()
+
+    @property
+    def hits(self):
+        return (self.pool or self.cache).hits
+
+    @property
+    def misses(self):
+        return (self.pool or self.cache).misses
+
+    def convertChunks(self, items):
+        """Convert an iterable of (context, pairs) items. Yield a tuple
+        (context, results) for each item, in the items order, where
+        results is the list of (valid, X, Y, XY...) of the pairs, see
+        converter.formatWgs.
+        """
+        if self.pool is not None:
+            for item in self.pool.convertChunks(items, self.parameters, self.timer):
+                yield item
+            return
+        parameters = self.parameters
+        timer = self.timer
+        for context, pairs in items:
+            # the convert stage includes the parse and format ones
+            with timer.stage('convert', len(pairs)):
+                results = self.cache.convertColumn(
+                    pairs, lambda distinctPairs: convertPairs(distinctPairs, parameters, timer))
+            yield context, results
+
+
+class SharedConversionEngine(object):
+    """Conversion state kept between runs: the pool of workers, with
+    their own caches, and the shared conversion caches of the last
+    parameters (see conversion_cache.sharedCache). The converter
+    modules, with their compiled patterns and lookup tables, stay
+    imported in this process and in the workers. Runs use it one at a
+    time:
+
+        shared = SharedConversionEngine()
+        shared.configure(workers, cacheSize)
+        with shared.engine(parameters, timer) as engine:
+            ...
+        shared.close()
+    """
+
+    def __init__(self, workers=1, cacheSize=DEFAULT_CACHE_SIZE):
+        self.workers = workers
+        self.cacheSize = cacheSize
+        self.pool = None
+
+    def configure(self, workers, cacheSize):
+        """Apply the settings of a run. The pool is started again only
+        if they changed, the workers get the cache size when they start.
+        """
+        if self.pool is not None and (workers, cacheSize) != (self.workers, self.cacheSize):
+            self.closePool()
+        self.workers = workers
+        self.cacheSize = cacheSize
+
+    def engine(self, parameters, timer=NULL_TIMER):
+        """Return the ConversionEngine of a run, with the pool and
+        caches of the previous ones. Its hits and misses count only the
+        lookups of the run.
+        """
+        if self.workers > 1:
+            if self.pool is None:
+                self.pool = ParallelConverter(self.workers, self.cacheSize)
+            self.pool.hits = 0
+            self.pool.misses = 0
+            return ConversionEngine(parameters, timer=timer, pool=self.pool)
+        cache = sharedCache(parameters, self.cacheSize)
+        cache.hits = 0
+        cache.misses = 0
+        return ConversionEngine(parameters, cache=cache, timer=timer)
+
+    def closePool(self):
+        """Terminate the workers, the next run starts a new pool."""
+        if self.pool is not None:
+            self.pool.close()
+            self.pool = None
+
+    def close(self):
+        self.closePool()
+        clearSharedCaches()
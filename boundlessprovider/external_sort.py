@@ -0,0 +1,144 @@
+# -*- coding: utf-8 -*-
+#
+# (c) 2017 Boundless Spatial Inc, http://boundlessgeo.com
+# This code is licensed under the GPL 2.0 license.
+#
+"""External merge sort of rows by integer keys.
+
+Rows are added a chunk at a time with their keys and kept in memory up
+to a run size. A full run is sorted and spilled to a temporary file, in
+pickled blocks, and the runs are merged at the end reading a block of
+each at a time: memory depends on the run size and on the number of
+runs, not on the number of rows. When all the rows fit in a run nothing
+is written to disk.
+
+Rows with the same key keep the order they were added in.
+
+    sorter = ExternalSorter(runSize)
+    for keys, rows in chunks:
+        sorter.add(keys, rows)
+    for rows in sorter.sortedChunks(chunkSize):
+        ...
+    sorter.close()
+"""
+__copyright__ = '(C) Boundless Spatial Inc'
+
+# This will get replaced with a git SHA1 when you do a git archive
+__revision__ = '$Format:%H$'
+
+import heapq
+
+try:
+    import cPickle as pickle
+except ImportError:
+    # Python 3
+    import pickle
+
+from boundlessprovider.streaming import chunks
+
+DEFAULT_RUN_SIZE = 500000
+# rows pickled together in a run file, and read back at a time by the
+# merge
+SPILL_BLOCK_SIZE = 10000
+
+
+class ExternalSorter(object):
+    """Sorts rows by integer keys in runs of runSize rows, spilled to
+    temporary files in folder (the system temporary folder if None)
+    when there is more than one. runs is the number of spilled runs.
+    """
+
+    def __init__(self, runSize=DEFAULT_RUN_SIZE, folder=None):
+        self.runSize = max(1, runSize)
+        self.folder = folder
+        self.keys = []
+        self.rows = []
+        self.pending = 0
+        self.added = 0
+        self.files = []
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, excType, excValue, traceback):
+        self.close()
+
+    @property
+    def runs(self):
+        return len(self.files)
+
+    def close(self):
+        """Delete the run files."""
+        for runFile in self.files:
+            runFile.close()
+        self.files = []
+        self.keys = []
+        self.rows = []
+        self.pending = 0
+
+    def add(self, keys, rows):
+        """Add rows with their keys, a sequence of integers."""
+        self.keys.extend(keys)
+        self.rows.extend(rows)
+        self.pending += len(rows)
+        self.added += len(rows)
+        if self.pending >= self.runSize:
+            self._spill()
+
+    def _sortedRun(self):
+        """Return the (keys, sequences, rows) lists of the pending rows
+        sorted by key, sequences being the order they were added in.
+        """
+        keys = self.keys
+        rows = self.rows
+        # stable, so that equal keys keep their order
+        order = sorted(range(len(keys)), key=keys.__getitem__)
+        first = self.added - self.pending
+        run = [keys[index] for index in order], [index + first for index in order], [rows[index] for index in order]
+        self.keys = []
+        self.rows = []
+        self.pending = 0
+        return run
+
+    def _spill(self):
+        # imported by the provider module when QGIS loads it, tempfile
+        # only when a sort does not fit in memory
+        import tempfile
+
+        keys, sequences, rows = self._sortedRun()
+        runFile = tempfile.TemporaryFile(dir=self.folder)
+        self.files.append(runFile)
+        for start in range(0, len(rows), SPILL_BLOCK_SIZE):
+            end = start + SPILL_BLOCK_SIZE
+            pickle.dump((keys[start:end], sequences[start:end], rows[start:end]), runFile, pickle.HIGHEST_PROTOCOL)
+        runFile.flush()
+
+    @staticmethod
+    def _readRun(runFile):
+        """Yield the (key, sequence, row) of a run file, a block at a
+        time.
+        """
+        runFile.seek(0)
+        while True:
+            try:
+                keys, sequences, rows = pickle.load(runFile)
+            except EOFError:
+                return
+            for item in zip(keys, sequences, rows):
+                yield item
+
+    def sortedChunks(self, chunkSize):
+        """Yield the rows sorted by key in lists of at most chunkSize
+        rows, all of them with chunkSize 0.
+        """
+        if not self.files:
+            keys, sequences, rows = self._sortedRun()
+            for chunk in chunks(rows, chunkSize):
+                yield chunk
+            return
+        if self.pending:
+            self._spill()
+        # sequences are distinct, rows are never compared
+        merged = heapq.merge(*[self._readRun(runFile) for runFile in self.files])
+        for chunk in chunks((row for key, sequence, row in merged), chunkSize):
+            yield chunk
@@ -0,0 +1,118 @@
+# -*- coding: utf-8 -*-
+#
+# (c) 2017 Boundless Spatial Inc, http://boundlessgeo.com
+# This code is licensed under the GPL 2.0 license.
+#
+"""Detection of the format of coordinate values.
+
+A value is classified with character class checks only, no parsing:
+
+- MGRS: once spaces are removed, zone digits, band letter, two square
+  letters and digits (bulk_utm.MGRS_REGEXP);
+- UTM: four parts, the second an N or S hemisphere letter;
+- DD, DDM or DMS: one, two or three numbers.
+
+The class decides which parser reads the value, that still validates
+it: a value classified as DMS that is not a valid DMS is not valid.
+
+Columns are usually of a single format, so detectFormats classifies a
+sample of the first values and, if they all have the same format,
+assigns it to the whole column without looking at the other values.
+The values that the parser of that format rejects can then be
+classified one by one with classifyValues.
+"""
+__copyright__ = '(C) Boundless Spatial Inc'
+
+# This will get replaced with a git SHA1 when you do a git archive
+__revision__ = '$Format:%H$'
+
+import numpy
+
+from boundlessprovider.bulk_utm import MGRS_REGEXP
+from boundlessprovider.coordinate_tokenizer import (
+    DIGITS,
+    DD_index,
+    DMS_index,
+    DDM_index,
+)
+
+from boundlessprovider.formats import MGRS_index, UTM_index, AUTO_index
+
+UNKNOWN_index = -1
+
+DEFAULT_SAMPLE_SIZE = 200
+
+# format of the number of numbers of an angle
+ANGLE_FORMATS = {1: DD_index, 2: DDM_index, 3: DMS_index}
+NUMBER_CHARACTERS = DIGITS | frozenset(u'.')
+UTM_HEMISPHERES = frozenset(u'nNsS')
+
+# classifications are cached by value, up to this size
+CLASS_CACHE_SIZE = 65536
+_classes = {}
+
+
+def _countNumbers(value):
+    numbers = 0
+    inNumber = False
+    for character in value:
+        if character in NUMBER_CHARACTERS:
+            if not inNumber:
+                numbers += 1
+                inNumber = True
+        else:
+            inNumber = False
+    return numbers
+
+
+def classify(value):
+    """Return the format index of a stripped text value, or
+    UNKNOWN_index if it looks like none of them.
+    """
+    tokens = value.replace(u',', u' ').split()
+    if MGRS_REGEXP.match(u''.join(tokens)):
+        return MGRS_index
+    if len(tokens) == 4 and tokens[1] in UTM_HEMISPHERES and tokens[0][:1] in DIGITS:
+        return UTM_index
+    return ANGLE_FORMATS.get(_countNumbers(value), UNKNOWN_index)
+
+
+def classifyValues(texts, rows=None):
+    """Return an int array with the format index of each text, or of
+    the texts at the rows indexes. Empty texts are UNKNOWN_index.
+    """
+    if rows is None:
+        rows = range(len(texts))
+    formats = numpy.full(len(rows), UNKNOWN_index, dtype=numpy.int64)
+    classes = _classes
+    for position, row in enumerate(rows):
+        value = texts[row]
+        if not value:
+            continue
+        valueFormat = classes.get(value)
+        if valueFormat is None:
+            if len(classes) >= CLASS_CACHE_SIZE:
+                classes.clear()
+            valueFormat = classes[value] = classify(value)
+        formats[position] = valueFormat
+    return formats
+
+
+def detectFormats(texts, sampleSize=DEFAULT_SAMPLE_SIZE):
+    """Return a tuple (formats, homogeneous): the int array of the
+    format index of each text and whether the format was assigned from
+    a sample of the first non empty texts that all have the same
+    format. In that case the other texts are not classified.
+    """
+    sample = []
+    for row, value in enumerate(texts):
+        if value:
+            sample.append(row)
+            if len(sample) >= sampleSize:
+                break
+    sampleFormats = numpy.unique(classifyValues(texts, sample))
+    if len(sampleFormats) == 1 and sampleFormats[0] != UNKNOWN_index:
+        formats = numpy.full(len(texts), sampleFormats[0], dtype=numpy.int64)
+        formats[numpy.array([not value for value in texts], dtype=bool)] = UNKNOWN_index
+        return formats, True
+    return classifyValues(texts), False
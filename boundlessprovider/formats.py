@@ -0,0 +1,38 @@
+# -*- coding: utf-8 -*-
+#
+# (c) 2017 Boundless Spatial Inc, http://boundlessgeo.com
+# This code is licensed under the GPL 2.0 license.
+#
+"""Indexes of the coordinate formats and source datums, and default
+output templates.
+
+Only plain constants, without imports: the algorithm is defined with
+them when QGIS loads the provider, and the conversion modules, that
+import NumPy and pygeodesy, are imported on the first run.
+"""
+__copyright__ = '(C) Boundless Spatial Inc'
+
+# This will get replaced with a git SHA1 when you do a git archive
+__revision__ = '$Format:%H$'
+
+# same indexes of CoordinateFormatConversion.SOURCE_FORMAT_LIST
+DD_index = 0
+DMS_index = 1
+DDM_index = 2
+MGRS_index = 3
+UTM_index = 4
+AUTO_index = 5
+PROJECTED_index = 6
+
+# same indexes of datum_shift.DATUMS and of
+# CoordinateFormatConversion.SOURCE_DATUM_LIST
+WGS84_DATUM_index = 0
+ED50_DATUM_index = 1
+NAD27_DATUM_index = 2
+OSGB36_DATUM_index = 3
+DATUM_NAMES = ['WGS84', 'ED50', 'NAD27', 'OSGB36']
+
+CUSTOM_COORD_FORMAT = u'{degree}º{minutes}\'{seconds}"'
+DDM_COORD_FORMAT = u'{degree}º{minutes}\''
+FIELD_PRECISION = 3
+DD_PRECISION = 8
@@ -0,0 +1,201 @@
+# -*- coding: utf-8 -*-
+#
+# (c) 2017 Boundless Spatial Inc, http://boundlessgeo.com
+# This code is licensed under the GPL 2.0 license.
+#
+"""Precomputed MGRS/UTM lookup tables, to encode grid references in
+bulk.
+
+The zone and band of a point and the letters of its 100 km square
+follow rules with exceptions (Norway, Svalbard, the 12 degrees of band
+X, letter sets repeating every 2 or 3 zones). They are worked out once
+here, in small tables indexed by whole degree, zone, band, column and
+row, and then looked up for whole arrays with NumPy indexing:
+
+- BAND_TABLE: band index in BANDS of each degree of latitude;
+- ZONE_TABLE: zone of each band and degree of longitude, exceptions
+  included (all of their boundaries are whole degrees);
+- ZONE_BAND_CODES and ZONE_HEMISPHERE_CODES: the text of the zone and
+  band of MGRS and of the zone and hemisphere of UTM;
+- SQUARE_CODES: the two letters of each 100 km column and row of the 6
+  zone sets.
+
+The texts are stored as Unicode code points: the references of a column
+are assembled as rows of a code point matrix, with the digits computed
+arithmetically, that is viewed as a fixed width text array. No string
+is formatted value by value.
+
+test_grid_tables checks the tables and the references against
+pygeodesy at degree cells over the globe, and across the zone and band
+boundaries.
+"""
+__copyright__ = '(C) Boundless Spatial Inc'
+
+# This will get replaced with a git SHA1 when you do a git archive
+__revision__ = '$Format:%H$'
+
+import numpy
+
+UTM_LAT_MIN = -80.0
+UTM_LAT_MAX = 84.0
+
+BANDS = 'CDEFGHJKLMNPQRSTUVWX'
+BAND_N = BANDS.index('N')
+BAND_V = BANDS.index('V')
+BAND_W = BANDS.index('W')
+BAND_X = BANDS.index('X')
+# 100 km square column letters, repeating every third zone
+COLUMN_LETTERS = ('ABCDEFGH', 'JKLMNPQR', 'STUVWXYZ')
+# 100 km square row letters, repeating every other zone
+ROW_LETTERS = ('ABCDEFGHJKLMNPQRSTUV', 'FGHJKLMNPQRSTUVABCDE')
+# zones with the same column and row letters
+ZONE_SETS = 6
+ZONES = 60
+
+SPACE = ord(' ')
+ZERO = ord('0')
+# width of a 1 m MGRS reference, e.g. 31U DQ 48251 11932
+MGRS_WIDTH = 18
+
+
+def _codes(texts):
+    """Code point array of texts of the same length, with a last
+    dimension for the characters.
+    """
+    texts = numpy.asarray(texts)
+    return numpy.array([[ord(char) for char in text] for text in texts.ravel()],
+                       dtype=numpy.uint32).reshape(texts.shape + (-1,))
+
+
+def _bandTable():
+    """Band of each degree of latitude from UTM_LAT_MIN, X up to
+    UTM_LAT_MAX.
+    """
+    degrees = numpy.arange(int(UTM_LAT_MAX - UTM_LAT_MIN))
+    return numpy.minimum(degrees // 8, BAND_X)
+
+
+def _zoneTable():
+    """Zone of each band and degree of longitude from -180."""
+    table = numpy.tile(numpy.arange(360) // 6 + 1, (len(BANDS), 1))
+    # Norway: zone 32 from 3 to 12 E
+    table[BAND_V, 180 + 3:180 + 12] = 32
+    # Svalbard: no zones 32, 34 and 36, the others are wider
+    for zone, west, east in ((31, 0, 9), (33, 9, 21), (35, 21, 33), (37, 33, 42)):
+        table[BAND_X, 180 + west:180 + east] = zone
+    return table
+
+
+BAND_TABLE = _bandTable()
+ZONE_TABLE = _zoneTable()
+# zone 0 is not used, so that the tables are indexed by zone
+ZONE_BAND_CODES = _codes([[u'{:02d}{}'.format(zone, band) for band in BANDS] for zone in range(ZONES + 1)])
+ZONE_HEMISPHERE_CODES = _codes([[u'{:02d} N '.format(zone), u'{:02d} S '.format(zone)]
+                                for zone in range(ZONES + 1)])
+# by zone set (zone - 1) % ZONE_SETS, column and row
+SQUARE_CODES = _codes([[[column + row for row in ROW_LETTERS[zoneSet % 2]]
+                        for column in COLUMN_LETTERS[zoneSet % 3]]
+                       for zoneSet in range(ZONE_SETS)])
+
+
+def utmZones(lat, lon):
+    """Return (zones, bands) arrays of the UTM zone number and band
+    index in BANDS of lat/lon degrees arrays, Norway and Svalbard
+    exceptions included. Both are -1 out of the UTM latitude range and
+    for NaN coordinates.
+    """
+    lat = numpy.asarray(lat, dtype=numpy.float64)
+    lon = numpy.asarray(lon, dtype=numpy.float64)
+    inRange = (lat >= UTM_LAT_MIN) & (lat < UTM_LAT_MAX) & numpy.isfinite(lon)
+    latDegrees = numpy.floor(numpy.where(inRange, lat, 0.0) - UTM_LAT_MIN).astype(numpy.int64)
+    lonDegrees = numpy.floor((numpy.where(inRange, lon, 0.0) + 180.0) % 360.0).astype(numpy.int64)
+    bands = BAND_TABLE[latDegrees]
+    # 360 when a longitude just below -180 is rounded
+    zones = ZONE_TABLE[bands, numpy.minimum(lonDegrees, 359)]
+    zones[~inRange] = -1
+    bands[~inRange] = -1
+    return zones, bands
+
+
+def _writeDigits(codes, starts, values, widths):
+    """Write the decimal digits of non negative integer values in the
+    rows of codes, from the starts columns and with widths digits, zero
+    padded. starts and widths are integers or arrays.
+    """
+    count = len(values)
+    rows = numpy.arange(count)
+    starts = numpy.broadcast_to(starts, (count,))
+    widths = numpy.broadcast_to(widths, (count,))
+    maxWidth = int(widths.max()) if count else 0
+    for place in range(maxWidth):
+        rows = rows[widths[rows] > place]
+        codes[rows, starts[rows] + widths[rows] - 1 - place] = ZERO + values[rows] // 10 ** place % 10
+
+
+def _digitCounts(values):
+    """Number of decimal digits of non negative integer values."""
+    counts = numpy.ones(len(values), dtype=numpy.int64)
+    power = 10
+    while len(values) and power <= values.max():
+        counts += values >= power
+        power *= 10
+    return counts
+
+
+def _texts(codes, valid):
+    """List of the texts of the rows of a code point matrix, ending at
+    the first 0, None for the rows that are not valid.
+    """
+    codes = numpy.ascontiguousarray(codes)
+    texts = codes.view('U{}'.format(codes.shape[1])).ravel().tolist()
+    for row in numpy.flatnonzero(~valid).tolist():
+        texts[row] = None
+    return texts
+
+
+def formatMgrs(zones, bands, eastings, northings):
+    """Return the list of 1 m resolution MGRS references of UTM arrays,
+    None for zone -1 (out of range).
+    """
+    zones = numpy.asarray(zones)
+    valid = zones >= 0
+    zones = numpy.where(valid, zones, 1)
+    bands = numpy.where(valid, bands, 0)
+    eastings = numpy.nan_to_num(numpy.asarray(eastings, dtype=numpy.float64))
+    northings = numpy.nan_to_num(numpy.asarray(northings, dtype=numpy.float64))
+    columns = numpy.clip(numpy.floor(eastings / 100e3) - 1, 0, 7).astype(numpy.int64)
+    rows = (numpy.floor(northings / 100e3) % 20).astype(numpy.int64)
+
+    codes = numpy.full((len(zones), MGRS_WIDTH), SPACE, dtype=numpy.uint32)
+    codes[:, 0:3] = ZONE_BAND_CODES[zones, bands]
+    codes[:, 4:6] = SQUARE_CODES[(zones - 1) % ZONE_SETS, columns, rows]
+    _writeDigits(codes, 7, numpy.floor(eastings % 100e3).astype(numpy.int64), 5)
+    _writeDigits(codes, 13, numpy.floor(northings % 100e3).astype(numpy.int64), 5)
+    return _texts(codes, valid)
+
+
+def formatUtm(zones, south, eastings, northings):
+    """Return the list of UTM references of UTM arrays, as
+    31 N 448252 5411933 with metres rounded, None for zone -1 (out of
+    range).
+    """
+    zones = numpy.asarray(zones)
+    valid = zones >= 0
+    zones = numpy.where(valid, zones, 1)
+    south = numpy.asarray(south, dtype=numpy.int64)
+    eastings = numpy.abs(numpy.rint(numpy.nan_to_num(numpy.asarray(eastings, dtype=numpy.float64)))).astype(numpy.int64)
+    northings = numpy.abs(numpy.rint(numpy.nan_to_num(numpy.asarray(northings, dtype=numpy.float64)))).astype(numpy.int64)
+    eastingWidths = _digitCounts(eastings)
+    northingWidths = _digitCounts(northings)
+    prefixWidth = ZONE_HEMISPHERE_CODES.shape[-1]
+    northingStarts = prefixWidth + eastingWidths + 1
+
+    # the 0 after the shorter references ends them
+    width = prefixWidth + (int((eastingWidths + northingWidths).max()) + 1 if len(zones) else 1)
+    codes = numpy.zeros((len(zones), width), dtype=numpy.uint32)
+    codes[:, :prefixWidth] = ZONE_HEMISPHERE_CODES[zones, south]
+    _writeDigits(codes, prefixWidth, eastings, eastingWidths)
+    codes[numpy.arange(len(zones)), northingStarts - 1] = SPACE
+    _writeDigits(codes, northingStarts, northings, northingWidths)
+    return _texts(codes, valid)
+
@@ -0,0 +1,183 @@
+# -*- coding: utf-8 -*-
+#
+# (c) 2017 Boundless Spatial Inc, http://boundlessgeo.com
+# This code is licensed under the GPL 2.0 license.
+#
+"""Reuse of the conversions of a table that changes between runs.
+
+A SQLite database of the job, in the folder of the user and named by
+the job hash, keeps, for each feature id, a 64 bit hash of the source coordinate values and the destination
+values they were converted to. On the next run the hashes of the source
+values are compared with the stored ones a chunk at a time, with array
+operations: only the inserted and changed features are converted and
+stored again, the others take the stored values, and the features that
+are gone are deleted from the database at the end. This saves the
+conversion of the unchanged features only: every feature is still
+read and hashed, and the whole output is written again.
+
+Only valid conversions are stored, so rows with malformed values are
+converted, and rejected, at every run. The WGS84 lon/lat are stored
+too, NULL if the job does not need them. The stored values are reset when
+the job (source and conversion parameters) is not the same. The output
+is not part of the job: a run to a new temporary file reuses the
+values of the previous one.
+"""
+__copyright__ = '(C) Boundless Spatial Inc'
+
+# This will get replaced with a git SHA1 when you do a git archive
+__revision__ = '$Format:%H$'
+
+import os
+import sqlite3
+
+import numpy
+
+try:
+    textType = unicode
+except NameError:
+    textType = str
+
+# SQLite host parameters per statement, under the default limit of 999
+QUERY_BATCH_SIZE = 500
+STORE_SUFFIX = '.hashes.sqlite'
+FEATURE_COLUMNS = ['fid', 'hash', 'x', 'y', 'xy', 'lon', 'lat']
+# stored values of a feature: x, y, xy, lon, lat
+VALUE_COUNT = len(FEATURE_COLUMNS) - 2
+
+# odd 64 bit multipliers of the character positions, the same at every
+# run: splitmix64 of the position
+_multipliers = numpy.zeros(0, dtype=numpy.uint64)
+
+
+def _positionMultipliers(width):
+    global _multipliers
+    if len(_multipliers) < width:
+        with numpy.errstate(over='ignore'):
+            values = numpy.arange(1, max(width, 64) + 1, dtype=numpy.uint64) * numpy.uint64(0x9e3779b97f4a7c15)
+            values = (values ^ (values >> numpy.uint64(30))) * numpy.uint64(0xbf58476d1ce4e5b9)
+            values = (values ^ (values >> numpy.uint64(27))) * numpy.uint64(0x94d049bb133111eb)
+        _multipliers = values ^ (values >> numpy.uint64(31)) | numpy.uint64(1)
+    return _multipliers[:width]
+
+
+def _columnHashes(values):
+    """uint64 multilinear hash of the text of each value: the sum of its
+    character codes by the multipliers of their positions, modulo 2**64.
+    """
+    texts = numpy.array([u'' if value is None else value for value in values], dtype=textType)
+    width = texts.dtype.itemsize // 4
+    if not len(texts) or not width:
+        return numpy.zeros(len(texts), dtype=numpy.uint64)
+    codes = texts.view(numpy.uint32).reshape(len(texts), width).astype(numpy.uint64)
+    with numpy.errstate(over='ignore'):
+        return (codes * _positionMultipliers(width)).sum(axis=1, dtype=numpy.uint64)
+
+
+def rowHashes(pairs):
+    """Return an int64 array with a 64 bit hash of the text of the
+    source values of each (x, y) pair, the same at every run and with
+    Python 2 and 3. Rows are hashed together with array operations.
+    """
+    xHashes = _columnHashes([x for x, y in pairs])
+    yHashes = _columnHashes([y for x, y in pairs])
+    with numpy.errstate(over='ignore'):
+        hashes = xHashes * numpy.uint64(0x9e3779b97f4a7c15) + yHashes
+    # as signed 64 bit integers, that is what SQLite stores
+    return hashes.view(numpy.int64)
+
+
+class IncrementalStore(object):
+    """Stored hashes and destination values of a job, by feature id.
+
+    changes() is called for every chunk of the source table, in any
+    order, and marks its features as seen. deleteMissing() then deletes
+    the features that were not seen.
+    """
+
+    def __init__(self, path, jobHash):
+        self.path = path
+        directory = os.path.dirname(path)
+        if directory and not os.path.isdir(directory):
+            os.makedirs(directory)
+        self.connection = sqlite3.connect(path)
+        self.connection.execute('CREATE TABLE IF NOT EXISTS meta (key TEXT PRIMARY KEY, value TEXT)')
+        columns = [row[1] for row in self.connection.execute('PRAGMA table_info(features)')]
+        if columns and columns != FEATURE_COLUMNS:
+            # written by a previous version
+            self.connection.execute('DROP TABLE features')
+        self.connection.execute('CREATE TABLE IF NOT EXISTS features '
+                                '(fid INTEGER PRIMARY KEY, hash INTEGER NOT NULL, x, y, xy, lon, lat)')
+        row = self.connection.execute("SELECT value FROM meta WHERE key = 'job'").fetchone()
+        if row is None or row[0] != jobHash:
+            self.connection.execute('DELETE FROM features')
+            self.connection.execute("INSERT OR REPLACE INTO meta VALUES ('job', ?)", (jobHash,))
+
+        stored = self.connection.execute('SELECT fid, hash FROM features ORDER BY fid').fetchall()
+        self.fids = numpy.array([fid for fid, hashValue in stored], dtype=numpy.int64)
+        self.hashes = numpy.array([hashValue for fid, hashValue in stored], dtype=numpy.int64)
+        self.seen = numpy.zeros(len(self.fids), dtype=bool)
+        self.changed = 0
+        self.deleted = 0
+
+    def __len__(self):
+        return len(self.fids)
+
+    def changes(self, fids, hashes):
+        """Return a bool array, True for the features of a chunk that
+        are inserted or changed since the stored run.
+        """
+        fids = numpy.asarray(fids, dtype=numpy.int64)
+        changed = numpy.ones(len(fids), dtype=bool)
+        if len(self.fids):
+            positions = numpy.minimum(numpy.searchsorted(self.fids, fids), len(self.fids) - 1)
+            found = self.fids[positions] == fids
+            self.seen[positions[found]] = True
+            changed = ~found | (self.hashes[positions] != hashes)
+        self.changed += int(changed.sum())
+        return changed
+
+    def storedValues(self, fids):
+        """Return the list of the stored (X, Y, XY, lon, lat) values of
+        fids.
+        """
+        values = {}
+        if not fids:
+            return []
+        low = min(fids)
+        high = max(fids)
+        if high - low < 2 * len(fids):
+            # usual fid order: a range scan of the primary key
+            values.update((row[0], row[1:]) for row in self.connection.execute(
+                'SELECT fid, x, y, xy, lon, lat FROM features WHERE fid BETWEEN ? AND ?', (low, high)))
+            return [values[fid] for fid in fids]
+        for start in range(0, len(fids), QUERY_BATCH_SIZE):
+            batch = fids[start:start + QUERY_BATCH_SIZE]
+            values.update((row[0], row[1:]) for row in self.connection.execute(
+                'SELECT fid, x, y, xy, lon, lat FROM features WHERE fid IN ({})'.format(','.join('?' * len(batch))),
+                batch))
+        return [values[fid] for fid in fids]
+
+    def store(self, fids, hashes, values):
+        """Store the hash and the (X, Y, XY) or (X, Y, XY, lon, lat)
+        values of features.
+        """
+        padding = (None,) * VALUE_COUNT
+        self.connection.executemany(
+            'INSERT OR REPLACE INTO features VALUES (?, ?, ?, ?, ?, ?, ?)',
+            [(fid, hashValue) + (tuple(featureValues) + padding)[:VALUE_COUNT]
+             for fid, hashValue, featureValues in zip(fids, hashes.tolist(), values)])
+
+    def deleteMissing(self):
+        """Delete the stored features that were not seen. Return how
+        many they are.
+        """
+        missing = self.fids[~self.seen].tolist()
+        self.connection.executemany('DELETE FROM features WHERE fid = ?', [(fid,) for fid in missing])
+        self.deleted = len(missing)
+        return self.deleted
+
+    def commit(self):
+        self.connection.commit()
+
+    def close(self):
+        self.connection.close()
@@ -0,0 +1,128 @@
+# -*- coding: utf-8 -*-
+#
+# (c) 2017 Boundless Spatial Inc, http://boundlessgeo.com
+# This code is licensed under the GPL 2.0 license.
+#
+"""In place update of the destination fields of a layer.
+
+Instead of copying every feature to a new table, the destination fields
+are added to the data provider of the source layer, if missing, and
+their values are written a chunk of features at a time. Fields and
+values are written in a single edit, committed at the end or rolled
+back on errors and cancellation, so that the source table is never left
+partly updated:
+
+- when the provider supports transactions (QgsTransaction, e.g.
+  PostGIS) the fields are added and the values written with one
+  changeAttributeValues call per chunk in a database transaction;
+- otherwise (shapefiles, GeoPackage, SpatiaLite...) they go to the edit
+  buffer of the layer, that holds all the changes in memory until
+  commitChanges() writes them to the source.
+"""
+__copyright__ = '(C) Boundless Spatial Inc'
+
+# This will get replaced with a git SHA1 when you do a git archive
+__revision__ = '$Format:%H$'
+
+from qgis.PyQt.QtCore import QVariant
+from qgis.core import QgsField, QgsVectorDataProvider
+
+try:
+    from qgis.core import QgsTransaction
+except ImportError:
+    # QGIS < 2.16
+    QgsTransaction = None
+
+from processing.core.GeoAlgorithmExecutionException import GeoAlgorithmExecutionException
+
+# length of the text destination fields, the dbf maximum
+TEXT_FIELD_LENGTH = 254
+REQUIRED_CAPABILITIES = QgsVectorDataProvider.AddAttributes | QgsVectorDataProvider.ChangeAttributeValues
+
+
+class InPlaceUpdater(object):
+    """Writes destination values to fields of the source layer, all of
+    them, with the missing fields, committed at the end or rolled back.
+
+    fields is a list of (name, isNumeric) of the destination fields, in
+    the order of the values of each feature. Numeric fields are doubles
+    of precision decimals, the others text.
+    """
+
+    def __init__(self, layer, fields, precision):
+        self.layer = layer
+        self.provider = layer.dataProvider()
+        if self.provider.capabilities() & REQUIRED_CAPABILITIES != REQUIRED_CAPABILITIES:
+            raise GeoAlgorithmExecutionException(
+                'The data provider of SOURCE_TABLE can not add fields and change their values')
+        if layer.isEditable():
+            # a rollback would discard the edits of the user too
+            raise GeoAlgorithmExecutionException('SOURCE_TABLE is being edited: save or discard its edits first')
+
+        self.transaction = None
+        if QgsTransaction is not None:
+            self.transaction = QgsTransaction.create([layer.id()])
+        if self.transaction is not None:
+            ok, error = self.transaction.begin()
+            if not ok:
+                raise GeoAlgorithmExecutionException('Can not start the transaction: {}'.format(error))
+        elif not layer.startEditing():
+            raise GeoAlgorithmExecutionException('Can not edit SOURCE_TABLE')
+
+        missing = []
+        for name, isNumeric in fields:
+            if layer.fieldNameIndex(name) >= 0:
+                continue
+            if isNumeric:
+                missing.append(QgsField(name, QVariant.Double, 'double', 20, precision))
+            else:
+                missing.append(QgsField(name, QVariant.String, 'string', TEXT_FIELD_LENGTH))
+        if self.transaction is not None:
+            added = not missing or self.provider.addAttributes(missing)
+            layer.updateFields()
+        else:
+            added = all([layer.addAttribute(field) for field in missing])
+        if not added:
+            self.rollback()
+            raise GeoAlgorithmExecutionException('Can not add the destination fields to SOURCE_TABLE')
+        self.indexes = [layer.fieldNameIndex(name) for name, isNumeric in fields]
+        self.added = [field.name() for field in missing]
+        self.updated = 0
+
+    def changeValues(self, fids, values):
+        """Write the list of destination values of each feature id."""
+        indexes = self.indexes
+        if self.transaction is not None:
+            changes = dict((fid, dict(zip(indexes, featureValues))) for fid, featureValues in zip(fids, values))
+            if not self.provider.changeAttributeValues(changes):
+                raise GeoAlgorithmExecutionException(
+                    'Can not write the destination values: {}'.format(u'; '.join(self.provider.errors())))
+        else:
+            changeAttributeValue = self.layer.changeAttributeValue
+            for fid, featureValues in zip(fids, values):
+                for index, value in zip(indexes, featureValues):
+                    if not changeAttributeValue(fid, index, value):
+                        raise GeoAlgorithmExecutionException(
+                            'Can not write the destination values of feature with id {}'.format(fid))
+        self.updated += len(fids)
+
+    def commit(self):
+        if self.transaction is not None:
+            ok, error = self.transaction.commit()
+            self.transaction = None
+            if not ok:
+                raise GeoAlgorithmExecutionException('Can not commit the transaction: {}'.format(error))
+        elif self.layer.isEditable() and not self.layer.commitChanges():
+            errors = u'; '.join(self.layer.commitErrors())
+            self.layer.rollBack()
+            raise GeoAlgorithmExecutionException('Can not save the changes to SOURCE_TABLE: {}'.format(errors))
+        self.layer.triggerRepaint()
+
+    def rollback(self):
+        """Discard the added fields and the written values."""
+        if self.transaction is not None:
+            self.transaction.rollback()
+            self.transaction = None
+            self.layer.updateFields()
+        elif self.layer.isEditable():
+            self.layer.rollBack()
@@ -0,0 +1,148 @@
+# -*- coding: utf-8 -*-
+#
+# (c) 2017 Boundless Spatial Inc, http://boundlessgeo.com
+# This code is licensed under the GPL 2.0 license.
+#
+"""Wall time and counts of the stages of a conversion run.
+
+Stages are timed a chunk at a time, never a value at a time:
+
+    with timer.stage('parse', len(values)):
+        ...
+
+When instrumentation is off NULL_TIMER is used instead of a StageTimer:
+its stage() returns the same do-nothing context manager, so a probe
+costs a method call per chunk.
+"""
+__copyright__ = '(C) Boundless Spatial Inc'
+
+# This will get replaced with a git SHA1 when you do a git archive
+__revision__ = '$Format:%H$'
+
+import threading
+import time
+from collections import OrderedDict
+
+STATS_FIELDS = ['stage', 'seconds', 'count', 'per_second']
+
+
+class _Stage(object):
+    """Context manager adding its wall time and count to a stage. The
+    count can be set inside the block when it is known only there.
+    """
+    __slots__ = ('timer', 'name', 'count', 'start')
+
+    def __init__(self, timer, name, count):
+        self.timer = timer
+        self.name = name
+        self.count = count
+
+    def __enter__(self):
+        self.start = time.time()
+        return self
+
+    def __exit__(self, excType, excValue, traceback):
+        self.timer.add(self.name, time.time() - self.start, self.count)
+        return False
+
+
+class _NullStage(object):
+    __slots__ = ('count',)
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, excType, excValue, traceback):
+        return False
+
+
+class StageTimer(object):
+    """Seconds and counts by stage, in order of first use, and counters
+    that are not timed (cache hits, failures...). Stages can be timed
+    by several threads (see pipeline).
+    """
+    enabled = True
+
+    def __init__(self):
+        self.started = time.time()
+        self.seconds = OrderedDict()
+        self.counts = OrderedDict()
+        self.counters = OrderedDict()
+        self.lock = threading.Lock()
+
+    def stage(self, name, count=0):
+        return _Stage(self, name, count)
+
+    def add(self, name, seconds, count=0):
+        with self.lock:
+            self.seconds[name] = self.seconds.get(name, 0.0) + seconds
+            self.counts[name] = self.counts.get(name, 0) + count
+
+    def count(self, name, count=1):
+        with self.lock:
+            self.counters[name] = self.counters.get(name, 0) + count
+
+    def merge(self, stats):
+        """Add the stats() of another timer, e.g. of a worker process."""
+        seconds, counts, counters = stats
+        for name in seconds:
+            self.add(name, seconds[name], counts[name])
+        for name in counters:
+            self.count(name, counters[name])
+
+    def stats(self):
+        """Return the (seconds, counts, counters) dictionaries, that
+        can be pickled.
+        """
+        return dict(self.seconds), dict(self.counts), dict(self.counters)
+
+    def rows(self, total=None):
+        """Return the stats table rows (stage, seconds, count, per
+        second), the stages then the total with the total count, then
+        the counters with no time.
+        """
+        rows = []
+        for name, seconds in self.seconds.items():
+            count = self.counts[name]
+            rows.append([name, seconds, count, count / seconds if seconds > 0 else None])
+        elapsed = time.time() - self.started
+        rows.append(['total', elapsed, total, total / elapsed if total and elapsed > 0 else None])
+        for name, count in self.counters.items():
+            rows.append([name, None, count, None])
+        return rows
+
+    def report(self, total=None):
+        """Return the stats as a list of log lines."""
+        lines = []
+        for name, seconds, count, perSecond in self.rows(total):
+            if seconds is None:
+                lines.append('{}: {}'.format(name, count))
+            elif perSecond is None:
+                lines.append('{}: {:.3f} s'.format(name, seconds))
+            else:
+                lines.append('{}: {:.3f} s, {} values, {:.0f} values/s'.format(name, seconds, count, perSecond))
+        return lines
+
+
+class NullTimer(object):
+    """StageTimer interface that records nothing."""
+    enabled = False
+
+    def stage(self, name, count=0):
+        return _NULL_STAGE
+
+    def add(self, name, seconds, count=0):
+        pass
+
+    def count(self, name, count=1):
+        pass
+
+    def merge(self, stats):
+        pass
+
+    def stats(self):
+        return None
+
+
+_NULL_STAGE = _NullStage()
+NULL_TIMER = NullTimer()
@@ -0,0 +1,296 @@
+# -*- coding: utf-8 -*-
+#
+# (c) 2017 Boundless Spatial Inc, http://boundlessgeo.com
+# This code is licensed under the GPL 2.0 license.
+#
+"""Memory mapped reading of delimited text files.
+
+Only the coordinate columns are needed to convert a delimited file, so
+the reader does not split whole rows in Python objects: the file is
+memory mapped and, a block at a time, numpy finds the offsets of the
+line ends and of the delimiters. The offsets of the selected fields
+are computed from them with array operations and only those fields are
+decoded. The other columns are not read by Python at all: the writer
+copies each row as raw bytes from the mapping, then appends the
+converted values.
+
+Rows with quotes are split by the csv module, one row at a time, and
+quoted fields can hold delimiters and line ends. The delimiter must be
+a single byte in the file encoding (any ASCII delimiter in utf-8,
+latin-1...).
+"""
+__copyright__ = '(C) Boundless Spatial Inc'
+
+# This will get replaced with a git SHA1 when you do a git archive
+__revision__ = '$Format:%H$'
+
+import csv
+import io
+import mmap
+import os
+import sys
+
+import numpy
+
+PY2 = sys.version_info[0] == 2
+
+NEWLINE = ord('\n')
+CARRIAGE_RETURN = ord('\r')
+QUOTE = ord('"')
+# bytes scanned at a time to find the rows
+BLOCK_SIZE = 1 << 22
+
+
+def cellText(value):
+    """Text of an output value, empty for None."""
+    if value is None:
+        return u''
+    if isinstance(value, float):
+        return repr(value)
+    return u'{}'.format(value)
+
+
+def quoteCell(text, delimiter):
+    """Quote a text cell as csv does with QUOTE_MINIMAL."""
+    if delimiter in text or u'"' in text or u'\n' in text or u'\r' in text:
+        return u'"' + text.replace(u'"', u'""') + u'"'
+    return text
+
+
+def _delimiterByte(delimiter, encoding):
+    encoded = delimiter.encode(encoding)
+    if len(encoded) != 1 or encoded in (b'"', b'\n', b'\r'):
+        raise ValueError('Delimiter {!r} is not a single byte in {}'.format(delimiter, encoding))
+    return encoded
+
+
+class MappedDelimitedReader(object):
+    """Memory mapped delimited text file, read a chunk of rows at a
+    time. To be used as a context manager, that closes the mapping.
+    """
+
+    def __init__(self, path, delimiter=u',', encoding='utf-8', blockSize=BLOCK_SIZE):
+        self.delimiter = delimiter
+        self.encoding = encoding
+        self.delimiterByte = _delimiterByte(delimiter, encoding)
+        self.blockSize = blockSize
+        self.file = open(path, 'rb')
+        size = os.fstat(self.file.fileno()).st_size
+        if size:
+            self.map = mmap.mmap(self.file.fileno(), 0, access=mmap.ACCESS_READ)
+            self.data = numpy.frombuffer(self.map, dtype=numpy.uint8)
+            try:
+                self.view = memoryview(self.map)
+            except TypeError:
+                # Python 2 mmap has no memoryview: slices are copies
+                self.view = self.map
+        else:
+            self.map = None
+            self.data = numpy.zeros(0, dtype=numpy.uint8)
+            self.view = b''
+        self.position = 0
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, excType, excValue, traceback):
+        self.close()
+
+    def close(self):
+        if self.map is not None:
+            if not PY2:
+                self.view.release()
+            self.view = self.data = None
+            try:
+                self.map.close()
+            except BufferError:
+                # arrays of a chunk that was not read to the end, e.g.
+                # after an error, still use it: the map is closed when
+                # they are released
+                pass
+            self.map = None
+        self.file.close()
+
+    def splitRow(self, start, end):
+        """Return the list of the text fields of the bytes of a row."""
+        text = self.map[start:end].decode(self.encoding)
+        if PY2:
+            rows = csv.reader([text.encode('utf-8')], delimiter=self.delimiter.encode('utf-8'))
+            return [field.decode('utf-8') for field in next(rows, [])]
+        return next(csv.reader(io.StringIO(text, newline=u''), delimiter=self.delimiter), [])
+
+    def readHeader(self):
+        """Read the first row. Return the list of its field names and
+        the row as readChunks returns it, or None if the file is empty.
+        """
+        for starts, ends, quoted in self._blocks(1):
+            start, end = int(starts[0]), int(ends[0])
+            self.position = self._nextRow(end)
+            return self.splitRow(start, end), (start, end, 0)
+        return None
+
+    def _nextRow(self, end):
+        """Offset of the row after the one ending at end."""
+        size = len(self.data)
+        if end < size and self.data[end] == CARRIAGE_RETURN:
+            end += 1
+        return min(size, end + 1)
+
+    def _blocks(self, maxRows=0):
+        """Yield (starts, ends, quoted) arrays of the rows of a block of
+        the file from the current position, ends excluding the line
+        end, quoted True for the rows with quotes. Quoted line ends are
+        part of the row. With maxRows > 0 the blocks are not consumed.
+        """
+        data = self.data
+        size = len(data)
+        position = self.position
+        blockSize = self.blockSize
+        while position < size:
+            stop = min(size, position + blockSize)
+            block = data[position:stop]
+            newlines = numpy.flatnonzero(block == NEWLINE)
+            if stop < size:
+                if not len(newlines):
+                    blockSize *= 2
+                    continue
+                stop = position + int(newlines[-1]) + 1
+                block = data[position:stop]
+            ends = newlines + position
+            if not len(ends) or ends[-1] != stop - 1:
+                # last row, without a line end
+                ends = numpy.append(ends, stop)
+            starts = numpy.concatenate([[position], ends[:-1] + 1])
+            quoted = numpy.zeros(len(starts), dtype=bool)
+
+            quotes = numpy.flatnonzero(block == QUOTE) + position
+            if len(quotes):
+                counts = numpy.searchsorted(quotes, ends) - numpy.searchsorted(quotes, starts)
+                quoted = counts > 0
+                keep = numpy.ones(len(starts), dtype=bool)
+                odd = numpy.flatnonzero(counts % 2).tolist()
+                incomplete = None
+                # an odd number of quotes opens a field that goes on in
+                # the next rows, up to the next odd one
+                for opening, closing in zip(odd[0::2], odd[1::2] + [None]):
+                    if closing is None:
+                        incomplete = opening
+                        break
+                    ends[opening] = ends[closing]
+                    keep[opening + 1:closing + 1] = False
+                if incomplete is not None and stop < size:
+                    if incomplete == 0:
+                        # a quoted field longer than the block
+                        blockSize *= 2
+                        continue
+                    stop = int(starts[incomplete])
+                    keep[incomplete:] = False
+                elif incomplete is not None:
+                    # unbalanced quote: the row goes to the end of file
+                    ends[incomplete] = ends[-1]
+                    keep[incomplete + 1:] = False
+                starts, ends, quoted = starts[keep], ends[keep], quoted[keep]
+
+            # \r\n line ends
+            carriageReturns = (ends > starts) & (data[numpy.maximum(ends - 1, 0)] == CARRIAGE_RETURN)
+            ends = ends - carriageReturns
+            if maxRows:
+                yield starts[:maxRows], ends[:maxRows], quoted[:maxRows]
+                return
+            position = self.position = stop
+            blockSize = self.blockSize
+            yield starts, ends, quoted
+
+    def readChunks(self, indexes, chunkSize, width=0):
+        """Yield a (rows, columns) tuple for each chunk of chunkSize
+        rows from the current position, all of them with chunkSize 0.
+
+        rows is the list of the (start, end, missing) of each row: the
+        bytes offsets of the row and the number of fields it lacks to
+        have width fields. columns has a list of the text values of
+        each of indexes, None for a None index. Missing fields are
+        empty texts.
+        """
+        pending = []
+        count = 0
+        for block in self._blocks():
+            pending.append(block)
+            count += len(block[0])
+            while chunkSize > 0 and count >= chunkSize:
+                starts, ends, quoted = [numpy.concatenate(parts) for parts in zip(*pending)]
+                yield self._chunk(starts[:chunkSize], ends[:chunkSize], quoted[:chunkSize], indexes, width)
+                pending = [(starts[chunkSize:], ends[chunkSize:], quoted[chunkSize:])]
+                count -= chunkSize
+        if count:
+            starts, ends, quoted = [numpy.concatenate(parts) for parts in zip(*pending)]
+            yield self._chunk(starts, ends, quoted, indexes, width)
+
+    def _chunk(self, starts, ends, quoted, indexes, width):
+        first = int(starts[0])
+        last = int(ends[-1])
+        delimiters = numpy.flatnonzero(self.data[first:last] == ord(self.delimiterByte)) + first
+        # sentinel after every row
+        delimiters = numpy.append(delimiters, last + 1)
+        firstDelimiters = numpy.searchsorted(delimiters, starts)
+        fieldCounts = numpy.searchsorted(delimiters, ends) - firstDelimiters + 1
+        lastDelimiter = len(delimiters) - 1
+
+        columns = []
+        for index in indexes:
+            if index is None:
+                columns.append(None)
+                continue
+            present = fieldCounts > index
+            if index == 0:
+                fieldStarts = starts
+            else:
+                fieldStarts = delimiters[numpy.minimum(firstDelimiters + index - 1, lastDelimiter)] + 1
+            fieldEnds = numpy.minimum(delimiters[numpy.minimum(firstDelimiters + index, lastDelimiter)], ends)
+            fieldStarts = numpy.where(present, fieldStarts, ends)
+            fieldEnds = numpy.where(present, fieldEnds, ends)
+            mapping = self.map
+            encoding = self.encoding
+            columns.append([mapping[start:end].decode(encoding)
+                            for start, end in zip(fieldStarts.tolist(), fieldEnds.tolist())])
+
+        missing = numpy.maximum(0, width - fieldCounts)
+        for row in numpy.flatnonzero(quoted).tolist():
+            fields = self.splitRow(int(starts[row]), int(ends[row]))
+            missing[row] = max(0, width - len(fields))
+            for index, column in zip(indexes, columns):
+                if index is not None:
+                    column[row] = fields[index] if index < len(fields) else u''
+        return list(zip(starts.tolist(), ends.tolist(), missing.tolist())), columns
+
+
+class MappedDelimitedWriter(object):
+    """Writes the rows of a MappedDelimitedReader as raw bytes, with
+    new values appended. To be used as a context manager.
+    """
+
+    def __init__(self, path, reader):
+        self.reader = reader
+        self.file = io.open(path, 'wb')
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, excType, excValue, traceback):
+        self.close()
+
+    def close(self):
+        self.file.close()
+
+    def writeRows(self, rows, newValues):
+        """Write the (start, end, missing) rows of readChunks, each
+        followed by its list of newValues.
+        """
+        write = self.file.write
+        view = self.reader.view
+        delimiter = self.reader.delimiter
+        encoding = self.reader.encoding
+        for (start, end, missing), values in zip(rows, newValues):
+            write(view[start:end])
+            write((delimiter * (missing + 1) +
+                   delimiter.join([quoteCell(cellText(value), delimiter) for value in values]) +
+                   u'\n').encode(encoding))
@@ -0,0 +1,191 @@
+# -*- coding: utf-8 -*-
+#
+# (c) 2017 Boundless Spatial Inc, http://boundlessgeo.com
+# This code is licensed under the GPL 2.0 license.
+#
+"""Batch formatting of destination values.
+
+Output templates ({degree}º{minutes}'{seconds}", {X} {Y}...) are
+compiled once into a FormatPlan: a % template with a %s for each field
+and the way to turn each field column to strings. A whole column of
+values is then formatted with one % operation per value, instead of a
+str.format call that parses the template again for every value.
+
+Degrees are split into degree, minute and second parts with array
+arithmetic, carrying at 60 seconds and 60 minutes. The results are the
+same, string by string, of formatting each value with round() and
+str.format: the arithmetic is the same float64 arithmetic, and values
+whose rounding is a tie are rounded by the Python round() of this
+interpreter (see test/test_output_formatter).
+"""
+__copyright__ = '(C) Boundless Spatial Inc'
+
+# This will get replaced with a git SHA1 when you do a git archive
+__revision__ = '$Format:%H$'
+
+from string import Formatter
+
+import numpy
+
+from boundlessprovider.formats import (
+    DD_index,
+    DMS_index,
+    DDM_index,
+    CUSTOM_COORD_FORMAT,
+    DDM_COORD_FORMAT,
+    FIELD_PRECISION,
+    DD_PRECISION,
+)
+
+# fractions closer than this to a rounding tie are rounded by round()
+TIE_TOLERANCE = 1e-6
+
+
+class FormatPlan(object):
+    """A str.format template compiled for batch formatting.
+
+    Templates whose fields are plain names, possibly with a conversion
+    and a format spec, are compiled. Others (positional, attribute or
+    index fields) are formatted with str.format value by value.
+    """
+
+    def __init__(self, template):
+        self.template = template
+        self.fields = []
+        parts = []
+        self.compiled = True
+        for literal, name, spec, conversion in Formatter().parse(template):
+            parts.append(literal.replace(u'%', u'%%'))
+            if name is None:
+                continue
+            # positional, attribute or index fields, or nested fields in
+            # the spec
+            if (not name.replace(u'_', u'').isalnum() or name[0].isdigit() or
+                    u'{' in spec):
+                self.compiled = False
+                break
+            parts.append(u'%s')
+            self.fields.append((name, conversion, spec))
+        self.percentTemplate = u''.join(parts)
+
+    def format(self, columns):
+        """Return the list of the template formatted with the values of
+        columns, a dictionary of field name to list of values, all of
+        the same length.
+        """
+        if not self.compiled:
+            names = list(columns)
+            return [self.template.format(**dict(zip(names, row)))
+                    for row in zip(*[columns[name] for name in names])]
+
+        strings = []
+        for name, conversion, spec in self.fields:
+            values = columns[name]
+            if conversion == 'r':
+                values = [repr(value) for value in values]
+            elif conversion == 's':
+                values = [u'{!s}'.format(value) for value in values]
+            elif conversion == 'a':
+                values = [u'{!a}'.format(value) for value in values]
+            if spec:
+                strings.append([format(value, spec) for value in values])
+            elif values and isinstance(values[0], float):
+                # format(float, '') is str(float)
+                strings.append(list(map(str, values)))
+            else:
+                strings.append([format(value, u'') for value in values])
+        percentTemplate = self.percentTemplate
+        if len(strings) == 1:
+            return [percentTemplate % (value,) for value in strings[0]]
+        return [percentTemplate % row for row in zip(*strings)]
+
+
+_plans = {}
+
+
+def compileTemplate(template):
+    """Return the FormatPlan of a template, compiled once."""
+    plan = _plans.get(template)
+    if plan is None:
+        plan = _plans[template] = FormatPlan(template)
+    return plan
+
+
+def roundColumn(values, digits):
+    """Round a float64 array to digits decimals as round() does each
+    value. Return the list of the rounded floats.
+    """
+    scale = 10.0 ** digits
+    scaled = values * scale
+    rounded = numpy.rint(scaled) / scale
+    # numpy rounds the scaled value, round() the decimal value: they can
+    # only differ close to a tie
+    fraction = numpy.abs(scaled - numpy.floor(scaled))
+    ties = numpy.flatnonzero(numpy.abs(fraction - 0.5) < TIE_TOLERANCE)
+    result = rounded.tolist()
+    for index in ties:
+        result[index] = round(float(values[index]), digits)
+    return result
+
+
+def _signedDegrees(degrees, negative):
+    """Signed whole degrees, with the sign of the value, e.g. -0."""
+    return [(u'-' if isNegative else u'') + str(degree)
+            for degree, isNegative in zip(degrees.tolist(), negative.tolist())]
+
+
+def formatDegreesColumn(values, destFormatIndex, customFormat=None):
+    """Format a float64 array of signed decimal degrees as DMS using
+    customFormat (CUSTOM_COORD_FORMAT if not set), or as DDM. Return
+    the list of strings, the same of formatting each value on its own.
+    """
+    values = numpy.asarray(values, dtype=numpy.float64)
+    negative = values < 0
+    absolute = numpy.abs(values)
+    degrees = numpy.floor(absolute).astype(numpy.int64)
+    fraction = absolute - degrees
+
+    if destFormatIndex == DDM_index:
+        minutes = numpy.array(roundColumn(fraction * 60.0, FIELD_PRECISION))
+        carry = minutes >= 60.0
+        minutes[carry] -= 60.0
+        degrees[carry] += 1
+        return compileTemplate(DDM_COORD_FORMAT).format({
+            'degree': _signedDegrees(degrees, negative),
+            'minutes': minutes.tolist()})
+
+    if destFormatIndex != DMS_index:
+        raise ValueError('Invalid destination format index: {}'.format(destFormatIndex))
+    minutes = numpy.floor(fraction * 60.0).astype(numpy.int64)
+    seconds = numpy.array(roundColumn((absolute - degrees - minutes / 60.0) * 3600.0, FIELD_PRECISION))
+    carry = seconds >= 60.0
+    seconds[carry] -= 60.0
+    minutes[carry] += 1
+    carry = minutes >= 60
+    minutes[carry] -= 60
+    degrees[carry] += 1
+    return compileTemplate(customFormat or CUSTOM_COORD_FORMAT).format({
+        'degree': _signedDegrees(degrees, negative),
+        'minutes': minutes.tolist(),
+        'seconds': seconds.tolist()})
+
+
+def formatDestinationColumns(lon, lat, destFormatIndex, customFormat=None, singleFieldFormat=None):
+    """Format lon/lat float64 arrays in the DD, DMS or DDM destination
+    format. Return the (X, Y, XY) lists, XY None values if
+    singleFieldFormat is not set.
+    """
+    if destFormatIndex == DD_index:
+        xValues = roundColumn(lon, DD_PRECISION)
+        yValues = roundColumn(lat, DD_PRECISION)
+    elif destFormatIndex in [DMS_index, DDM_index]:
+        xValues = formatDegreesColumn(lon, destFormatIndex, customFormat)
+        yValues = formatDegreesColumn(lat, destFormatIndex, customFormat)
+    else:
+        raise ValueError('Unrecognised destination format index: {}'.format(destFormatIndex))
+
+    if singleFieldFormat:
+        xyValues = compileTemplate(singleFieldFormat).format({'X': xValues, 'Y': yValues})
+    else:
+        xyValues = [None] * len(xValues)
+    return xValues, yValues, xyValues
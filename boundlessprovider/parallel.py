@@ -0,0 +1,139 @@
+# -*- coding: utf-8 -*-
+#
+# (c) 2017 Boundless Spatial Inc, http://boundlessgeo.com
+# This code is licensed under the GPL 2.0 license.
+#
+"""Conversion of chunks of source values in a process pool.
+
+Chunks are submitted as they are read and their results are returned
+in submission order, with a bounded number of chunks in flight so that
+memory stays bounded as in the serial streaming. Workers run the QGIS
+free converter and keep their own conversion caches between chunks.
+
+Only plain values are sent to the workers: the source values of a
+chunk are checked to be text, numbers or None before it is submitted.
+"""
+__copyright__ = '(C) Boundless Spatial Inc'
+
+# This will get replaced with a git SHA1 when you do a git archive
+__revision__ = '$Format:%H$'
+
+import os
+import sys
+import multiprocessing
+from collections import deque
+
+from boundlessprovider.converter import convertPairs
+from boundlessprovider.conversion_cache import sharedCache, DEFAULT_CACHE_SIZE
+from boundlessprovider.instrumentation import StageTimer, NULL_TIMER
+
+# chunks in flight for each worker: one being converted, one queued
+CHUNKS_PER_WORKER = 2
+
+try:
+    PLAIN_TYPES = frozenset([type(None), bool, int, long, float, str, unicode])
+except NameError:
+    # Python 3
+    PLAIN_TYPES = frozenset([type(None), bool, int, float, str])
+
+_workerCacheSize = DEFAULT_CACHE_SIZE
+
+
+def workerCount(setting):
+    """Number of worker processes of a worker count setting, 0 or less
+    for the number of cores.
+    """
+    if setting is None or int(setting) <= 0:
+        return multiprocessing.cpu_count()
+    return int(setting)
+
+
+def checkPlainPairs(pairs):
+    """Raise TypeError if a value of the (x, y) pairs is not text, a
+    number or None, e.g. an attribute value of a QGIS feature that was
+    not converted with engine.pairsOf.
+    """
+    for pair in pairs:
+        for value in pair:
+            if type(value) not in PLAIN_TYPES:
+                raise TypeError('Source value {!r} of type {} can not be sent to the worker processes'.format(
+                    value, type(value).__name__))
+
+
+def _initWorker(cacheSize):
+    global _workerCacheSize
+    _workerCacheSize = cacheSize
+
+
+def _convertChunk(pairs, parameters, instrumented):
+    """Worker side: convert the pairs of a chunk through the worker
+    cache. Return the results, the cache hits and misses and the stage
+    stats if instrumented.
+    """
+    timer = StageTimer() if instrumented else NULL_TIMER
+    cache = sharedCache(parameters, _workerCacheSize)
+    hits, misses = cache.hits, cache.misses
+    results = cache.convertColumn(pairs, lambda distinctPairs: convertPairs(distinctPairs, parameters, timer))
+    return results, cache.hits - hits, cache.misses - misses, timer.stats()
+
+
+class ParallelConverter(object):
+    """Process pool converting chunks of (x, y) source value pairs.
+
+    The parse and format stages of the workers are added to timer.
+    To be used as a context manager, that terminates the pool:
+
+        with ParallelConverter(4) as converter:
+            for context, results in converter.convertChunks(items, parameters):
+                ...
+    """
+
+    def __init__(self, workers, cacheSize=DEFAULT_CACHE_SIZE, timer=NULL_TIMER):
+        self.workers = workers
+        self.timer = timer
+        self.hits = 0
+        self.misses = 0
+        if sys.platform == 'win32' and not os.path.basename(sys.executable).lower().startswith('python'):
+            # embedded interpreter (e.g. qgis.exe): spawn the workers
+            # with the python executable next to it
+            multiprocessing.set_executable(os.path.join(sys.exec_prefix, 'pythonw.exe'))
+        self.pool = multiprocessing.Pool(workers, _initWorker, (cacheSize,))
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, excType, excValue, traceback):
+        self.close()
+
+    def close(self):
+        self.pool.terminate()
+        self.pool.join()
+
+    def convertChunks(self, items, parameters, timer=None):
+        """Convert an iterable of (context, pairs) items. Yield a tuple
+        (context, results) for each item, in the items order, where
+        results is the list of (valid, X, Y, XY) of the pairs. Stage
+        times go to timer, the one of the converter if None.
+
+        Items are read only while less than CHUNKS_PER_WORKER chunks per
+        worker are waiting for the results.
+        """
+        timer = self.timer if timer is None else timer
+        pending = deque()
+        window = self.workers * CHUNKS_PER_WORKER
+        for context, pairs in items:
+            checkPlainPairs(pairs)
+            pending.append((context, self.pool.apply_async(
+                _convertChunk, (pairs, parameters, timer.enabled))))
+            if len(pending) >= window:
+                yield self._collect(timer, *pending.popleft())
+        while pending:
+            yield self._collect(timer, *pending.popleft())
+
+    def _collect(self, timer, context, asyncResult):
+        results, hits, misses, stats = asyncResult.get()
+        self.hits += hits
+        self.misses += misses
+        # worker stage times add up, they are not wall time of the run
+        timer.merge(stats)
+        return context, results
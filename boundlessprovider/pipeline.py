@@ -0,0 +1,241 @@
+# -*- coding: utf-8 -*-
+#
+# (c) 2017 Boundless Spatial Inc, http://boundlessgeo.com
+# This code is licensed under the GPL 2.0 license.
+#
+"""Pipelined read, convert and write stages of a conversion run.
+
+Serially a run reads a chunk, converts it and writes it, one after the
+other. A Pipeline runs the first stages in threads of their own,
+connected by queues of at most depth chunks, so that reading and writing
+wait on the storage while the previous stage parses. A stage gets at
+most depth chunks ahead of the next one, which blocks it until the next
+one catches up (backpressure), and memory stays bounded as in the serial
+run:
+
+    with Pipeline(stages=3, depth=4) as pipeline:
+        items = pipeline.read(readChunks(...))
+        for context, results in pipeline.convert(engine.convertChunks(items)):
+            ...
+            pipeline.write(writer.addRecords, records)
+        pipeline.flush()
+
+stages is the number of threaded stages: 0 runs everything on the
+calling thread, 1 the reader, 2 the reader and the converter, 3 also
+the writer. Errors of a thread are raised to the caller. When the
+pipeline is closed, e.g. by an error of the caller, the reader and
+converter threads are cancelled; the writes already queued are done.
+
+Items that must be read, and results that must be written, on the
+thread that created their objects (QGIS feature iterators, providers
+and file writers are not thread safe) use convertInThread instead: only
+the converter runs in a thread, the calling thread reads the items and
+writes the results:
+
+    with Pipeline(depth=4) as pipeline:
+        for context, results in pipeline.convertInThread(readChunks(...), engine.convertChunks):
+            writer.addRecords(records)
+"""
+__copyright__ = '(C) Boundless Spatial Inc'
+
+# This will get replaced with a git SHA1 when you do a git archive
+__revision__ = '$Format:%H$'
+
+import threading
+
+try:
+    from queue import Queue, Empty, Full
+except ImportError:
+    # Python 2
+    from Queue import Queue, Empty, Full
+
+READ_STAGE = 1
+CONVERT_STAGE = 2
+WRITE_STAGE = 3
+DEFAULT_QUEUE_DEPTH = 4
+# seconds a blocked thread waits before checking for cancellation
+POLL_INTERVAL = 0.1
+
+_DONE = object()
+
+
+class PipelineCancelled(Exception):
+    """Raised to the caller reading a stage that was cancelled."""
+
+
+class _Failure(object):
+    """Exception raised in a thread, passed on to the caller."""
+
+    def __init__(self, exception):
+        self.exception = exception
+
+
+class Pipeline(object):
+    """Threads of the first stages of a run, and their queues."""
+
+    def __init__(self, stages=0, depth=DEFAULT_QUEUE_DEPTH):
+        self.stages = stages
+        self.depth = max(1, depth)
+        self.cancelled = threading.Event()
+        self.threads = []
+        self.writeQueue = None
+        self.writeFailure = None
+        if stages >= WRITE_STAGE:
+            self.writeQueue = Queue(self.depth)
+            self._start(self._writeLoop, self.writeQueue)
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, excType, excValue, traceback):
+        self.close()
+
+    def _start(self, target, *args):
+        thread = threading.Thread(target=target, args=args)
+        thread.daemon = True
+        thread.start()
+        self.threads.append(thread)
+
+    def _put(self, queue, item):
+        """Put item in queue, waiting while it is full. Return False if
+        the pipeline is cancelled meanwhile.
+        """
+        while not self.cancelled.is_set():
+            try:
+                queue.put(item, timeout=POLL_INTERVAL)
+                return True
+            except Full:
+                pass
+        return False
+
+    def _produce(self, iterable, queue):
+        try:
+            for item in iterable:
+                if not self._put(queue, item):
+                    return
+            self._put(queue, _DONE)
+        except BaseException as ex:
+            self._put(queue, _Failure(ex))
+
+    def _consume(self, queue):
+        while True:
+            try:
+                item = queue.get(timeout=POLL_INTERVAL)
+            except Empty:
+                if self.cancelled.is_set():
+                    # the producer stops without a last item
+                    self._raiseWriteFailure()
+                    raise PipelineCancelled('Conversion cancelled')
+                continue
+            if item is _DONE:
+                return
+            if isinstance(item, _Failure):
+                raise item.exception
+            yield item
+
+    def stage(self, iterable, stage):
+        """Return the items of iterable, read in a thread if stage is
+        one of the threaded stages, otherwise iterable itself.
+        """
+        if self.stages < stage:
+            return iterable
+        queue = Queue(self.depth)
+        self._start(self._produce, iterable, queue)
+        return self._consume(queue)
+
+    def read(self, iterable):
+        return self.stage(iterable, READ_STAGE)
+
+    def convert(self, iterable):
+        return self.stage(iterable, CONVERT_STAGE)
+
+    def convertInThread(self, items, convert):
+        """Return the (context, results) items of convert(items), convert
+        being a generator function such as ConversionEngine.convertChunks,
+        run in a thread of its own. items are read on the calling thread,
+        while it waits for the results, at most depth of them ahead of
+        the converter.
+        """
+        inQueue = Queue(self.depth)
+        outQueue = Queue(self.depth)
+        self._start(self._produce, convert(self._consume(inQueue)), outQueue)
+        return self._feed(iter(items), inQueue, outQueue)
+
+    def _feed(self, items, inQueue, outQueue):
+        """Yield the results of outQueue, reading the next of items into
+        inQueue whenever there are no results yet and it has room.
+        """
+        exhausted = False
+        while True:
+            try:
+                item = outQueue.get_nowait()
+            except Empty:
+                if not exhausted and not inQueue.full():
+                    # the only producer of inQueue, that does not block
+                    item = next(items, _DONE)
+                    exhausted = item is _DONE
+                    inQueue.put(item)
+                    continue
+                try:
+                    item = outQueue.get(timeout=POLL_INTERVAL)
+                except Empty:
+                    if self.cancelled.is_set():
+                        raise PipelineCancelled('Conversion cancelled')
+                    continue
+            if item is _DONE:
+                return
+            if isinstance(item, _Failure):
+                raise item.exception
+            yield item
+
+    def _writeLoop(self, queue):
+        while True:
+            item = queue.get()
+            try:
+                if item is _DONE:
+                    return
+                if self.writeFailure is None:
+                    function, args, kwargs = item
+                    try:
+                        function(*args, **kwargs)
+                    except BaseException as ex:
+                        self.writeFailure = ex
+                        self.cancelled.set()
+            finally:
+                queue.task_done()
+
+    def _raiseWriteFailure(self):
+        if self.writeFailure is not None:
+            raise self.writeFailure
+
+    def write(self, function, *args, **kwargs):
+        """Call function with the arguments in the writer thread, after
+        the writes queued before, or now if the writer is not threaded.
+        """
+        if self.writeQueue is None:
+            return function(*args, **kwargs)
+        self._raiseWriteFailure()
+        # the writer drains its queue even when it failed
+        self.writeQueue.put((function, args, kwargs))
+
+    def flush(self):
+        """Wait for the queued writes to be done."""
+        if self.writeQueue is not None:
+            self.writeQueue.join()
+            self._raiseWriteFailure()
+
+    def cancel(self):
+        """Stop the reader and converter threads."""
+        self.cancelled.set()
+
+    def close(self):
+        """Cancel the reader and converter threads, wait for the queued
+        writes and for all the threads to stop.
+        """
+        self.cancel()
+        if self.writeQueue is not None:
+            self.writeQueue.put(_DONE)
+            self.writeQueue = None
+        for thread in self.threads:
+            thread.join()
+        self.threads = []
@@ -0,0 +1,248 @@
+# -*- coding: utf-8 -*-
+#
+# (c) 2017 Boundless Spatial Inc, http://boundlessgeo.com
+# This code is licensed under the GPL 2.0 license.
+#
+"""Projected X/Y source values to WGS84, in bulk.
+
+Values in a projected CRS (e.g. metres) are parsed as numbers a column
+at a time and transformed to WGS84 lon/lat with a transform function,
+that takes x and y arrays and returns lon and lat arrays, NaN where the
+point can not be transformed. The function does not depend on a
+projection library: the Processing algorithm gives one running the OGR
+transform of the layer CRS on the whole arrays.
+
+With a maximum error, points are instead interpolated in a grid of
+transformed points over the extent of the data (InterpolationGrid),
+that is built once and refined until the interpolation error measured
+between its nodes is below the maximum. Points out of the grid, or in
+cells with nodes that can not be transformed, are transformed by the
+function.
+"""
+__copyright__ = '(C) Boundless Spatial Inc'
+
+# This will get replaced with a git SHA1 when you do a git archive
+__revision__ = '$Format:%H$'
+
+import math
+
+import numpy
+
+from boundlessprovider.coordinate_parser import asText
+
+# metres of a degree of latitude, to measure errors
+METRES_PER_DEGREE = 111320.0
+# cells per side of the first grid, and at most
+FIRST_GRID_CELLS = 16
+MAX_GRID_CELLS = 256
+# more cells than predicted by the measured error, so that one
+# refinement is usually enough
+REFINEMENT_MARGIN = 1.1
+
+
+def parseNumbers(values):
+    """Parse a sequence of numeric values, or texts of numbers. Return
+    a tuple (numbers, valid) of a float64 array, NaN where not valid,
+    and a bool array.
+    """
+    count = len(values)
+    numbers = numpy.full(count, numpy.nan, dtype=numpy.float64)
+    texts = [asText(value) for value in values]
+    try:
+        # the usual case: every value is a number
+        numbers[:] = [float(text) for text in texts]
+    except (TypeError, ValueError):
+        for index, text in enumerate(texts):
+            try:
+                numbers[index] = float(text)
+            except (TypeError, ValueError):
+                pass
+    valid = numpy.isfinite(numbers)
+    numbers[~valid] = numpy.nan
+    return numbers, valid
+
+
+def errorMetres(lon, lat, expectedLon, expectedLat):
+    """Distance in metres between lon/lat points and the expected ones,
+    on a sphere, good enough for the small errors of a grid.
+    """
+    deltaLon = (lon - expectedLon + 180.0) % 360.0 - 180.0
+    deltaX = deltaLon * numpy.cos(numpy.radians(expectedLat)) * METRES_PER_DEGREE
+    deltaY = (lat - expectedLat) * METRES_PER_DEGREE
+    return numpy.hypot(deltaX, deltaY)
+
+
+class InterpolationGrid(object):
+    """Bilinear interpolation grid of a transform over an extent
+    (xMin, yMin, xMax, yMax).
+
+    The grid starts with FIRST_GRID_CELLS cells per side and is refined
+    until the error of the interpolated points at the centre and at the
+    middle of the sides of every cell is within maxError metres. error
+    is the largest error so measured. The interpolation error goes down
+    with the square of the cell size, so the cells of the refined grid
+    are predicted from the measured error. Building fails with
+    ValueError if the error is still larger with MAX_GRID_CELLS cells
+    per side.
+
+    Building costs about (2 * cells + 1) ** 2 transformed points.
+    """
+
+    def __init__(self, transform, extent, maxError):
+        self.transform = transform
+        self.maxError = maxError
+        xMin, yMin, xMax, yMax = extent
+        if not xMax > xMin:
+            xMin, xMax = xMin - 1.0, xMax + 1.0
+        if not yMax > yMin:
+            yMin, yMax = yMin - 1.0, yMax + 1.0
+        self.extent = xMin, yMin, xMax, yMax
+        cells = FIRST_GRID_CELLS
+        while True:
+            self._build(cells)
+            self.error = self._measure()
+            if self.error <= maxError:
+                return
+            if cells >= MAX_GRID_CELLS:
+                raise ValueError('The interpolation error is {:.3g} m with a grid of {} cells per side'.format(
+                    self.error, cells))
+            predicted = int(math.ceil(cells * math.sqrt(self.error / maxError) * REFINEMENT_MARGIN))
+            cells = min(MAX_GRID_CELLS, max(cells + 1, predicted))
+
+    def _build(self, cells):
+        xMin, yMin, xMax, yMax = self.extent
+        self.cells = cells
+        self.xStep = (xMax - xMin) / cells
+        self.yStep = (yMax - yMin) / cells
+        x, y = numpy.meshgrid(numpy.linspace(xMin, xMax, cells + 1), numpy.linspace(yMin, yMax, cells + 1))
+        lon, lat = self.transform(x.ravel(), y.ravel())
+        self.lon = lon.reshape(x.shape)
+        self.lat = lat.reshape(x.shape)
+
+    def _measure(self):
+        """Largest error of the interpolated cell centres and side
+        middles of the cells with all the nodes transformed.
+        """
+        xMin, yMin, xMax, yMax = self.extent
+        halfX = numpy.linspace(xMin, xMax, 2 * self.cells + 1)
+        halfY = numpy.linspace(yMin, yMax, 2 * self.cells + 1)
+        x, y = numpy.meshgrid(halfX, halfY)
+        # the points that are not nodes
+        notNode = ((numpy.arange(len(halfY)) % 2)[:, None] + (numpy.arange(len(halfX)) % 2)[None, :]) > 0
+        x = x[notNode]
+        y = y[notNode]
+        expectedLon, expectedLat = self.transform(x, y)
+        lon, lat, inside = self.interpolate(x, y)
+        checked = inside & numpy.isfinite(expectedLon) & numpy.isfinite(expectedLat)
+        if not checked.any():
+            return 0.0
+        return float(errorMetres(lon[checked], lat[checked], expectedLon[checked], expectedLat[checked]).max())
+
+    def interpolate(self, x, y):
+        """Return the interpolated (lon, lat, inside) arrays of x, y
+        arrays, where inside is False for the points that are out of
+        the grid or in a cell with nodes that are not transformed.
+        """
+        xMin, yMin, xMax, yMax = self.extent
+        column = (x - xMin) / self.xStep
+        row = (y - yMin) / self.yStep
+        inside = (column >= 0) & (column <= self.cells) & (row >= 0) & (row <= self.cells)
+        column = numpy.where(inside, column, 0.0)
+        row = numpy.where(inside, row, 0.0)
+        left = numpy.minimum(column.astype(numpy.int64), self.cells - 1)
+        bottom = numpy.minimum(row.astype(numpy.int64), self.cells - 1)
+        u = column - left
+        v = row - bottom
+        corners = [(bottom, left), (bottom, left + 1), (bottom + 1, left), (bottom + 1, left + 1)]
+        weights = [(1 - u) * (1 - v), u * (1 - v), (1 - u) * v, u * v]
+        lat = sum(self.lat[corner] * weight for corner, weight in zip(corners, weights))
+        # longitudes relative to the first corner, so that cells across
+        # the antimeridian are not wrapped
+        first = self.lon[corners[0]]
+        lon = first + sum(((self.lon[corner] - first + 180.0) % 360.0 - 180.0) * weight
+                          for corner, weight in zip(corners[1:], weights[1:]))
+        inside &= numpy.isfinite(lon) & numpy.isfinite(lat)
+        lon = (lon + 180.0) % 360.0 - 180.0
+        return lon, lat, inside
+
+    def __call__(self, x, y):
+        """Transform x, y arrays as the transform does, within the
+        error of the grid.
+        """
+        lon, lat, inside = self.interpolate(x, y)
+        outside = numpy.flatnonzero(~inside)
+        if len(outside):
+            lon[outside], lat[outside] = self.transform(x[outside], y[outside])
+        return lon, lat
+
+
+class Projection(object):
+    """Converts chunks of projected (x, y) source value pairs to WGS84
+    (lon, lat) pairs with transform, or with an InterpolationGrid of it
+    if maxError is set. The grid covers extent or, if extent is None,
+    the points of the first chunk. If the grid can not be built within
+    maxError, points are transformed by transform and gridFailure
+    tells why.
+    """
+
+    def __init__(self, transform, maxError=0, extent=None):
+        self.transform = transform
+        self.maxError = maxError
+        self.extent = extent
+        self.grid = None
+        self.gridFailure = None
+
+    def buildGrid(self, extent):
+        """Build the grid over extent. Return it, None if it can not
+        be built.
+        """
+        try:
+            self.grid = InterpolationGrid(self.transform, extent, self.maxError)
+        except ValueError as ex:
+            self.gridFailure = u'{}'.format(ex)
+            self.maxError = 0
+        return self.grid
+
+    def toWgs(self, pairs):
+        """Return the list of (lon, lat) pairs of (x, y) pairs, None
+        values for the pairs that are not valid.
+        """
+        x, xValid = parseNumbers([pair[0] for pair in pairs])
+        y, yValid = parseNumbers([pair[1] for pair in pairs])
+        valid = xValid & yValid
+        rows = numpy.flatnonzero(valid)
+        lon = numpy.full(len(pairs), numpy.nan)
+        lat = numpy.full(len(pairs), numpy.nan)
+        if len(rows):
+            transform = self.transform
+            if self.maxError > 0 and self.gridFailure is None:
+                if self.grid is None:
+                    extent = self.extent
+                    if extent is None:
+                        extent = (x[rows].min(), y[rows].min(), x[rows].max(), y[rows].max())
+                    self.buildGrid(extent)
+                if self.grid is not None:
+                    transform = self.grid
+            lon[rows], lat[rows] = transform(x[rows], y[rows])
+        valid &= numpy.isfinite(lon) & numpy.isfinite(lat)
+        return [(lonValue, latValue) if isValid else (None, None)
+                for lonValue, latValue, isValid in zip(lon.tolist(), lat.tolist(), valid.tolist())]
+
+
+def rejectReason(pair):
+    """Return why the projected source values of a row that is not
+    valid were rejected, None if they are all empty.
+    """
+    texts = [asText(value) for value in pair]
+    if texts[0] is None and texts[1] is None:
+        return None
+    for text, name in zip(texts, (u'X', u'Y')):
+        if text is None:
+            return u'Missing {} value'.format(name)
+        try:
+            if not math.isinf(float(text)) and not math.isnan(float(text)):
+                continue
+        except ValueError:
+            pass
+        return u'Malformed {} value'.format(name)
+    return u'Point out of the area of the source CRS'
@@ -13,10 +13,21 @@ __revision__ = '$Format:%H$'
 from processing.core.AlgorithmProvider import AlgorithmProvider
 from processing.core.ProcessingConfig import Setting, ProcessingConfig
 from boundlessprovider.coordinate_conversion_algorigthm import CoordinateFormatConversion
+from boundlessprovider.conversion_cache import DEFAULT_CACHE_SIZE
+from boundlessprovider.external_sort import DEFAULT_RUN_SIZE
+from boundlessprovider.pipeline import DEFAULT_QUEUE_DEPTH
+from boundlessprovider.streaming import DEFAULT_CHUNK_SIZE
 
 class BoundlessProvider(AlgorithmProvider):
 
-    MY_DUMMY_SETTING = 'MY_DUMMY_SETTING'
+    CONVERSION_CACHE_SIZE = 'BOUNDLESS_CONVERSION_CACHE_SIZE'
+    SHARED_ENGINE = 'BOUNDLESS_SHARED_ENGINE'
+    CHUNK_SIZE = 'BOUNDLESS_CHUNK_SIZE'
+    WORKERS = 'BOUNDLESS_WORKERS'
+    CONVERT_IN_THREAD = 'BOUNDLESS_CONVERT_IN_THREAD'
+    PIPELINE_QUEUE_DEPTH = 'BOUNDLESS_PIPELINE_QUEUE_DEPTH'
+    SORT_RUN_SIZE = 'BOUNDLESS_SORT_RUN_SIZE'
+    INSTRUMENTATION = 'BOUNDLESS_INSTRUMENTATION'
 
     def __init__(self):
         AlgorithmProvider.__init__(self)
@@ -29,6 +40,9 @@ class BoundlessProvider(AlgorithmProvider):
         for alg in self.alglist:
             alg.provider = self
 
+        # created by the first run, see conversionEngine
+        self.sharedEngine = None
+
     def initializeSettings(self):
         """In this method we add settings needed to configure our
         provider.
@@ -38,15 +52,59 @@ class BoundlessProvider(AlgorithmProvider):
         deactivating the algorithms in the provider.
         """
         AlgorithmProvider.initializeSettings(self)
-        ProcessingConfig.addSetting(Setting('Example algorithms',
-            BoundlessProvider.MY_DUMMY_SETTING,
-            'Example setting', 'Default value'))
+        ProcessingConfig.addSetting(Setting(self.getDescription(),
+            BoundlessProvider.CONVERSION_CACHE_SIZE,
+            'Coordinate conversion cache size (0 to disable)', DEFAULT_CACHE_SIZE))
+        ProcessingConfig.addSetting(Setting(self.getDescription(),
+            BoundlessProvider.SHARED_ENGINE,
+            'Keep the conversion workers and caches between runs', True))
+        ProcessingConfig.addSetting(Setting(self.getDescription(),
+            BoundlessProvider.CHUNK_SIZE,
+            'Features converted per chunk (0 for the whole table)', DEFAULT_CHUNK_SIZE))
+        ProcessingConfig.addSetting(Setting(self.getDescription(),
+            BoundlessProvider.WORKERS,
+            'Coordinate conversion worker processes (0 for the number of cores)', 1))
+        ProcessingConfig.addSetting(Setting(self.getDescription(),
+            BoundlessProvider.CONVERT_IN_THREAD,
+            'Convert in a thread of its own, while the features are read and written', False))
+        ProcessingConfig.addSetting(Setting(self.getDescription(),
+            BoundlessProvider.PIPELINE_QUEUE_DEPTH,
+            'Chunks queued to and from the conversion thread', DEFAULT_QUEUE_DEPTH))
+        ProcessingConfig.addSetting(Setting(self.getDescription(),
+            BoundlessProvider.SORT_RUN_SIZE,
+            'Rows sorted in memory before spilling a run to a temporary file', DEFAULT_RUN_SIZE))
+        ProcessingConfig.addSetting(Setting(self.getDescription(),
+            BoundlessProvider.INSTRUMENTATION,
+            'Record the conversion statistics of every run', False))
 
     def unload(self):
         """Setting should be removed here, so they do not appear anymore
         when the plugin is unloaded.
         """
         AlgorithmProvider.unload(self)
+        ProcessingConfig.removeSetting(BoundlessProvider.CONVERSION_CACHE_SIZE)
+        ProcessingConfig.removeSetting(BoundlessProvider.SHARED_ENGINE)
+        ProcessingConfig.removeSetting(BoundlessProvider.CHUNK_SIZE)
+        ProcessingConfig.removeSetting(BoundlessProvider.WORKERS)
+        ProcessingConfig.removeSetting(BoundlessProvider.CONVERT_IN_THREAD)
+        ProcessingConfig.removeSetting(BoundlessProvider.PIPELINE_QUEUE_DEPTH)
+        ProcessingConfig.removeSetting(BoundlessProvider.SORT_RUN_SIZE)
+        ProcessingConfig.removeSetting(BoundlessProvider.INSTRUMENTATION)
+        if self.sharedEngine is not None:
+            self.sharedEngine.close()
+            self.sharedEngine = None
+
+    def conversionEngine(self):
+        """Return the SharedConversionEngine of the provider, that keeps
+        the conversion workers and caches between the runs of its
+        algorithms, e.g. of a batch or a model.
+        """
+        if self.sharedEngine is None:
+            # on the first run, as the conversion modules, see
+            # coordinate_conversion_algorigthm
+            from boundlessprovider.engine import SharedConversionEngine
+            self.sharedEngine = SharedConversionEngine()
+        return self.sharedEngine
 
     def getName(self):
         """This is the name that will appear on the toolbox group.
@@ -0,0 +1,130 @@
+# -*- coding: utf-8 -*-
+#
+# (c) 2017 Boundless Spatial Inc, http://boundlessgeo.com
+# This code is licensed under the GPL 2.0 license.
+#
+"""Spatial keys of WGS84 lon/lat arrays: Hilbert indexes and geohashes.
+
+Both map a point to a position along a curve that fills the lon/lat
+rectangle, so that rows sorted by key are spatially clustered:
+
+- Hilbert index: the distance along a Hilbert curve over a grid of
+  2**HILBERT_ORDER x 2**HILBERT_ORDER lon/lat cells, an integer below
+  2**48 that is exact also as a double;
+- geohash: GEOHASH_LENGTH base 32 characters of the interleaved lon/lat
+  bits, e.g. sr2yk7wjpn5e for 12.5 E 41.9 N. Geohashes sort as their
+  integer value, that spatialSortKeys returns.
+
+Keys are computed for whole columns with NumPy integer operations, a
+bit level at a time. The geohashes are tested against pygeodesy in
+test_spatial_keys.
+"""
+__copyright__ = '(C) Boundless Spatial Inc'
+
+# This will get replaced with a git SHA1 when you do a git archive
+__revision__ = '$Format:%H$'
+
+import numpy
+
+# same indexes of CoordinateFormatConversion.SPATIAL_KEY_LIST
+NO_KEY_index = 0
+HILBERT_index = 1
+GEOHASH_index = 2
+
+HILBERT_ORDER = 24
+GEOHASH_LENGTH = 12
+GEOHASH_ALPHABET = u'0123456789bcdefghjkmnpqrstuvwxyz'
+# sort key of the rows without a point, after all the others
+MISSING_KEY = 1 << 62
+
+_GEOHASH_BITS = 5 * GEOHASH_LENGTH
+_GEOHASH_CODES = numpy.array([ord(char) for char in GEOHASH_ALPHABET], dtype=numpy.uint32)
+
+
+def _cells(lon, lat, bits):
+    """Return the (x, y, valid) arrays of the integer lon/lat cells of a
+    grid of 2**bits x 2**bits cells, valid for the finite points.
+    """
+    lon = numpy.asarray(lon, dtype=numpy.float64)
+    lat = numpy.asarray(lat, dtype=numpy.float64)
+    valid = numpy.isfinite(lon) & numpy.isfinite(lat)
+    size = 1 << bits
+    x = numpy.floor((numpy.where(valid, lon, 0.0) + 180.0) / 360.0 * size)
+    y = numpy.floor((numpy.where(valid, lat, 0.0) + 90.0) / 180.0 * size)
+    return (numpy.clip(x, 0, size - 1).astype(numpy.int64),
+            numpy.clip(y, 0, size - 1).astype(numpy.int64), valid)
+
+
+def hilbertIndexes(lon, lat, order=HILBERT_ORDER):
+    """Return the int64 array of the Hilbert indexes of lon/lat arrays,
+    -1 for NaN coordinates.
+    """
+    x, y, valid = _cells(lon, lat, order)
+    size = 1 << order
+    indexes = numpy.zeros(len(x), dtype=numpy.int64)
+    half = size >> 1
+    while half > 0:
+        rx = (x & half) > 0
+        ry = (y & half) > 0
+        indexes += half * half * ((3 * rx) ^ ry)
+        # rotate the quadrant, so that the curve is continuous
+        flip = ~ry & rx
+        x = numpy.where(flip, size - 1 - x, x)
+        y = numpy.where(flip, size - 1 - y, y)
+        x, y = numpy.where(ry, x, y), numpy.where(ry, y, x)
+        half >>= 1
+    indexes[~valid] = -1
+    return indexes
+
+
+def geohashIndexes(lon, lat):
+    """Return the int64 array of the bits of the geohashes of lon/lat
+    arrays, -1 for NaN coordinates.
+    """
+    # odd lengths have a lon bit more than the lat ones
+    lonBits = (_GEOHASH_BITS + 1) // 2
+    latBits = _GEOHASH_BITS // 2
+    x, _, valid = _cells(lon, lat, lonBits)
+    _, y, _ = _cells(lon, lat, latBits)
+    indexes = numpy.zeros(len(x), dtype=numpy.int64)
+    # from the most significant bit, a lon bit then a lat one
+    for position in range(_GEOHASH_BITS):
+        if position % 2 == 0:
+            bit = (x >> (lonBits - 1 - position // 2)) & 1
+        else:
+            bit = (y >> (latBits - 1 - position // 2)) & 1
+        indexes |= bit << (_GEOHASH_BITS - 1 - position)
+    indexes[~valid] = -1
+    return indexes
+
+
+def geohashTexts(indexes):
+    """Return the list of the geohash texts of geohashIndexes, None for
+    -1.
+    """
+    indexes = numpy.asarray(indexes, dtype=numpy.int64)
+    valid = indexes >= 0
+    shifts = numpy.arange(_GEOHASH_BITS - 5, -1, -5)
+    codes = numpy.ascontiguousarray(_GEOHASH_CODES[(numpy.where(valid, indexes, 0)[:, None] >> shifts) & 31])
+    texts = codes.view('U{}'.format(GEOHASH_LENGTH)).ravel().tolist()
+    for row in numpy.flatnonzero(~valid).tolist():
+        texts[row] = None
+    return texts
+
+
+def spatialKeys(keyType, lon, lat):
+    """Return (keys, sortKeys) of lon/lat arrays for the HILBERT_index
+    or GEOHASH_index key type: the list of the keys, None for NaN
+    coordinates, and the int64 array to sort them by, MISSING_KEY for
+    NaN coordinates.
+    """
+    if keyType == HILBERT_index:
+        indexes = hilbertIndexes(lon, lat)
+        keys = [index if index >= 0 else None for index in indexes.tolist()]
+    elif keyType == GEOHASH_index:
+        indexes = geohashIndexes(lon, lat)
+        keys = geohashTexts(indexes)
+    else:
+        raise ValueError('Unknown spatial key type {}'.format(keyType))
+    return keys, numpy.where(indexes >= 0, indexes, MISSING_KEY)
+
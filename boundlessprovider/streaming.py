@@ -0,0 +1,44 @@
+# -*- coding: utf-8 -*-
+#
+# (c) 2017 Boundless Spatial Inc, http://boundlessgeo.com
+# This code is licensed under the GPL 2.0 license.
+#
+"""Chunked reading of feature streams.
+
+Features are read and converted a chunk at a time, so that memory
+depends on the chunk size and not on the size of the table.
+"""
+__copyright__ = '(C) Boundless Spatial Inc'
+
+# This will get replaced with a git SHA1 when you do a git archive
+__revision__ = '$Format:%H$'
+
+from itertools import islice
+
+DEFAULT_CHUNK_SIZE = 10000
+
+
+def chunks(iterable, chunkSize=DEFAULT_CHUNK_SIZE):
+    """Yield lists of at most chunkSize items of iterable, reading it
+    only as they are needed. chunkSize 0 reads everything in one list.
+    """
+    iterator = iter(iterable)
+    if chunkSize <= 0:
+        chunk = list(iterator)
+        if chunk:
+            yield chunk
+        return
+    while True:
+        chunk = list(islice(iterator, chunkSize))
+        if not chunk:
+            return
+        yield chunk
+
+
+def percentage(done, estimate):
+    """Progress percentage of done items over an estimated total, that
+    can be unknown (0 or negative) or lower than the real one.
+    """
+    if estimate <= 0:
+        return 0
+    return min(100, int(done * 100.0 / estimate))
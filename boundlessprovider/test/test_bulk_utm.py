@@ -0,0 +1,86 @@
+# -*- coding: utf-8 -*-
+#
+# (c) 2017 Boundless Spatial Inc, http://boundlessgeo.com
+# This code is licensed under the GPL 2.0 license.
+#
+"""Tests of bulk_utm against pygeodesy."""
+__copyright__ = '(C) Boundless Spatial Inc'
+
+# This will get replaced with a git SHA1 when you do a git archive
+__revision__ = '$Format:%H$'
+
+import unittest
+
+import numpy
+from pygeodesy import mgrs
+from pygeodesy.ellipsoidalVincenty import LatLon
+try:
+    from pygeodesy.utm import parseUTM5 as parseUTM, toUtm8 as toUtm
+except ImportError:
+    from pygeodesy.utm import parseUTM, toUtm
+
+from boundlessprovider.bulk_utm import (
+    latLonToUtm,
+    parseMgrsColumn,
+    utmToLatLon,
+    TOLERANCE_DEGREES,
+    TOLERANCE_METERS,
+)
+from boundlessprovider.coordinate_parser import columnsToWgs
+from boundlessprovider.format_detection import MGRS_index, UTM_index
+from boundlessprovider.grid_tables import formatMgrs
+
+
+class GlobalGridTest(unittest.TestCase):
+    """Forward and inverse projections over a global grid."""
+
+    def setUp(self):
+        lats, lons = numpy.meshgrid(numpy.arange(-79.5, 84, 6.1), numpy.arange(-179.7, 180, 9.7))
+        self.lats = lats.ravel()
+        self.lons = lons.ravel()
+
+    def testForward(self):
+        zones, bands, south, eastings, northings = latLonToUtm(self.lats, self.lons)
+        for index in range(len(self.lats)):
+            utmObject = toUtm(self.lats[index], self.lons[index])
+            self.assertEqual(zones[index], utmObject.zone)
+            self.assertEqual(bool(south[index]), utmObject.hemisphere == 'S')
+            self.assertAlmostEqual(eastings[index], utmObject.easting, delta=TOLERANCE_METERS)
+            self.assertAlmostEqual(northings[index], utmObject.northing, delta=TOLERANCE_METERS)
+
+    def testMgrsInverse(self):
+        zones, bands, south, eastings, northings = latLonToUtm(self.lats, self.lons)
+        references = formatMgrs(zones, bands, eastings, northings)
+        zones, bands, south, eastings, northings, parsed = parseMgrsColumn(references)
+        self.assertTrue(parsed.all())
+        lat, lon = utmToLatLon(zones, south, eastings, northings)
+        for index, reference in enumerate(references):
+            latLon = mgrs.parseMGRS(reference).toUtm().toLatLon(LatLon)
+            self.assertAlmostEqual(lat[index], latLon.lat, delta=TOLERANCE_DEGREES)
+            self.assertAlmostEqual(lon[index], latLon.lon, delta=TOLERANCE_DEGREES)
+
+
+class AntimeridianTest(unittest.TestCase):
+    """References of zones 1 and 60 past the antimeridian."""
+
+    def assertLatLon(self, references, sourceFormat, expected):
+        lon, lat, valid = columnsToWgs(references, None, sourceFormat)
+        self.assertTrue(valid.all())
+        for index, latLon in enumerate(expected):
+            self.assertAlmostEqual(lat[index], latLon.lat, delta=TOLERANCE_DEGREES)
+            self.assertAlmostEqual(lon[index], latLon.lon, delta=TOLERANCE_DEGREES)
+            self.assertTrue(-180.0 <= lon[index] < 180.0)
+
+    def testMgrs(self):
+        references = ['01CDM41', '01NAA0000000000', '60CWM41', '60NZF9999999999']
+        self.assertLatLon(references, MGRS_index,
+                          [mgrs.parseMGRS(reference).toUtm().toLatLon(LatLon) for reference in references])
+
+    def testUtm(self):
+        references = ['1 N 166021 0', '01 N 100000 4000000', '60 N 833979 0', '60 S 900000 6000000']
+        self.assertLatLon(references, UTM_index,
+                          [parseUTM(reference).toLatLon(LatLon) for reference in references])
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,173 @@
+# -*- coding: utf-8 -*-
+#
+# (c) 2017 Boundless Spatial Inc, http://boundlessgeo.com
+# This code is licensed under the GPL 2.0 license.
+#
+"""Tests of the checkpoint journal of resumable jobs."""
+__copyright__ = '(C) Boundless Spatial Inc'
+
+# This will get replaced with a git SHA1 when you do a git archive
+__revision__ = '$Format:%H$'
+
+import json
+import os
+import shutil
+import tempfile
+import unittest
+
+from boundlessprovider.checkpoint import Checkpoint, conversionHash, jobHash, JOURNAL_VERSION
+from boundlessprovider.converter import ConversionParameters
+
+JOB = (u'points.csv', [u'LON', u'LAT'], [1, 0, None, u'{X} {Y}', True, True, False, [], 0])
+
+
+class JobHashTest(unittest.TestCase):
+
+    def testStable(self):
+        # the same with Python 2 and 3 and between runs: a journal of a
+        # previous run is found again
+        self.assertEqual(jobHash(*JOB + ({u'b': 1, u'a': 2},)), 'af1faf635e2c0c00e9185e97327cb8bd5d1ff6d7')
+
+    def testDictionaryOrderDoesNotMatter(self):
+        self.assertEqual(jobHash({u'a': 1, u'b': 2}), jobHash(dict([(u'b', 2), (u'a', 1)])))
+
+    def testValuesMatter(self):
+        self.assertNotEqual(jobHash(*JOB), jobHash(JOB[0], JOB[1], JOB[2][:-1] + [1]))
+        self.assertNotEqual(jobHash(u'a', u'b'), jobHash(u'b', u'a'))
+
+
+class ConversionHashTest(unittest.TestCase):
+
+    def setUp(self):
+        # the conversion of LON/LAT, then of LON2/LAT2, to DMS
+        self.job = [u'points.csv', [u'NAME', u'LON', u'LAT', u'LON2', u'LAT2', u'X', u'Y', u'X_2', u'Y_2'],
+                    [(u'LON', u'LAT'), (u'LON2', u'LAT2')], [(1, 2), (3, 4)],
+                    ConversionParameters(0, 1, u'', u'{X} {Y}', True, True, False), 0, 0.0, False, 0]
+        self.folder = tempfile.mkdtemp()
+
+    def tearDown(self):
+        shutil.rmtree(self.folder)
+
+    def changedJobs(self):
+        """The job with each of the values that change the outputs
+        changed, the output field names staying the same.
+        """
+        changes = [
+            (2, [(u'LAT', u'LON'), (u'LON2', u'LAT2')]),
+            (2, [(u'LON', u'LAT'), (u'LAT2', u'LON2')]),
+            (2, [(u'LON', u'LAT')]),
+            (3, [(2, 1), (3, 4)]),
+            (3, [(1, 2), (4, 3)]),
+            (4, ConversionParameters(0, 2, u'', u'{X} {Y}', True, True, False)),
+            (5, 1),
+            (5, 2),
+            (6, 0.5),
+            (7, True),
+            (8, 10),
+        ]
+        for index, value in changes:
+            job = list(self.job)
+            job[index] = value
+            yield job
+
+    def testStable(self):
+        self.assertEqual(conversionHash(*self.job), conversionHash(*list(self.job)))
+
+    def testChangedJobsStartAgain(self):
+        checkpoint = Checkpoint(os.path.join(self.folder, 'journal.json'), conversionHash(*self.job))
+        checkpoint.commit(1, 7, 0, {})
+        hashes = set([checkpoint.hash])
+        for job in self.changedJobs():
+            hashValue = conversionHash(*job)
+            self.assertNotIn(hashValue, hashes, job)
+            hashes.add(hashValue)
+            self.assertIsNone(Checkpoint(checkpoint.path, hashValue).load())
+        self.assertIsNotNone(Checkpoint(checkpoint.path, conversionHash(*self.job)).load())
+
+
+class CheckpointTest(unittest.TestCase):
+
+    def setUp(self):
+        self.folder = tempfile.mkdtemp()
+        self.path = os.path.join(self.folder, 'job', 'journal.json')
+        self.output = os.path.join(self.folder, 'output.csv')
+        self.writeOutput(b'x,y\n1,2\n')
+
+    def tearDown(self):
+        shutil.rmtree(self.folder)
+
+    def writeOutput(self, data, mode='wb'):
+        with open(self.output, mode) as stream:
+            stream.write(data)
+
+    def readOutput(self):
+        with open(self.output, 'rb') as stream:
+            return stream.read()
+
+    def testCommitAndLoad(self):
+        checkpoint = Checkpoint(self.path, 'hash')
+        checkpoint.commit(1, 7, 0, {'OUTPUT_TABLE': self.output}, rejected=2)
+        state = Checkpoint(self.path, 'hash').load()
+        self.assertEqual(state['rows'], 1)
+        self.assertEqual(state['featureId'], 7)
+        self.assertEqual(state['chunk'], 0)
+        self.assertEqual(state['rejected'], 2)
+        self.assertEqual(state['outputs'], {'OUTPUT_TABLE': [self.output, 8]})
+
+    def testOtherJobOrMissingJournal(self):
+        self.assertIsNone(Checkpoint(self.path, 'hash').load())
+        Checkpoint(self.path, 'hash').commit(1, 7, 0, {'OUTPUT_TABLE': self.output})
+        self.assertIsNone(Checkpoint(self.path, 'other hash').load())
+
+    def testOutputShorterThanCommitted(self):
+        Checkpoint(self.path, 'hash').commit(1, 7, 0, {'OUTPUT_TABLE': self.output})
+        self.writeOutput(b'x,y\n')
+        self.assertIsNone(Checkpoint(self.path, 'hash').load())
+        os.remove(self.output)
+        self.assertIsNone(Checkpoint(self.path, 'hash').load())
+
+    def testCorruptedJournal(self):
+        Checkpoint(self.path, 'hash').commit(1, 7, 0, {'OUTPUT_TABLE': self.output})
+        with open(self.path, 'w') as stream:
+            stream.write('{"version": ')
+        self.assertIsNone(Checkpoint(self.path, 'hash').load())
+        with open(self.path, 'w') as stream:
+            json.dump({'version': JOURNAL_VERSION + 1, 'hash': 'hash'}, stream)
+        self.assertIsNone(Checkpoint(self.path, 'hash').load())
+
+    def testJournalIsReplacedAtomically(self):
+        checkpoint = Checkpoint(self.path, 'hash')
+        checkpoint.commit(1, 7, 0, {'OUTPUT_TABLE': self.output})
+        self.writeOutput(b'3,4\n', 'ab')
+        checkpoint.commit(2, 9, 1, {'OUTPUT_TABLE': self.output})
+        self.assertEqual(os.listdir(os.path.dirname(self.path)), ['journal.json'])
+        # a commit that died while writing the temporary journal leaves
+        # the last committed one
+        with open(self.path + '.tmp', 'w') as stream:
+            stream.write('{"rows": 3')
+        state = Checkpoint(self.path, 'hash').load()
+        self.assertEqual((state['rows'], state['featureId'], state['chunk']), (2, 9, 1))
+        # and the next commit replaces the journal
+        checkpoint.commit(3, 11, 2, {'OUTPUT_TABLE': self.output})
+        self.assertEqual(Checkpoint(self.path, 'hash').load()['rows'], 3)
+
+    def testTruncateOutputs(self):
+        Checkpoint(self.path, 'hash').commit(1, 7, 0, {'OUTPUT_TABLE': self.output})
+        # a chunk written after the commit, then the job died
+        self.writeOutput(b'3,4\n5,', 'ab')
+        checkpoint = Checkpoint(self.path, 'hash')
+        self.assertIsNotNone(checkpoint.load())
+        checkpoint.truncateOutputs()
+        self.assertEqual(self.readOutput(), b'x,y\n1,2\n')
+
+    def testClear(self):
+        checkpoint = Checkpoint(self.path, 'hash')
+        checkpoint.commit(1, 7, 0, {'OUTPUT_TABLE': self.output})
+        checkpoint.clear()
+        self.assertFalse(os.path.exists(self.path))
+        self.assertIsNone(checkpoint.state)
+        checkpoint.clear()
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,118 @@
+# -*- coding: utf-8 -*-
+#
+# (c) 2017 Boundless Spatial Inc, http://boundlessgeo.com
+# This code is licensed under the GPL 2.0 license.
+#
+"""Tests of the exit status and the outputs of cli.main."""
+__copyright__ = '(C) Boundless Spatial Inc'
+
+# This will get replaced with a git SHA1 when you do a git archive
+__revision__ = '$Format:%H$'
+
+import io
+import os
+import shutil
+import sys
+import tempfile
+import unittest
+
+from boundlessprovider import cli
+
+INPUT = u'NAME,LON,LAT\na,12.5,41.9\nb,-3.7,40.4\nc,abc,51.5\nd,2.3,48.8\n'
+
+CONVERTED = [u'NAME,LON,LAT,X,Y',
+             u'a,12.5,41.9,12.5,41.9',
+             u'b,-3.7,40.4,-3.7,40.4']
+
+
+class ErrorStream(object):
+    """sys.stderr of a test: printError writes encoded text with
+    Python 2.
+    """
+
+    encoding = 'utf-8'
+
+    def __init__(self):
+        self.parts = []
+
+    def write(self, text):
+        self.parts.append(text if isinstance(text, type(u'')) else text.decode(self.encoding))
+
+    def flush(self):
+        pass
+
+    def text(self):
+        return u''.join(self.parts)
+
+
+class MainTest(unittest.TestCase):
+
+    def setUp(self):
+        self.folder = tempfile.mkdtemp()
+        self.input = self.path('input.csv')
+        with io.open(self.input, 'w', encoding='utf-8', newline='') as stream:
+            stream.write(INPUT)
+        self.output = self.path('output.csv')
+        self.stderr = sys.stderr
+        sys.stderr = ErrorStream()
+
+    def tearDown(self):
+        sys.stderr = self.stderr
+        shutil.rmtree(self.folder)
+
+    def path(self, name):
+        return os.path.join(self.folder, name)
+
+    def lines(self, path):
+        with io.open(path, encoding='utf-8') as stream:
+            return stream.read().splitlines()
+
+    def main(self, *options):
+        return cli.main([self.input, self.output, '--x-field', 'LON', '--y-field', 'LAT',
+                         '--output-x', 'X', '--output-y', 'Y'] + list(options))
+
+    def testConverted(self):
+        self.assertEqual(self.main('--max-rejects', '1', '--rejects', self.path('rejects.csv')), 0)
+        self.assertEqual(self.lines(self.output), CONVERTED + [u'c,abc,51.5,,', u'd,2.3,48.8,2.3,48.8'])
+
+    def testMalformedValue(self):
+        for options in [[], ['--no-mmap'], ['--pipeline-stages', '3', '--chunk-size', '2']]:
+            self.assertEqual(self.main(*options), 1)
+            # the rows before the malformed value are written
+            self.assertEqual(self.lines(self.output), CONVERTED)
+            self.assertIn(u'Malformed value abc in row 3', sys.stderr.text())
+
+    def testMalformedValueSorted(self):
+        self.assertEqual(self.main('--spatial-key', 'Hilbert', '--sort'), 1)
+        self.assertEqual(self.lines(self.output), CONVERTED[:1])
+
+    def testRejects(self):
+        rejects = self.path('rejects.csv')
+        self.assertEqual(self.main('--rejects', rejects), 0)
+        self.assertEqual(self.lines(rejects), [u'row,x_value,y_value,reason', u'3,abc,51.5,Malformed DD X value'])
+        self.assertIn(u'1 rejected rows', sys.stderr.text())
+
+    def testTooManyRejects(self):
+        with io.open(self.input, 'a', encoding='utf-8') as stream:
+            stream.write(u'e,1.5,xyz\n')
+        rejects = self.path('rejects.csv')
+        self.assertEqual(self.main('--rejects', rejects, '--max-rejects', '1'), 1)
+        self.assertEqual(self.lines(self.output), CONVERTED + [u'c,abc,51.5,,', u'd,2.3,48.8,2.3,48.8'])
+        self.assertEqual(self.lines(rejects)[1:], [u'3,abc,51.5,Malformed DD X value',
+                                                   u'5,1.5,xyz,Malformed DD Y value'])
+        self.assertIn(u'More than 1 rejected rows, the last is row 5', sys.stderr.text())
+
+    def testInvalidArguments(self):
+        for options in [['--x-field', 'LON', '--y-field', 'LAT'],
+                        ['--output-x', 'X'],
+                        ['--x-field', 'LON', '--y-field', 'LAT', '--output-x', 'X', '--source-format', 'MGRS'],
+                        ['--x-field', 'LON', '--y-field', 'LAT', '--output-x', 'X', '--sort'],
+                        ['--x-field', 'LON', '--y-field', 'LAT', '--output-x', 'X', '--workers', 'two'],
+                        ['--x-field', 'LONGITUDE', '--y-field', 'LAT', '--output-x', 'X']]:
+            with self.assertRaises(SystemExit) as context:
+                cli.main([self.input, self.output] + options)
+            self.assertEqual(context.exception.code, 2)
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,201 @@
+# -*- coding: utf-8 -*-
+#
+# (c) 2017 Boundless Spatial Inc, http://boundlessgeo.com
+# This code is licensed under the GPL 2.0 license.
+#
+"""Tests of the column parsers of coordinate_parser against the value
+by value parsers: coordinate_tokenizer.toDegrees and pygeodesy.
+"""
+__copyright__ = '(C) Boundless Spatial Inc'
+
+# This will get replaced with a git SHA1 when you do a git archive
+__revision__ = '$Format:%H$'
+
+import random
+import unittest
+
+import numpy
+from pygeodesy import mgrs
+from pygeodesy.datums import Datums
+from pygeodesy.ellipsoidalVincenty import LatLon
+try:
+    from pygeodesy.utm import parseUTM5 as parseUTM
+except ImportError:
+    from pygeodesy.utm import parseUTM
+
+from boundlessprovider.coordinate_parser import (
+    asText,
+    parseColumn,
+    parseGridColumn,
+    columnsToWgs,
+    DD_index,
+    DMS_index,
+    DDM_index,
+    MGRS_index,
+    UTM_index,
+    AUTO_index,
+)
+from boundlessprovider.coordinate_tokenizer import toDegrees
+from boundlessprovider.datum_shift import datumToWgs84, TOLERANCE_DEGREES
+from boundlessprovider.formats import WGS84_DATUM_index, ED50_DATUM_index
+
+MGRS_REFERENCES = [u'31U DQ 48251 11932', u'31UDQ4825111932', u'33TUG1234', u'4QFJ12345678', u'60CWM41',
+                   # read by pygeodesy only
+                   u'31U DQ 48251, 11932', u'31U DQ 482511 119321', u'31U DQ 4825 119',
+                   # not valid
+                   u'61U DQ 48251 11932', u'31U IQ 48251 11932', u'']
+UTM_REFERENCES = [u'31 N 448251 5411932', u'31 N 448251.5 5411932.25', u'31 N, 448251, 5411932',
+                  u'19 S 300000 6300000', u'1 N 166021 0',
+                  # not valid
+                  u'31N 448251 5411932', u'31 X 448251 5411932', u'']
+
+
+def randomAngles(generator, count, isLat):
+    limit = 90 if isLat else 180
+    hemispheres = u'NS' if isLat else u'EW'
+    values = []
+    for _ in range(count):
+        degrees = generator.randint(0, limit)
+        minutes = generator.randint(0, 61)
+        seconds = generator.uniform(0, 61)
+        values.append(generator.choice([
+            u'{}'.format(generator.uniform(-limit - 5, limit + 5)),
+            u'{}/{}/{:.3f}'.format(degrees, minutes, seconds),
+            u'{}\xba{}\'{:.2f}"{}'.format(degrees, minutes, seconds, generator.choice(hemispheres)),
+            u'-{} {}.{}'.format(degrees, minutes, generator.randint(0, 9999)),
+            u'{}:{}.{}\' {}'.format(degrees, minutes, generator.randint(0, 99), generator.choice(hemispheres)),
+        ]))
+    return values
+
+
+class AsTextTest(unittest.TestCase):
+
+    def testValues(self):
+        self.assertEqual(asText(u' 12.5 '), u'12.5')
+        self.assertEqual(asText(b'12\xc2\xba N'), u'12\xba N')
+        self.assertEqual(asText(12.25), u'12.25')
+        self.assertEqual(asText(-3.0), u'-3')
+        self.assertEqual(asText(7), u'7')
+        self.assertIsNone(asText(None))
+        self.assertIsNone(asText(u'  '))
+        self.assertIsNone(asText(u'NULL'))
+
+
+class ParseColumnTest(unittest.TestCase):
+
+    def assertSameAsTokenizer(self, values, sourceFormatIndex, isLat):
+        degrees, valid = parseColumn(values, sourceFormatIndex, isLat)
+        for index, value in enumerate(values):
+            text = asText(value)
+            expected = toDegrees(text, sourceFormatIndex, isLat) if text is not None else None
+            if expected is None:
+                self.assertFalse(valid[index], value)
+                self.assertTrue(numpy.isnan(degrees[index]))
+            else:
+                self.assertTrue(valid[index], value)
+                self.assertAlmostEqual(degrees[index], expected, places=12, msg=value)
+
+    def testGroupedShapes(self):
+        # a few shapes, parsed a group at a time
+        generator = random.Random(3)
+        for sourceFormatIndex in (DD_index, DMS_index, DDM_index):
+            for isLat in (True, False):
+                values = randomAngles(generator, 10, isLat) * 50
+                self.assertSameAsTokenizer(values, sourceFormatIndex, isLat)
+
+    def testDistinctShapes(self):
+        # mostly distinct shapes, parsed value by value
+        generator = random.Random(4)
+        for sourceFormatIndex in (DD_index, DMS_index, DDM_index):
+            for isLat in (True, False):
+                values = randomAngles(generator, 500, isLat)
+                self.assertSameAsTokenizer(values, sourceFormatIndex, isLat)
+
+    def testNotTextValues(self):
+        self.assertSameAsTokenizer([None, 12.5, -7, b'45.5', u'NULL', u' 3 '], DD_index, False)
+
+    def testLongNumbers(self):
+        degrees, valid = parseColumn([u'12.1234567890123456789'] * 100, DD_index)
+        self.assertTrue(valid.all())
+        self.assertEqual(degrees[0], float(u'12.1234567890123456789'))
+
+    def testEmpty(self):
+        degrees, valid = parseColumn([], DMS_index)
+        self.assertEqual(len(degrees), 0)
+        self.assertEqual(len(valid), 0)
+
+    def testInvalidFormat(self):
+        self.assertRaises(ValueError, parseColumn, [u'12'], MGRS_index)
+
+
+class ParseGridColumnTest(unittest.TestCase):
+
+    def assertSameAsPygeodesy(self, references, sourceFormatIndex, datumIndex, datum):
+        lon, lat, valid = parseGridColumn(references, sourceFormatIndex, datumIndex)
+        for index, reference in enumerate(references):
+            try:
+                if sourceFormatIndex == MGRS_index:
+                    expected = mgrs.parseMGRS(reference, datum=datum).toUtm().toLatLon(LatLon)
+                else:
+                    expected = parseUTM(reference, datum=datum).toLatLon(LatLon)
+            except ValueError:
+                self.assertFalse(valid[index], reference)
+                continue
+            self.assertTrue(valid[index], reference)
+            self.assertAlmostEqual(lat[index], expected.lat, delta=TOLERANCE_DEGREES)
+            self.assertAlmostEqual(lon[index], expected.lon, delta=TOLERANCE_DEGREES)
+
+    def testMgrs(self):
+        self.assertSameAsPygeodesy(MGRS_REFERENCES, MGRS_index, WGS84_DATUM_index, Datums.WGS84)
+
+    def testUtm(self):
+        self.assertSameAsPygeodesy(UTM_REFERENCES, UTM_index, WGS84_DATUM_index, Datums.WGS84)
+
+    def testDatumEllipsoid(self):
+        self.assertSameAsPygeodesy(MGRS_REFERENCES, MGRS_index, ED50_DATUM_index, Datums.ED50)
+        self.assertSameAsPygeodesy(UTM_REFERENCES, UTM_index, ED50_DATUM_index, Datums.ED50)
+
+    def testInvalidFormat(self):
+        self.assertRaises(ValueError, parseGridColumn, [u'12'], DD_index)
+
+
+class ColumnsToWgsTest(unittest.TestCase):
+
+    def testPairs(self):
+        lon, lat, valid = columnsToWgs([u'12.5', u'12/30/0', u'bad', u'12.5'],
+                                       [u'41.9', u'41.9', u'41.9', None], DD_index)
+        self.assertEqual(valid.tolist(), [True, False, False, False])
+        self.assertEqual((lon[0], lat[0]), (12.5, 41.9))
+
+    def testSingleColumn(self):
+        lon, lat, valid = columnsToWgs(None, [u'41 54 0 N'], DMS_index)
+        self.assertTrue(valid[0])
+        self.assertAlmostEqual(lat[0], 41.9, places=12)
+        self.assertTrue(numpy.isnan(lon[0]))
+
+    def testAuto(self):
+        x = [u'12.5', u'12/30/0 E', u'31U DQ 48251 11932', u'12 30.0\' E', u'31 N 448251 5411932', u'bad']
+        y = [u'41.9', u'41/54/0 N', None, u'41 54.0 N', None, u'41.9']
+        lon, lat, valid = columnsToWgs(x, y, AUTO_index)
+        self.assertEqual(valid.tolist(), [True, True, True, True, True, False])
+        for row in (1, 3):
+            self.assertAlmostEqual(lon[row], 12.5, places=12)
+            self.assertAlmostEqual(lat[row], 41.9, places=12)
+        for row, sourceFormatIndex in ((2, MGRS_index), (4, UTM_index)):
+            expectedLon, expectedLat, _ = columnsToWgs([x[row]], None, sourceFormatIndex)
+            self.assertEqual((lon[row], lat[row]), (expectedLon[0], expectedLat[0]))
+
+    def testDatumShift(self):
+        lon, lat, valid = columnsToWgs([u'12.5', u'-3.7'], [u'41.9', u'40.4'], DD_index, ED50_DATUM_index)
+        expectedLon, expectedLat = datumToWgs84([12.5, -3.7], [41.9, 40.4], ED50_DATUM_index)
+        self.assertTrue(valid.all())
+        self.assertEqual(lon.tolist(), expectedLon.tolist())
+        self.assertEqual(lat.tolist(), expectedLat.tolist())
+
+    def testDatumShiftNeedsBothColumns(self):
+        self.assertRaises(ValueError, columnsToWgs, [u'12.5'], None, DD_index, ED50_DATUM_index)
+        self.assertRaises(ValueError, columnsToWgs, None, [u'41.9'], AUTO_index, ED50_DATUM_index)
+
+
+if __name__ == '__main__':
+    unittest.main()
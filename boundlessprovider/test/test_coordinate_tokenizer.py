@@ -0,0 +1,122 @@
+# -*- coding: utf-8 -*-
+#
+# (c) 2017 Boundless Spatial Inc, http://boundlessgeo.com
+# This code is licensed under the GPL 2.0 license.
+#
+"""Tests of coordinate_tokenizer against the geodesy_regex patterns,
+copied here: the module has Python 2 print statements.
+"""
+__copyright__ = '(C) Boundless Spatial Inc'
+
+# This will get replaced with a git SHA1 when you do a git archive
+__revision__ = '$Format:%H$'
+
+import random
+import re
+import unittest
+
+from boundlessprovider.coordinate_tokenizer import (
+    scanPlan,
+    toDegrees,
+    DD_index,
+    DMS_index,
+    DDM_index,
+)
+
+PATTERNS = {
+    (DD_index, True): r'([+-])?(((90)(\.(0*))?)|([1-8]?\d)(\.(\d+))?)\s*(\º)?\s*([nNsS])?',
+    (DD_index, False): r'([+-])?(((180)(\.(0*))?)|(([1]?[0-7]\d)|(\d?\d))(\.(\d+))?)\s*(\º)?\s*([eEwW])?',
+    (DMS_index, True): r'([+-])?(((90)\s*(\/|\:|\s|\º)\s*((0*)\s*(\/|\:|\s|\'))?\s*((0*)(\.(0*))?(\")?)?)|([1-8]?\d)(\/|\:|\s|\º)\s*([1-5]?\d)(\/|\:|\s|\')\s*([1-5]?\d(\.(\d*))?)(\")?)\s*([nNsS])?',
+    (DMS_index, False): r'([-+])?\s*(((180)\s*(\/|\:|\s|\º)\s*((0*)\s*(\/|\:|\s|\'))?\s*((0*)(\.(0*))?(\")?)?)|(([1]?[1-7]\d)|\d?\d)\s*(\/|\:|\s|\º)\s*([1-5]?\d)\s*(\/|\:|\s|\')\s*([1-5]?\d(\.(\d*))?)\s*(\")?)\s*([eEwW])?',
+    (DDM_index, True): r'([+-])?(((90)\s*(\/|\:|\s|\º)\s*((0*)(\.(0*))?(\')?)?)|([1-8]?\d)\s*(\/|\:|\s|\º)\s*(([1-5]?\d(\.(\d+)?))(\')?))\s*([nNsS])?',
+    (DDM_index, False): r'([+-])?(((180)\s*(\/|\:|\s|\º)\s*((0*)(\.(0*))?(\')?)?)|(([1]?[1-7]\d)|\d?\d)\s*(\/|\:|\s|\º)\s*[1-5]?\d(\.(\d+))?(\'))\s*([eEwW])?',
+}
+NUMBERS_REGEXP = re.compile(r'\d+(?:\.\d*)?')
+
+NUMBER_PARTS = [u'', u'0', u'7', u'9', u'12', u'59', u'60', u'89', u'90', u'105', u'127', u'179', u'180',
+                u'700', u'00', u'.', u'.5', u'.00', u'1.25']
+SEPARATORS = [u'', u' ', u'  ', u'/', u':', u'\xba', u'\'', u'"', u'\t', u'x']
+SIGNS = [u'', u'', u'-', u'+']
+HEMISPHERES = [u'', u'', u'N', u's', u'E', u'w']
+
+
+def asText(value):
+    return value.decode('utf-8') if isinstance(value, bytes) else value
+
+
+def regexDegrees(expression, value):
+    """Degrees of value as the parser read them before the tokenizer:
+    the first match has to cover the whole value.
+    """
+    matched = expression.match(value)
+    if not matched or matched.group(0) != value:
+        return None
+    sign = matched.group(1)
+    hemisphere = matched.group(expression.groups)
+    if sign and hemisphere:
+        return None
+    numbers = [float(number) for number in NUMBERS_REGEXP.findall(value)] + [0.0, 0.0]
+    degrees = numbers[0] + numbers[1] / 60.0 + numbers[2] / 3600.0
+    if sign == u'-' or (hemisphere and hemisphere in u'sSwW'):
+        return -degrees
+    return degrees
+
+
+def randomValues(generator, count):
+    """Values built from the parts of DD, DMS and DDM values, mostly not
+    valid in some way.
+    """
+    values = []
+    for _ in range(count):
+        parts = [generator.choice(SIGNS)]
+        for _ in range(generator.randint(1, 3)):
+            parts.append(generator.choice(NUMBER_PARTS))
+            parts.append(generator.choice(SEPARATORS))
+        parts.append(generator.choice(HEMISPHERES))
+        values.append(u''.join(parts).strip())
+    return values
+
+
+class ToDegreesTest(unittest.TestCase):
+
+    def assertSameAsRegex(self, sourceFormatIndex, isLat, values):
+        expression = re.compile(asText(PATTERNS[sourceFormatIndex, isLat]))
+        for value in values:
+            expected = regexDegrees(expression, value)
+            degrees = toDegrees(value, sourceFormatIndex, isLat)
+            if expected is None:
+                self.assertIsNone(degrees, value)
+            else:
+                self.assertAlmostEqual(degrees, expected, places=12, msg=value)
+
+    def testRandomValues(self):
+        values = randomValues(random.Random(2), 20000)
+        for sourceFormatIndex, isLat in PATTERNS:
+            self.assertSameAsRegex(sourceFormatIndex, isLat, values)
+
+    def testFixtures(self):
+        self.assertSameAsRegex(DMS_index, True, [
+            u'-12/23/59.999999999999999', u'-1:2:12.000234', u'0 59 0.22', u'60/34/34',
+            u'-12\xba23\'59.999999999999999"', u'0\xba 59\' 0.22"', u'20/60/0', u'80/59/70', u'90/59/0'])
+        self.assertSameAsRegex(DMS_index, False, [
+            u'-179/59/0.23', u'-180/0/0', u'179:59:59.99999999', u'127 12 12.333', u'-0 0 0.00001',
+            u'123:60:59.99999999', u'-180:12:0', u'700 50 50.11', u'0 60 0'])
+        self.assertSameAsRegex(DD_index, False, [
+            u'-22.311', u'-170', u'179.0111111111111', u'-100.0', u'323.312.0', u'2.a23', u'180.1', u'-190'])
+
+    def testQuirks(self):
+        self.assertIsNone(toDegrees(u'90.5', DD_index, True))
+        self.assertIsNone(toDegrees(u'105/0/0', DMS_index, False))
+        self.assertEqual(toDegrees(u'105.5', DD_index, False), 105.5)
+        self.assertIsNone(toDegrees(u'12 30', DDM_index, True))
+        self.assertIsNone(toDegrees(u'-12 30 N', DMS_index, True))
+
+    def testSameShapeSamePlan(self):
+        self.assertIs(scanPlan(u'-12/23/59.9', DMS_index), scanPlan(u'-13/24/39.9', DMS_index))
+
+    def testInvalidFormat(self):
+        self.assertRaises(ValueError, toDegrees, u'12', 99)
+
+
+if __name__ == '__main__':
+    unittest.main()
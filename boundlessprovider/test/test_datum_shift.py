@@ -0,0 +1,75 @@
+# -*- coding: utf-8 -*-
+#
+# (c) 2017 Boundless Spatial Inc, http://boundlessgeo.com
+# This code is licensed under the GPL 2.0 license.
+#
+"""Tests of the datum_shift shifts against pygeodesy."""
+__copyright__ = '(C) Boundless Spatial Inc'
+
+# This will get replaced with a git SHA1 when you do a git archive
+__revision__ = '$Format:%H$'
+
+import unittest
+
+import numpy
+from pygeodesy.datums import Datums
+from pygeodesy.ellipsoidalVincenty import LatLon
+
+from boundlessprovider.datum_shift import DATUMS, datumToWgs84, TOLERANCE_DEGREES
+from boundlessprovider.formats import (
+    WGS84_DATUM_index,
+    ED50_DATUM_index,
+    NAD27_DATUM_index,
+    OSGB36_DATUM_index,
+    DATUM_NAMES,
+)
+
+AREAS = {
+    # (west, south, east, north)
+    ED50_DATUM_index: (-10.0, 35.0, 30.0, 70.0),
+    NAD27_DATUM_index: (-125.0, 25.0, -65.0, 50.0),
+    OSGB36_DATUM_index: (-8.0, 49.9, 2.0, 60.9),
+}
+REFERENCE_POINTS = {
+    ED50_DATUM_index: [(12.4922, 41.8902), (2.2945, 48.8584), (-3.7038, 40.4168)],
+    NAD27_DATUM_index: [(-77.0365, 38.8977), (-122.4194, 37.7749), (-98.5795, 39.8283)],
+    OSGB36_DATUM_index: [(-0.1276, 51.5072), (-3.1883, 55.9533), (-1.2577, 51.7520)],
+}
+
+
+class DatumShiftTest(unittest.TestCase):
+
+    def assertShifts(self, datumIndex):
+        datum = DATUMS[datumIndex]
+        pyDatum = getattr(Datums, DATUM_NAMES[datumIndex])
+        self.assertAlmostEqual(datum.a, pyDatum.ellipsoid.a, delta=1e-6)
+        self.assertAlmostEqual(datum.f, pyDatum.ellipsoid.f, delta=1e-15)
+        west, south, east, north = AREAS[datumIndex]
+        lons, lats = numpy.meshgrid(numpy.linspace(west, east, 21), numpy.linspace(south, north, 21))
+        points = REFERENCE_POINTS[datumIndex] + list(zip(lons.ravel().tolist(), lats.ravel().tolist()))
+        lon, lat = datumToWgs84([point[0] for point in points], [point[1] for point in points], datumIndex)
+        for index, (pointLon, pointLat) in enumerate(points):
+            expected = LatLon(pointLat, pointLon, datum=pyDatum).toDatum(Datums.WGS84)
+            self.assertAlmostEqual(lon[index], expected.lon, delta=TOLERANCE_DEGREES)
+            self.assertAlmostEqual(lat[index], expected.lat, delta=TOLERANCE_DEGREES)
+
+    def testED50(self):
+        self.assertShifts(ED50_DATUM_index)
+
+    def testNAD27(self):
+        self.assertShifts(NAD27_DATUM_index)
+
+    def testOSGB36(self):
+        self.assertShifts(OSGB36_DATUM_index)
+
+    def testWGS84(self):
+        lon, lat = datumToWgs84([12.5, -0.1], [41.9, 51.5], WGS84_DATUM_index)
+        self.assertEqual(lon.tolist(), [12.5, -0.1])
+        self.assertEqual(lat.tolist(), [41.9, 51.5])
+
+    def testInvalidDatum(self):
+        self.assertRaises(ValueError, datumToWgs84, [0.0], [0.0], len(DATUMS))
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,76 @@
+# -*- coding: utf-8 -*-
+#
+# (c) 2017 Boundless Spatial Inc, http://boundlessgeo.com
+# This code is licensed under the GPL 2.0 license.
+#
+"""Tests of external_sort.ExternalSorter."""
+__copyright__ = '(C) Boundless Spatial Inc'
+
+# This will get replaced with a git SHA1 when you do a git archive
+__revision__ = '$Format:%H$'
+
+import random
+import unittest
+
+from boundlessprovider.external_sort import ExternalSorter
+
+
+def expectedOrder(keys, rows):
+    """rows sorted by key, equal keys in the order they were added."""
+    return [row for key, index, row in sorted(zip(keys, range(len(rows)), rows))]
+
+
+class ExternalSorterTest(unittest.TestCase):
+
+    def setUp(self):
+        generator = random.Random(1)
+        self.keys = [generator.randint(0, 50) for _ in range(237)]
+        self.rows = [(index, u'row {}'.format(index)) for index in range(len(self.keys))]
+
+    def addChunks(self, sorter, chunkSize=13):
+        for start in range(0, len(self.rows), chunkSize):
+            sorter.add(self.keys[start:start + chunkSize], self.rows[start:start + chunkSize])
+
+    def sortedRows(self, sorter, chunkSize=10):
+        return [row for chunk in sorter.sortedChunks(chunkSize) for row in chunk]
+
+    def testInMemory(self):
+        with ExternalSorter(runSize=1000) as sorter:
+            self.addChunks(sorter)
+            self.assertEqual(self.sortedRows(sorter), expectedOrder(self.keys, self.rows))
+            self.assertEqual(sorter.runs, 0)
+
+    def testSpilledRunsAreMerged(self):
+        with ExternalSorter(runSize=20) as sorter:
+            self.addChunks(sorter)
+            self.assertGreater(sorter.runs, 1)
+            self.assertEqual(self.sortedRows(sorter), expectedOrder(self.keys, self.rows))
+
+    def testEqualKeysKeepTheirOrderAcrossRuns(self):
+        keys = [index % 3 for index in range(100)]
+        with ExternalSorter(runSize=7) as sorter:
+            for start in range(0, 100, 9):
+                sorter.add(keys[start:start + 9], self.rows[start:start + 9])
+            rows = self.sortedRows(sorter)
+        self.assertEqual(rows, expectedOrder(keys, self.rows[:100]))
+
+    def testChunkSizes(self):
+        with ExternalSorter(runSize=20) as sorter:
+            self.addChunks(sorter)
+            chunks = list(sorter.sortedChunks(50))
+        self.assertEqual([len(chunk) for chunk in chunks], [50, 50, 50, 50, 37])
+        with ExternalSorter(runSize=1000) as sorter:
+            self.addChunks(sorter)
+            self.assertEqual([len(chunk) for chunk in sorter.sortedChunks(0)], [len(self.rows)])
+
+    def testCloseDeletesTheRuns(self):
+        sorter = ExternalSorter(runSize=20)
+        self.addChunks(sorter)
+        runFiles = list(sorter.files)
+        sorter.close()
+        self.assertEqual(sorter.runs, 0)
+        self.assertTrue(all(runFile.closed for runFile in runFiles))
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,73 @@
+# -*- coding: utf-8 -*-
+#
+# (c) 2017 Boundless Spatial Inc, http://boundlessgeo.com
+# This code is licensed under the GPL 2.0 license.
+#
+"""Tests of format_detection."""
+__copyright__ = '(C) Boundless Spatial Inc'
+
+# This will get replaced with a git SHA1 when you do a git archive
+__revision__ = '$Format:%H$'
+
+import unittest
+
+from boundlessprovider.format_detection import (
+    classify,
+    classifyValues,
+    detectFormats,
+    DD_index,
+    DMS_index,
+    DDM_index,
+    MGRS_index,
+    UTM_index,
+    UNKNOWN_index,
+)
+
+
+class ClassifyTest(unittest.TestCase):
+
+    def testFormats(self):
+        for value, expected in [
+                (u'-12.5', DD_index),
+                (u'12.5\xba E', DD_index),
+                (u'41 54.0 N', DDM_index),
+                (u'41\xba54\'0.5"N', DMS_index),
+                (u'-12/30/0', DMS_index),
+                (u'31U DQ 48251 11932', MGRS_index),
+                (u'31udq4825111932', MGRS_index),
+                (u'31 N 448251 5411932', UTM_index),
+                (u'31 s, 448251, 5411932', UTM_index),
+                (u'abc', UNKNOWN_index),
+                (u'1 2 3 4', UNKNOWN_index)]:
+            self.assertEqual(classify(value), expected, value)
+
+    def testClassifyValues(self):
+        texts = [u'12.5', u'', u'41 54.0 N', u'31 N 448251 5411932']
+        self.assertEqual(classifyValues(texts).tolist(), [DD_index, UNKNOWN_index, DDM_index, UTM_index])
+        self.assertEqual(classifyValues(texts, [3, 0]).tolist(), [UTM_index, DD_index])
+
+
+class DetectFormatsTest(unittest.TestCase):
+
+    def testHomogeneous(self):
+        texts = [u'', u'12.5', u'-3.25'] * 10 + [u'12 30 0']
+        formats, homogeneous = detectFormats(texts, sampleSize=20)
+        self.assertTrue(homogeneous)
+        # out of the sample, not classified
+        self.assertEqual(formats[-1], DD_index)
+        self.assertEqual(formats[0], UNKNOWN_index)
+
+    def testMixed(self):
+        texts = [u'12.5', u'12 30 0', u'', u'31U DQ 48251 11932']
+        formats, homogeneous = detectFormats(texts)
+        self.assertFalse(homogeneous)
+        self.assertEqual(formats.tolist(), [DD_index, DMS_index, UNKNOWN_index, MGRS_index])
+
+    def testUnknownSample(self):
+        formats, homogeneous = detectFormats([u'abc', u'def'])
+        self.assertFalse(homogeneous)
+        self.assertEqual(formats.tolist(), [UNKNOWN_index, UNKNOWN_index])
+
+
+if __name__ == '__main__':
+    unittest.main()
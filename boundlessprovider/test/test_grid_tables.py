@@ -0,0 +1,78 @@
+# -*- coding: utf-8 -*-
+#
+# (c) 2017 Boundless Spatial Inc, http://boundlessgeo.com
+# This code is licensed under the GPL 2.0 license.
+#
+"""Tests of the grid_tables references against pygeodesy."""
+__copyright__ = '(C) Boundless Spatial Inc'
+
+# This will get replaced with a git SHA1 when you do a git archive
+__revision__ = '$Format:%H$'
+
+import unittest
+
+import numpy
+from pygeodesy.utm import toUtm8
+
+from boundlessprovider.bulk_utm import latLonToUtm
+from boundlessprovider.grid_tables import (
+    formatMgrs,
+    formatUtm,
+    BANDS,
+    UTM_LAT_MIN,
+    UTM_LAT_MAX,
+)
+
+
+class ReferencesTest(unittest.TestCase):
+    """References at the centre of degree cells of the tables and across
+    the zone and band boundaries. The cells are every degree of latitude
+    on meridians LON_STEP degrees apart, that cross the zones at every
+    whole degree offset, and every degree cell of the Norway and Svalbard
+    exceptions.
+    """
+
+    LON_STEP = 19.0
+    # (west, south, east, north)
+    EXCEPTIONS = (0.0, 56.0, 42.0, UTM_LAT_MAX)
+
+    def setUp(self):
+        cellLats, cellLons = numpy.meshgrid(numpy.arange(UTM_LAT_MIN + 0.5, UTM_LAT_MAX, 1.0),
+                                            numpy.arange(-179.5, 180, self.LON_STEP))
+        west, south, east, north = self.EXCEPTIONS
+        exceptionLats, exceptionLons = numpy.meshgrid(numpy.arange(south + 0.5, north, 1.0),
+                                                      numpy.arange(west + 0.5, east, 1.0))
+        bandLats, bandLons = numpy.meshgrid(
+            numpy.concatenate([numpy.arange(-80, 84, 8.0) + delta for delta in (-1e-7, 1e-7)] + [[83.9999]]),
+            numpy.arange(-179.5, 180, self.LON_STEP))
+        zoneLats, zoneLons = numpy.meshgrid(
+            numpy.arange(UTM_LAT_MIN + 0.5, UTM_LAT_MAX, 13.0),
+            numpy.concatenate([numpy.arange(-180, 180, 3.0) + delta for delta in (-1e-7, 1e-7)]))
+        lats = numpy.concatenate([grid.ravel() for grid in (cellLats, exceptionLats, bandLats, zoneLats)])
+        lons = numpy.concatenate([grid.ravel() for grid in (cellLons, exceptionLons, bandLons, zoneLons)])
+        inRange = (lats >= UTM_LAT_MIN) & (lats < UTM_LAT_MAX)
+        self.lats = lats[inRange]
+        self.lons = (lons[inRange] + 180.0) % 360.0 - 180.0
+
+    def testReferences(self):
+        zones, bands, south, eastings, northings = latLonToUtm(self.lats, self.lons)
+        mgrsReferences = formatMgrs(zones, bands, eastings, northings)
+        utmReferences = formatUtm(zones, south, eastings, northings)
+        for index in range(len(self.lats)):
+            utmObject = toUtm8(self.lats[index], self.lons[index])
+            mgrsObject = utmObject.toMgrs()
+            self.assertEqual(zones[index], utmObject.zone)
+            self.assertEqual(BANDS[bands[index]], mgrsObject.band)
+            # the last digit of points at a metre boundary may differ,
+            # within the tolerance of the projections
+            self.assertEqual(mgrsReferences[index][:6], mgrsObject.toStr(sep=' ')[:6])
+            self.assertEqual(utmReferences[index][:5], utmObject.toStr()[:5])
+
+    def testNotInRange(self):
+        zones, bands, south, eastings, northings = latLonToUtm(numpy.array([-80.5, 84.0]), numpy.array([0.0, 0.0]))
+        self.assertEqual(formatMgrs(zones, bands, eastings, northings), [None, None])
+        self.assertEqual(formatUtm(zones, south, eastings, northings), [None, None])
+
+
+if __name__ == '__main__':
+    unittest.main()
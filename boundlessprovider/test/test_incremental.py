@@ -0,0 +1,89 @@
+# -*- coding: utf-8 -*-
+#
+# (c) 2017 Boundless Spatial Inc, http://boundlessgeo.com
+# This code is licensed under the GPL 2.0 license.
+#
+"""Tests of the stored conversions of REUSE_UNCHANGED runs."""
+__copyright__ = '(C) Boundless Spatial Inc'
+
+# This will get replaced with a git SHA1 when you do a git archive
+__revision__ = '$Format:%H$'
+
+import os
+import shutil
+import tempfile
+import unittest
+
+from boundlessprovider.incremental import IncrementalStore, rowHashes, STORE_SUFFIX
+
+PAIRS = [(u'12.5', u'41.9'), (u'-3.7', u'40.4'), (None, u'51.5'), (u'2.3', None)]
+
+
+class RowHashesTest(unittest.TestCase):
+
+    def testSameValuesSameHashes(self):
+        self.assertEqual(rowHashes(PAIRS).tolist(), rowHashes(list(PAIRS)).tolist())
+
+    def testDistinctValuesDistinctHashes(self):
+        hashes = rowHashes(PAIRS + [(u'41.9', u'12.5'), (u'12.5', u'41.91')]).tolist()
+        self.assertEqual(len(set(hashes)), len(hashes))
+
+
+class IncrementalStoreTest(unittest.TestCase):
+
+    def setUp(self):
+        self.folder = tempfile.mkdtemp()
+        self.path = os.path.join(self.folder, 'stores', 'job' + STORE_SUFFIX)
+        self.fids = [10, 11, 12, 13]
+        self.hashes = rowHashes(PAIRS)
+        self.values = [(u'X{}'.format(fid), u'Y{}'.format(fid), None) for fid in self.fids]
+        store = IncrementalStore(self.path, 'job')
+        self.assertEqual(store.changes(self.fids, self.hashes).tolist(), [True] * 4)
+        store.store(self.fids, self.hashes, self.values)
+        store.commit()
+        store.close()
+
+    def tearDown(self):
+        shutil.rmtree(self.folder)
+
+    def testUnchangedFeatures(self):
+        store = IncrementalStore(self.path, 'job')
+        self.assertEqual(len(store), 4)
+        self.assertEqual(store.changes(self.fids, self.hashes).tolist(), [False] * 4)
+        self.assertEqual(store.changed, 0)
+        self.assertEqual([tuple(values[:3]) for values in store.storedValues(self.fids)], self.values)
+        store.close()
+
+    def testChangedAndInsertedFeatures(self):
+        store = IncrementalStore(self.path, 'job')
+        hashes = rowHashes([PAIRS[0], (u'-3.8', u'40.4')])
+        self.assertEqual(store.changes([10, 11], hashes).tolist(), [False, True])
+        self.assertEqual(store.changes([14], rowHashes(PAIRS[:1])).tolist(), [True])
+        self.assertEqual(store.changed, 2)
+        store.close()
+
+    def testChunksInAnyOrder(self):
+        store = IncrementalStore(self.path, 'job')
+        self.assertEqual(store.changes([13, 10], self.hashes[[3, 0]]).tolist(), [False, False])
+        self.assertEqual(store.changes([12, 11], self.hashes[[1, 2]]).tolist(), [True, True])
+        store.close()
+
+    def testDeleteMissing(self):
+        store = IncrementalStore(self.path, 'job')
+        store.changes([10, 12], self.hashes[[0, 2]])
+        self.assertEqual(store.deleteMissing(), 2)
+        store.commit()
+        store.close()
+        store = IncrementalStore(self.path, 'job')
+        self.assertEqual(store.fids.tolist(), [10, 12])
+        store.close()
+
+    def testOtherJobResetsTheStore(self):
+        store = IncrementalStore(self.path, 'other job')
+        self.assertEqual(len(store), 0)
+        self.assertEqual(store.changes(self.fids, self.hashes).tolist(), [True] * 4)
+        store.close()
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,107 @@
+# -*- coding: utf-8 -*-
+#
+# (c) 2017 Boundless Spatial Inc, http://boundlessgeo.com
+# This code is licensed under the GPL 2.0 license.
+#
+"""Tests of output_formatter against the formatting of each value on its
+own, as the algorithm did before the batch formatting.
+"""
+__copyright__ = '(C) Boundless Spatial Inc'
+
+# This will get replaced with a git SHA1 when you do a git archive
+__revision__ = '$Format:%H$'
+
+import unittest
+
+import numpy
+
+from boundlessprovider.formats import (
+    DD_index,
+    DMS_index,
+    DDM_index,
+    CUSTOM_COORD_FORMAT,
+    DDM_COORD_FORMAT,
+    FIELD_PRECISION,
+    DD_PRECISION,
+)
+from boundlessprovider.output_formatter import formatDestinationColumns
+
+
+def fromWgsToDest(lon, lat, destFormatIndex, customFormat, singleFieldFormat):
+    """Convert a WGS84 lon/lat pair to the DD, DMS or DDM
+    destination format. Return the (X, Y, XY) output values.
+    """
+    if destFormatIndex == DD_index:
+        newX = round(lon, DD_PRECISION)
+        newY = round(lat, DD_PRECISION)
+    else:
+        newX = formatDegrees(lon, destFormatIndex, customFormat)
+        newY = formatDegrees(lat, destFormatIndex, customFormat)
+
+    newXY = None
+    if singleFieldFormat:
+        newXY = singleFieldFormat.format(X=newX, Y=newY)
+    return newX, newY, newXY
+
+
+def formatDegrees(value, destFormatIndex, customFormat):
+    """Format signed decimal degrees as DMS using customFormat, or
+    as DDM. Rounding carries to minutes and degrees.
+    """
+    sign = '-' if value < 0 else ''
+    value = abs(value)
+    degrees = int(value)
+    if destFormatIndex == DDM_index:
+        minutes = round((value - degrees) * 60.0, FIELD_PRECISION)
+        if minutes >= 60.0:
+            minutes -= 60.0
+            degrees += 1
+        return DDM_COORD_FORMAT.format(degree=sign + str(degrees), minutes=minutes)
+
+    minutes = int((value - degrees) * 60.0)
+    seconds = round((value - degrees - minutes / 60.0) * 3600.0, FIELD_PRECISION)
+    if seconds >= 60.0:
+        seconds -= 60.0
+        minutes += 1
+    if minutes >= 60:
+        minutes -= 60
+        degrees += 1
+    template = customFormat or CUSTOM_COORD_FORMAT
+    return template.format(degree=sign + str(degrees), minutes=minutes, seconds=seconds)
+
+
+class FormatDestinationColumnsTest(unittest.TestCase):
+
+    def setUp(self):
+        random = numpy.random.RandomState(0)
+        self.values = numpy.concatenate([
+            random.uniform(-180, 180, 2000),
+            # carries, ties and signs
+            numpy.array([0.0, -0.0, 1e-9, -1e-9, 59.99999999, -59.9999999, 10.5, 0.0000138888,
+                         12.99999986, 12.999999, 179.9999999, 45.0 + 59.9995 / 60, 30.00001388888]),
+            numpy.round(random.uniform(-90, 90, 2000), 5),
+            numpy.round(random.uniform(-90, 90, 2000) * 3600, 1) / 3600,
+        ])
+
+    def assertSameValues(self, destFormatIndex, customFormat, singleFieldFormat):
+        lon = self.values
+        lat = self.values[::-1]
+        columns = formatDestinationColumns(lon, lat, destFormatIndex, customFormat, singleFieldFormat)
+        for index, row in enumerate(zip(*columns)):
+            self.assertEqual(row, fromWgsToDest(lon[index], lat[index], destFormatIndex, customFormat, singleFieldFormat))
+
+    def testDD(self):
+        self.assertSameValues(DD_index, None, u'{X} {Y}')
+
+    def testDMS(self):
+        self.assertSameValues(DMS_index, None, u'{X} {Y}')
+
+    def testDMSCustomFormat(self):
+        self.assertSameValues(DMS_index, u'{degree}d {minutes:02d}m {seconds:06.3f}s', u'{Y!s}|{X:>20}')
+
+    def testDDM(self):
+        self.assertSameValues(DDM_index, None, None)
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,110 @@
+# -*- coding: utf-8 -*-
+#
+# (c) 2017 Boundless Spatial Inc, http://boundlessgeo.com
+# This code is licensed under the GPL 2.0 license.
+#
+"""Tests of pipeline.Pipeline."""
+__copyright__ = '(C) Boundless Spatial Inc'
+
+# This will get replaced with a git SHA1 when you do a git archive
+__revision__ = '$Format:%H$'
+
+import threading
+import unittest
+
+from boundlessprovider.pipeline import Pipeline, PipelineCancelled
+
+
+def square(items):
+    for item in items:
+        yield item, item * item
+
+
+def failing(items, at=5):
+    for item in items:
+        if item == at:
+            raise RuntimeError('failed at {}'.format(item))
+        yield item
+
+
+class PipelineTest(unittest.TestCase):
+
+    def runStages(self, stages, depth=2):
+        written = []
+        with Pipeline(stages=stages, depth=depth) as pipeline:
+            items = pipeline.read(iter(range(50)))
+            for item, result in pipeline.convert(square(items)):
+                pipeline.write(written.append, (item, result))
+            pipeline.flush()
+        return written
+
+    def testStages(self):
+        expected = [(item, item * item) for item in range(50)]
+        for stages in range(4):
+            self.assertEqual(self.runStages(stages), expected)
+
+    def testConvertInThread(self):
+        callers = set()
+
+        def readItems():
+            for item in range(50):
+                callers.add(threading.current_thread())
+                yield item
+
+        with Pipeline(depth=3) as pipeline:
+            results = list(pipeline.convertInThread(readItems(), square))
+        self.assertEqual(results, [(item, item * item) for item in range(50)])
+        self.assertEqual(callers, set([threading.current_thread()]))
+
+    def testBackpressure(self):
+        read = []
+
+        def readItems():
+            for item in range(100):
+                read.append(item)
+                yield item
+
+        with Pipeline(stages=1, depth=4) as pipeline:
+            items = pipeline.read(readItems())
+            next(items)
+            # the reader fills the queue and then waits
+            threading.Event().wait(0.5)
+            self.assertLessEqual(len(read), 1 + 4 + 1)
+
+    def testReaderError(self):
+        with Pipeline(stages=2) as pipeline:
+            items = pipeline.convert(pipeline.read(failing(iter(range(10)))))
+            self.assertRaises(RuntimeError, list, items)
+
+    def testConverterError(self):
+        with Pipeline(depth=2) as pipeline:
+            self.assertRaises(RuntimeError, list, pipeline.convertInThread(range(10), failing))
+
+    def testWriterError(self):
+        def write(item):
+            if item == 3:
+                raise RuntimeError('failed write')
+
+        with Pipeline(stages=3) as pipeline:
+            with self.assertRaises(RuntimeError):
+                for item in pipeline.read(iter(range(1000))):
+                    pipeline.write(write, item)
+                pipeline.flush()
+
+    def testCancel(self):
+        with Pipeline(stages=1) as pipeline:
+            items = pipeline.read(iter(range(1000)))
+            next(items)
+            pipeline.cancel()
+            self.assertRaises(PipelineCancelled, list, items)
+
+    def testCloseStopsThreads(self):
+        pipeline = Pipeline(stages=3, depth=1)
+        items = pipeline.read(iter(range(1000)))
+        next(items)
+        pipeline.close()
+        self.assertEqual(pipeline.threads, [])
+
+
+if __name__ == '__main__':
+    unittest.main()
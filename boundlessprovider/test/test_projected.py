@@ -0,0 +1,172 @@
+# -*- coding: utf-8 -*-
+#
+# (c) 2017 Boundless Spatial Inc, http://boundlessgeo.com
+# This code is licensed under the GPL 2.0 license.
+#
+"""Tests of projected, with the UTM zone 32 north inverse projection of
+bulk_utm as transform.
+"""
+__copyright__ = '(C) Boundless Spatial Inc'
+
+# This will get replaced with a git SHA1 when you do a git archive
+__revision__ = '$Format:%H$'
+
+import unittest
+
+import numpy
+
+from boundlessprovider.bulk_utm import utmToLatLon
+from boundlessprovider.projected import (
+    parseNumbers,
+    errorMetres,
+    rejectReason,
+    InterpolationGrid,
+    Projection,
+    FIRST_GRID_CELLS,
+    METRES_PER_DEGREE,
+)
+
+ZONE = 32
+# (xMin, yMin, xMax, yMax)
+EXTENT = (300000.0, 4000000.0, 700000.0, 5500000.0)
+
+
+def utmTransform(x, y):
+    """lon, lat of UTM zone 32 north eastings and northings, NaN for
+    negative eastings.
+    """
+    x = numpy.asarray(x, dtype=numpy.float64)
+    y = numpy.asarray(y, dtype=numpy.float64)
+    lat, lon = utmToLatLon(numpy.full(len(x), ZONE), numpy.zeros(len(x), dtype=bool), x, y)
+    lon[x < 0] = numpy.nan
+    lat[x < 0] = numpy.nan
+    return lon, lat
+
+
+def stepTransform(x, y):
+    """A transform with a step, that no grid interpolates."""
+    return numpy.where(x > 0.5, 1.0, 0.0), y * 0.0
+
+
+def randomPoints(count, extent=EXTENT):
+    xMin, yMin, xMax, yMax = extent
+    random = numpy.random.RandomState(5)
+    return random.uniform(xMin, xMax, count), random.uniform(yMin, yMax, count)
+
+
+class ParseNumbersTest(unittest.TestCase):
+
+    def testNumbers(self):
+        numbers, valid = parseNumbers([1, 2.5, u' 3.25 ', b'-4'])
+        self.assertTrue(valid.all())
+        self.assertEqual(numbers.tolist(), [1.0, 2.5, 3.25, -4.0])
+
+    def testNotValid(self):
+        numbers, valid = parseNumbers([u'12', None, u'', u'abc', u'inf', float('nan'), u'NULL'])
+        self.assertEqual(valid.tolist(), [True, False, False, False, False, False, False])
+        self.assertTrue(numpy.isnan(numbers[1:]).all())
+
+
+class ErrorMetresTest(unittest.TestCase):
+
+    def testErrors(self):
+        errors = errorMetres(numpy.array([0.0, 179.5, 1.0]), numpy.array([1.0, 0.0, 60.0]),
+                             numpy.array([0.0, -179.5, 0.0]), numpy.array([0.0, 0.0, 60.0]))
+        self.assertAlmostEqual(errors[0], METRES_PER_DEGREE)
+        # across the antimeridian
+        self.assertAlmostEqual(errors[1], METRES_PER_DEGREE)
+        self.assertAlmostEqual(errors[2], METRES_PER_DEGREE / 2)
+
+
+class InterpolationGridTest(unittest.TestCase):
+
+    def assertWithinError(self, grid, maxError):
+        x, y = randomPoints(5000, grid.extent)
+        lon, lat = grid(x, y)
+        expectedLon, expectedLat = utmTransform(x, y)
+        self.assertLessEqual(errorMetres(lon, lat, expectedLon, expectedLat).max(), maxError)
+
+    def testFirstGrid(self):
+        grid = InterpolationGrid(utmTransform, EXTENT, 30.0)
+        self.assertEqual(grid.cells, FIRST_GRID_CELLS)
+        self.assertLessEqual(grid.error, 30.0)
+        self.assertWithinError(grid, 30.0)
+
+    def testRefinedGrid(self):
+        grid = InterpolationGrid(utmTransform, EXTENT, 1.0)
+        self.assertGreater(grid.cells, FIRST_GRID_CELLS)
+        self.assertLessEqual(grid.error, 1.0)
+        self.assertWithinError(grid, 1.0)
+
+    def testOutsideIsTransformed(self):
+        grid = InterpolationGrid(utmTransform, EXTENT, 1.0)
+        x = numpy.array([100000.0, 500000.0])
+        y = numpy.array([4500000.0, 6000000.0])
+        lon, lat, inside = grid.interpolate(x, y)
+        self.assertFalse(inside.any())
+        lon, lat = grid(x, y)
+        expectedLon, expectedLat = utmTransform(x, y)
+        self.assertEqual(lon.tolist(), expectedLon.tolist())
+        self.assertEqual(lat.tolist(), expectedLat.tolist())
+
+    def testNotTransformedNodes(self):
+        # the cells on the negative eastings are transformed
+        grid = InterpolationGrid(utmTransform, (-50000.0, 4000000.0, 350000.0, 4400000.0), 1.0)
+        x, y = randomPoints(1000, grid.extent)
+        lon, lat = grid(x, y)
+        self.assertEqual(numpy.isnan(lon).tolist(), (x < 0).tolist())
+
+    def testFlatExtent(self):
+        grid = InterpolationGrid(utmTransform, (500000.0, 4500000.0, 500000.0, 4500000.0), 0.001)
+        lon, lat = grid(numpy.array([500000.0]), numpy.array([4500000.0]))
+        self.assertAlmostEqual(lon[0], 9.0)
+
+    def testMaxErrorNotReached(self):
+        self.assertRaises(ValueError, InterpolationGrid, stepTransform, (0.0, 0.0, 1.0, 1.0), 1.0)
+
+
+class ProjectionTest(unittest.TestCase):
+
+    def setUp(self):
+        x, y = randomPoints(200)
+        self.pairs = list(zip(x.tolist(), y.tolist()))
+        self.expected = list(zip(*[values.tolist() for values in utmTransform(x, y)]))
+
+    def testTransform(self):
+        projection = Projection(utmTransform)
+        self.assertEqual(projection.toWgs(self.pairs), self.expected)
+        self.assertIsNone(projection.grid)
+
+    def testGrid(self):
+        projection = Projection(utmTransform, 0.5)
+        results = projection.toWgs(self.pairs)
+        self.assertIsNotNone(projection.grid)
+        for (lon, lat), (expectedLon, expectedLat) in zip(results, self.expected):
+            self.assertLessEqual(errorMetres(lon, lat, expectedLon, expectedLat), 0.5)
+
+    def testNotValid(self):
+        projection = Projection(utmTransform, 0.5, EXTENT)
+        results = projection.toWgs([(u'500000', u'4500000'), (None, u'4500000'), (u'x', u'1'), (-1.0, 4500000.0)])
+        self.assertIsNotNone(results[0][0])
+        self.assertEqual(results[1:], [(None, None)] * 3)
+
+    def testGridFailure(self):
+        projection = Projection(stepTransform, 1.0)
+        results = projection.toWgs([(0.0, 0.0), (0.75, 1.0), (1.0, 1.0)])
+        self.assertIsNone(projection.grid)
+        self.assertIsNotNone(projection.gridFailure)
+        self.assertEqual(results, [(0.0, 0.0), (1.0, 0.0), (1.0, 0.0)])
+
+
+class RejectReasonTest(unittest.TestCase):
+
+    def testReasons(self):
+        self.assertIsNone(rejectReason((None, u' ')))
+        self.assertEqual(rejectReason((u'1', None)), u'Missing Y value')
+        self.assertEqual(rejectReason((u'abc', u'1')), u'Malformed X value')
+        self.assertEqual(rejectReason((u'1', u'nan')), u'Malformed Y value')
+        self.assertEqual(rejectReason((u'-1', u'1')), u'Point out of the area of the source CRS')
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,80 @@
+# -*- coding: utf-8 -*-
+#
+# (c) 2017 Boundless Spatial Inc, http://boundlessgeo.com
+# This code is licensed under the GPL 2.0 license.
+#
+"""Tests of the spatial_keys geohashes against pygeodesy and of the
+Hilbert curve.
+"""
+__copyright__ = '(C) Boundless Spatial Inc'
+
+# This will get replaced with a git SHA1 when you do a git archive
+__revision__ = '$Format:%H$'
+
+import unittest
+
+import numpy
+from pygeodesy import geohash
+
+from boundlessprovider.spatial_keys import (
+    hilbertIndexes,
+    geohashIndexes,
+    geohashTexts,
+    spatialKeys,
+    HILBERT_index,
+    GEOHASH_index,
+    GEOHASH_LENGTH,
+    MISSING_KEY,
+)
+
+
+class GeohashTest(unittest.TestCase):
+
+    def testPygeodesy(self):
+        lons, lats = numpy.meshgrid(numpy.linspace(-180, 180, 121), numpy.linspace(-90, 90, 61))
+        random = numpy.random.RandomState(0)
+        lons = numpy.concatenate([lons.ravel(), random.uniform(-180, 180, 2000)])
+        lats = numpy.concatenate([lats.ravel(), random.uniform(-90, 90, 2000)])
+        texts = geohashTexts(geohashIndexes(lons, lats))
+        for lon, lat, text in zip(lons.tolist(), lats.tolist(), texts):
+            self.assertEqual(text, geohash.encode(lat, lon, precision=GEOHASH_LENGTH))
+
+    def testSortOrder(self):
+        lon = numpy.array([12.5, -0.1, 151.2, -74.0])
+        lat = numpy.array([41.9, 51.5, -33.9, 40.7])
+        keys, sortKeys = spatialKeys(GEOHASH_index, lon, lat)
+        self.assertEqual(sorted(keys), [keys[index] for index in numpy.argsort(sortKeys)])
+
+
+class HilbertTest(unittest.TestCase):
+
+    def testAdjacentCells(self):
+        order = 6
+        size = 1 << order
+        x, y = numpy.meshgrid(numpy.arange(size), numpy.arange(size))
+        cellLons = (x.ravel() + 0.5) * 360.0 / size - 180.0
+        cellLats = (y.ravel() + 0.5) * 180.0 / size - 90.0
+        indexes = hilbertIndexes(cellLons, cellLats, order)
+        self.assertEqual(sorted(indexes.tolist()), list(range(size * size)))
+        ordered = numpy.argsort(indexes)
+        steps = numpy.abs(numpy.diff(x.ravel()[ordered])) + numpy.abs(numpy.diff(y.ravel()[ordered]))
+        self.assertTrue((steps == 1).all())
+
+
+class SpatialKeysTest(unittest.TestCase):
+
+    def testMissingPoints(self):
+        lon = numpy.array([12.5, numpy.nan, 0.0])
+        lat = numpy.array([41.9, 0.0, numpy.nan])
+        for keyType in (HILBERT_index, GEOHASH_index):
+            keys, sortKeys = spatialKeys(keyType, lon, lat)
+            self.assertIsNotNone(keys[0])
+            self.assertEqual(keys[1:], [None, None])
+            self.assertEqual(sortKeys[1:].tolist(), [MISSING_KEY, MISSING_KEY])
+
+    def testUnknownKeyType(self):
+        self.assertRaises(ValueError, spatialKeys, 0, numpy.zeros(1), numpy.zeros(1))
+
+
+if __name__ == '__main__':
+    unittest.main()
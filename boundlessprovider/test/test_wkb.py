@@ -0,0 +1,38 @@
+# -*- coding: utf-8 -*-
+#
+# (c) 2017 Boundless Spatial Inc, http://boundlessgeo.com
+# This code is licensed under the GPL 2.0 license.
+#
+"""Tests of wkb.pointsWkb against the WKB packed point by point."""
+__copyright__ = '(C) Boundless Spatial Inc'
+
+# This will get replaced with a git SHA1 when you do a git archive
+__revision__ = '$Format:%H$'
+
+import struct
+import unittest
+
+from boundlessprovider.wkb import pointsWkb, WKB_LITTLE_ENDIAN, WKB_POINT
+
+
+class PointsWkbTest(unittest.TestCase):
+
+    def testPoints(self):
+        x = [12.5, -179.999999, 0.0, 1e-300]
+        y = [41.9, -90.0, -0.0, 123456789.125]
+        wkbs = pointsWkb(x, y)
+        self.assertEqual(wkbs, [struct.pack('<BIdd', WKB_LITTLE_ENDIAN, WKB_POINT, pointX, pointY)
+                                for pointX, pointY in zip(x, y)])
+        self.assertEqual([len(wkb) for wkb in wkbs], [21] * 4)
+
+    def testMissingPoints(self):
+        wkbs = pointsWkb([1.0, None, float('nan'), 2.0], [1.0, 2.0, 3.0, None])
+        self.assertEqual(wkbs[0], struct.pack('<BIdd', WKB_LITTLE_ENDIAN, WKB_POINT, 1.0, 1.0))
+        self.assertEqual(wkbs[1:], [None, None, None])
+
+    def testEmpty(self):
+        self.assertEqual(pointsWkb([], []), [])
+
+
+if __name__ == '__main__':
+    unittest.main()
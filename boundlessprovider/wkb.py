@@ -0,0 +1,43 @@
+# -*- coding: utf-8 -*-
+#
+# (c) 2017 Boundless Spatial Inc, http://boundlessgeo.com
+# This code is licensed under the GPL 2.0 license.
+#
+"""Well known binary of point columns, in bulk.
+
+The WKB of a 2D point is a byte order byte, the uint32 geometry type
+and the x and y doubles: 21 bytes. The points of a column are packed in
+a single NumPy structured array of that layout, whose buffer is then
+sliced into the WKB of each point, instead of building a geometry
+object per point.
+"""
+__copyright__ = '(C) Boundless Spatial Inc'
+
+# This will get replaced with a git SHA1 when you do a git archive
+__revision__ = '$Format:%H$'
+
+import numpy
+
+WKB_LITTLE_ENDIAN = 1
+WKB_POINT = 1
+# not aligned: 21 bytes per point
+POINT_DTYPE = numpy.dtype([('byteOrder', 'u1'), ('type', '<u4'), ('x', '<f8'), ('y', '<f8')])
+
+
+def pointsWkb(x, y):
+    """Return the list of the WKB bytes of the points of the x and y
+    sequences, None for a point with a None or NaN coordinate.
+    """
+    x = numpy.array(x, dtype=numpy.float64)
+    y = numpy.array(y, dtype=numpy.float64)
+    points = numpy.empty(len(x), dtype=POINT_DTYPE)
+    points['byteOrder'] = WKB_LITTLE_ENDIAN
+    points['type'] = WKB_POINT
+    points['x'] = x
+    points['y'] = y
+    buffer = points.tobytes()
+    size = POINT_DTYPE.itemsize
+    wkbs = [buffer[start:start + size] for start in range(0, len(buffer), size)]
+    for index in numpy.flatnonzero(numpy.isnan(x) | numpy.isnan(y)).tolist():
+        wkbs[index] = None
+    return wkbs